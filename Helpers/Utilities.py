@@ -1,14 +1,14 @@
 """Additional function/helpers."""
 
+import csv
 import os
 import pathlib
+from json import loads
 from numbers import Number
-from random import choices, uniform
+from random import Random, choices, uniform
 from string import ascii_letters, digits
 from typing import List
 
-import pandas as pd
-
 
 def is_windows():
     """Check if system is Windows."""
@@ -127,8 +127,14 @@ def save_csv(json: str, path: str) -> None:
     """
     path = pathlib.Path(path)
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    df = pd.read_json(json)
-    df.to_csv(path, index=False)
+
+    records = loads(json)
+    columns = list(dict.fromkeys(key for row in records for key in row))
+
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=columns, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(records)
 
 
 def round_up(value: Number) -> int:
@@ -156,16 +162,20 @@ def build_random_str(lenght: int) -> str:
     return ''.join(name)
 
 
-def draw_float(start: float, end: float) -> float:
+def draw_float(start: float, end: float, rng: Random = None) -> float:
     """Select draw float number from a given range.
 
     :param start: left limit of the range
     :start type: float
     :param end: right limit of the range
     :end type: float
+    :param rng: random numbers generator, default `random` module
+    :rng type: `random.Random`, optional
     :return: random float number from a given range
     :rtype: float
     """
+    if rng is not None:
+        return rng.uniform(start, end)
     return uniform(start, end)
 
 
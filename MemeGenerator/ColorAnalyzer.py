@@ -0,0 +1,165 @@
+"""Find representative colors of an image using its small thumbnail."""
+
+from typing import Dict, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+class ColorAnalyzer():
+    """Compute a representative color of a `PIL.Image` object.
+
+    Full-resolution pixels are read once, to build a small thumbnail.
+    All strategies work on the thumbnail and results are cached,
+    so asking for a color again costs nothing.
+    :data THUMBNAIL_SIZE: max size of the thumbnail to analyse
+    :THUMBNAIL_SIZE type: Tuple[int, int]
+    :data QUANTIZE_BITS: bits per channel kept in the color histogram
+    :QUANTIZE_BITS type: int
+    :data PALETTE_SIZE: color count used by the median cut strategy
+    :PALETTE_SIZE type: int
+    :data STRATEGIES: supported strategies:
+        `mode` the most common color of the quantized histogram,
+        `median_cut` the most common color of median cut palette,
+        `region_mean` mean color of the region under the text
+    :STRATEGIES type: Tuple[str]
+    :param image: An image to analyse
+    :image type: `PIL.Image`
+    :param strategy: one of `STRATEGIES`, default `mode`
+    :strategy type: str, optional
+    :raises ValueError: unknown strategy
+    """
+
+    THUMBNAIL_SIZE = (64, 64)
+    QUANTIZE_BITS = 4
+    PALETTE_SIZE = 8
+    STRATEGIES = ("mode", "median_cut", "region_mean")
+
+    def __init__(self, image: Image, strategy: str = "mode") -> None:
+        """Create an instance."""
+        if strategy not in self.__class__.STRATEGIES:
+            raise ValueError(
+                f"Unknown color strategy: {strategy}. "
+                f"Expected one of: {', '.join(self.__class__.STRATEGIES)}."
+            )
+
+        self.strategy = strategy
+        self._size = image.size
+        self._pixels = self._build_thumbnail(image)
+        self._cache = {}
+
+    def get_color(self, region: Dict = None) -> Tuple[int, int, int]:
+        """Get representative color of the image.
+
+        :param region: box under the text with keys `x`, `y`,
+            `width` and `height` in the image pixels,
+            used by `region_mean` strategy only
+        :region type: Dict, optional
+        :return: rgb color
+        :rtype: Tuple[int, int, int]
+        """
+        key = self.strategy
+        if self.strategy == "region_mean" and region is not None:
+            key = (region["x"], region["y"],
+                   region["width"], region["height"])
+
+        if key not in self._cache:
+
+            if self.strategy == "mode":
+                self._cache[key] = self._mode()
+
+            elif self.strategy == "median_cut":
+                self._cache[key] = self._median_cut()
+
+            else:
+                self._cache[key] = self._region_mean(region)
+
+        return self._cache[key]
+
+    def _build_thumbnail(self, image: Image) -> np.ndarray:
+        """Downscale the image in one pass and return its rgb pixels.
+
+        :param image: An image to downscale
+        :image type: `PIL.Image`
+        :return: thumbnail pixels, shape (height, width, 3)
+        :rtype: `numpy.ndarray`
+        """
+        max_w, max_h = self.__class__.THUMBNAIL_SIZE
+        scale = min(max_w / image.size[0], max_h / image.size[1], 1)
+        size = (max(1, int(image.size[0] * scale)),
+                max(1, int(image.size[1] * scale)))
+
+        thumbnail = image.resize(size, resample=Image.BOX)
+        if thumbnail.mode != "RGB":
+            thumbnail = thumbnail.convert("RGB")  # thumbnail is tiny
+
+        return np.asarray(thumbnail, dtype=np.uint8)
+
+    def _mode(self) -> Tuple[int, int, int]:
+        """Get the most common color of the quantized histogram.
+
+        :return: mean rgb color of the most populated histogram bin
+        :rtype: Tuple[int, int, int]
+        """
+        bits = self.__class__.QUANTIZE_BITS
+        pixels = self._pixels.reshape(-1, 3)
+        quantized = (pixels >> (8 - bits)).astype(np.intp)
+        bins = (quantized[:, 0] << (2 * bits)) \
+            | (quantized[:, 1] << bits) | quantized[:, 2]
+
+        counts = np.bincount(bins, minlength=1 << (3 * bits))
+        top_bin = int(np.argmax(counts))
+
+        return self._to_rgb(pixels[bins == top_bin].mean(axis=0))
+
+    def _median_cut(self) -> Tuple[int, int, int]:
+        """Get the most common color of the median cut palette.
+
+        :return: rgb color
+        :rtype: Tuple[int, int, int]
+        """
+        quantized = Image.fromarray(self._pixels).quantize(
+            colors=self.__class__.PALETTE_SIZE, method=Image.MEDIANCUT)
+
+        _, index = max(quantized.getcolors())
+        palette = quantized.getpalette()
+
+        return tuple(palette[index * 3:index * 3 + 3])
+
+    def _region_mean(self, region: Dict = None) -> Tuple[int, int, int]:
+        """Get mean color of the region, whole image if not given.
+
+        :param region: box with keys `x`, `y`, `width` and `height`
+        :region type: Dict, optional
+        :return: rgb color
+        :rtype: Tuple[int, int, int]
+        """
+        pixels = self._pixels
+
+        if region is not None:
+            scale_x = pixels.shape[1] / self._size[0]
+            scale_y = pixels.shape[0] / self._size[1]
+
+            left = min(max(0, int(region["x"] * scale_x)),
+                       pixels.shape[1] - 1)
+            top = min(max(0, int(region["y"] * scale_y)),
+                      pixels.shape[0] - 1)
+            right = max(left + 1,
+                        int((region["x"] + region["width"]) * scale_x))
+            bottom = max(top + 1,
+                         int((region["y"] + region["height"]) * scale_y))
+
+            pixels = pixels[top:bottom, left:right]
+
+        return self._to_rgb(pixels.reshape(-1, 3).mean(axis=0))
+
+    @staticmethod
+    def _to_rgb(values: np.ndarray) -> Tuple[int, int, int]:
+        """Convert numpy color values to a tuple of ints.
+
+        :param values: three color values
+        :values type: `numpy.ndarray`
+        :return: rgb color
+        :rtype: Tuple[int, int, int]
+        """
+        return tuple(int(round(float(v))) for v in values)
@@ -10,7 +10,7 @@ class TextTooLongError(ValueError):
 
     def __init__(self, msg: str) -> None:
         """Create an instance."""
-        super().__init__()
+        super().__init__(msg)
         self.msg = msg
 
     def __str__(self):
@@ -0,0 +1,184 @@
+"""Process-wide registry of fonts used to draw captions."""
+
+import os
+import pathlib
+import random
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
+
+from Helpers import ExLogger
+from Helpers import Utilities as util
+from PIL import ImageFont
+
+
+class FontRegistry():
+    """Keep loaded fonts of a directory for the process lifetime.
+
+    One registry exists per fonts directory, use `get_registry`
+    to get it. Every font is checked when the directory is scanned,
+    fonts which fail to load are dropped. The directory is scanned
+    again only when its modification time changes.
+    Loaded `FreeTypeFont` objects are kept in a bounded LRU cache
+    keyed by (path, size).
+    :data FONT_FORMAT: Accepted font format
+    :FONT_FORMAT type: str
+    :data DEF_FONT_SIZE: size fonts are checked and preloaded with
+    :DEF_FONT_SIZE type: int
+    :data MAX_CACHED_FONTS: max count of loaded fonts to keep
+    :MAX_CACHED_FONTS type: int
+    :param fonts_dir: Parent dir to look for fonts in
+    :fonts_dir type: str
+    :param max_cached: max count of loaded fonts to keep
+    :max_cached type: int, optional
+    """
+
+    FONT_FORMAT = ".ttf"
+    DEF_FONT_SIZE = 22
+    MAX_CACHED_FONTS = 256  # enough for every size of every font
+
+    _registries = {}
+    _registries_lock = threading.Lock()
+
+    def __init__(self, fonts_dir: str,
+                 max_cached: int = MAX_CACHED_FONTS) -> None:
+        """Create an instance and load all fonts from the directory."""
+        self.fonts_dir = pathlib.Path(fonts_dir)
+        self.max_cached = max_cached
+
+        self._lock = threading.RLock()
+        self._fonts = OrderedDict()  # (path, size) -> FreeTypeFont
+        self._paths = []
+        self._mtime = None
+
+        self.refresh()
+
+    @classmethod
+    def get_registry(cls, fonts_dir: str) -> "FontRegistry":
+        """Get the process-wide registry for the directory.
+
+        :param fonts_dir: Parent dir to look for fonts in
+        :fonts_dir type: str
+        :return: registry shared by the whole process
+        :rtype: `FontRegistry`
+        """
+        key = str(pathlib.Path(fonts_dir).resolve())
+
+        with cls._registries_lock:
+            if key not in cls._registries:
+                cls._registries[key] = cls(fonts_dir)
+
+            return cls._registries[key]
+
+    @property
+    def paths(self) -> List[str]:
+        """Get paths to all valid fonts, rescan if the dir changed."""
+        self.refresh()
+        return list(self._paths)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Scan the directory again if its modification time changed.
+
+        :param force: scan even if the directory did not change
+        :force type: bool, optional
+        :return: True if the directory has been scanned, otherwise False
+        :rtype: bool
+        """
+        try:
+            mtime = os.stat(self.fonts_dir).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        if not force and mtime == self._mtime and self._paths:
+            return False
+
+        with self._lock:
+            found = sorted(
+                str(path) for path in util.find_files_by_ext(
+                    self.fonts_dir, self.__class__.FONT_FORMAT)
+            )
+
+            self._paths = [
+                path for path in found
+                if self._load(path, self.__class__.DEF_FONT_SIZE)
+            ]
+
+            for key in [k for k in self._fonts if k[0] not in self._paths]:
+                del self._fonts[key]  # font removed from the directory
+
+            self._mtime = mtime
+
+        return True
+
+    def get_font(self, path: str,
+                 size: int = DEF_FONT_SIZE) -> ImageFont.FreeTypeFont:
+        """Get loaded font.
+
+        :param path: A path to the font file
+        :path type: str
+        :param size: A font size
+        :size type: int, optional
+        :return: A font to draw text
+        :rtype: `PIL.ImageFont.FreeTypeFont`
+        :raises OSError: the font can't be loaded
+        """
+        key = (str(path), size)
+
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                return font
+
+        font = ImageFont.truetype(str(path), size=size)
+        self._store(key, font)
+
+        return font
+
+    def choice(self, rng: random.Random = None) -> str:
+        """Choose a random font.
+
+        :param rng: random numbers generator, default `random` module
+        :rng type: `random.Random`, optional
+        :return: A path to selected font
+        :rtype: str
+        """
+        paths = self.paths
+        assert paths != [], f"No valid fonts found in: {self.fonts_dir}"
+
+        return (rng or random).choice(paths)
+
+    def _load(self, path: str, size: int) -> bool:
+        """Load the font to check if it is valid.
+
+        :param path: A path to the font file
+        :path type: str
+        :param size: A font size
+        :size type: int
+        :return: True if the font is loaded, otherwise False
+        :rtype: bool
+        """
+        try:
+            self.get_font(path, size)
+
+        except OSError as e:
+            ExLogger().log(f"Font {path} can't be loaded: {e}\n")
+            return False
+
+        return True
+
+    def _store(self, key: Tuple[str, int],
+               font: ImageFont.FreeTypeFont) -> None:
+        """Put the font in the cache and drop the least recently used.
+
+        :param key: a font path and size
+        :key type: Tuple[str, int]
+        :param font: loaded font
+        :font type: `PIL.ImageFont.FreeTypeFont`
+        """
+        with self._lock:
+            self._fonts[key] = font
+            self._fonts.move_to_end(key)
+
+            while len(self._fonts) > self.max_cached:
+                self._fonts.popitem(last=False)
@@ -0,0 +1,174 @@
+"""In-process cache of decoded and resized base images."""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Tuple
+
+from Helpers import ExLogger
+from PIL import Image
+
+
+class ImageCache():
+    """Keep decoded and resized images in memory.
+
+    Images are keyed by (path, modification time, width), so a changed
+    file is decoded again. The least recently used images are dropped
+    when the cache takes more bytes than allowed.
+    The cache hands out copies, cached images are never drawn on.
+    :data DEF_MAX_BYTES: default byte budget of the cache
+    :DEF_MAX_BYTES type: int
+    :param max_bytes: byte budget of the cache
+    :max_bytes type: int, optional
+    """
+
+    DEF_MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, max_bytes: int = DEF_MAX_BYTES) -> None:
+        """Create an instance."""
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+
+        self._images = OrderedDict()  # key -> `PIL.Image`
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return count of cached images."""
+        return len(self._images)
+
+    def __getstate__(self) -> dict:
+        """Pickle only the budget, e.g. to send the cache to a process."""
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: dict) -> None:
+        """Unpickle as an empty cache with a new lock."""
+        self.__init__(state["max_bytes"])
+
+    @classmethod
+    def make_key(cls, path: str, width: int) -> Tuple[str, int, int]:
+        """Build the cache key for the image.
+
+        :param path: A path to the image file
+        :path type: str
+        :param width: width the image is resized to
+        :width type: int
+        :return: path, modification time and width
+        :rtype: Tuple[str, int, int]
+        :raises FileNotFoundError: file does not exist
+        """
+        return (os.path.abspath(path), os.stat(path).st_mtime_ns, width)
+
+    @classmethod
+    def image_bytes(cls, image: Image) -> int:
+        """Get count of bytes taken by the image pixels.
+
+        :param image: An image to measure
+        :image type: `PIL.Image`
+        :return: approximate size in bytes
+        :rtype: int
+        """
+        return image.size[0] * image.size[1] * len(image.getbands())
+
+    def get(self, path: str, width: int) -> Image:
+        """Get copy of the cached image.
+
+        :param path: A path to the image file
+        :path type: str
+        :param width: width the image is resized to
+        :width type: int
+        :return: copy of the image or None if it is not cached
+        :rtype: `PIL.Image`
+        """
+        key = self.make_key(path, width)
+
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                return None
+            self._images.move_to_end(key)
+
+        return image.copy()
+
+    def put(self, path: str, width: int, image: Image) -> None:
+        """Put the image in the cache.
+
+        The image must not be changed after it is cached.
+        :param path: A path to the image file
+        :path type: str
+        :param width: width the image is resized to
+        :width type: int
+        :param image: decoded and resized image
+        :image type: `PIL.Image`
+        """
+        size = self.image_bytes(image)
+        if size > self.max_bytes:  # too big to be cached at all
+            return
+
+        key = self.make_key(path, width)
+
+        with self._lock:
+            old = self._images.pop(key, None)
+            if old is not None:
+                self.nbytes -= self.image_bytes(old)
+
+            self._images[key] = image
+            self.nbytes += size
+
+            while self.nbytes > self.max_bytes:
+                _, dropped = self._images.popitem(last=False)
+                self.nbytes -= self.image_bytes(dropped)
+
+    def get_or_load(self, path: str, width: int,
+                    loader: Callable[[str, int], Image]) -> Image:
+        """Get copy of the cached image, load and cache it if missing.
+
+        :param path: A path to the image file
+        :path type: str
+        :param width: width the image is resized to
+        :width type: int
+        :param loader: function to open and resize the image
+        :loader type: Callable[[str, int], `PIL.Image`]
+        :return: copy of the image
+        :rtype: `PIL.Image`
+        """
+        image = self.get(path, width)
+
+        if image is None:
+            image = loader(path, width)
+            self.put(path, width, image)
+            image = image.copy()
+
+        return image
+
+    def warm(self, paths: Iterable[str], width: int,
+             loader: Callable[[str, int], Image]) -> threading.Thread:
+        """Load images in the background.
+
+        :param paths: paths to the image files
+        :paths type: Iterable[str]
+        :param width: width images are resized to
+        :width type: int
+        :param loader: function to open and resize the image
+        :loader type: Callable[[str, int], `PIL.Image`]
+        :return: started daemon thread
+        :rtype: `threading.Thread`
+        """
+        def load_all():
+            for path in paths:
+                try:
+                    if self.make_key(path, width) not in self._images:
+                        self.put(path, width, loader(path, width))
+
+                except (OSError, ValueError) as e:
+                    ExLogger().log(f"Can't cache image {path}: {e}\n")
+
+        thread = threading.Thread(target=load_all, daemon=True)
+        thread.start()
+
+        return thread
+
+    def clear(self) -> None:
+        """Remove all cached images."""
+        with self._lock:
+            self._images.clear()
+            self.nbytes = 0
@@ -1,16 +1,17 @@
 """Infractructure to draw caption on images."""
 
 import pathlib
-import textwrap
-from random import choice
-from string import ascii_letters
+from random import Random
 from typing import Dict, List, Tuple
 
-from Helpers import Utilities as util
+import numpy as np
 from Models.QuoteModel import QuoteModel
 from PIL import Image, ImageDraw, ImageFont
 
+from .ColorAnalyzer import ColorAnalyzer
 from .Exeptions.TextTooLongError import TextTooLongError
+from .FontRegistry import FontRegistry
+from .TextLayout import TextBlock, TextLayout
 
 
 class ImageCaptioner():
@@ -20,33 +21,65 @@ class ImageCaptioner():
     :FONT_FORMAT type: str
     :data DEF_FONTS_DIR: Parent dir with fonts files
     :DEF_FONTS_DIR type: str, default
-    :data FONT_SIZE: A font size
+    :data FONT_SIZE: the largest font size, used if the text fits
     :FONT_SIZE type: int
+    :data MIN_FONT_SIZE: the smallest font size the text
+        can be shrunk to before it is too long
+    :MIN_FONT_SIZE type: int
     :data IMG_MARGIN: margin of the image
     :IMG_MARGIN type: float
     :data SPACING: interline for multiline text
     :SPACING type: int
+    :data COLOR_STRATEGY: default `ColorAnalyzer` strategy
+    :COLOR_STRATEGY type: str
+    :data WRAP_METHOD: default `TextLayout` wrap method
+    :WRAP_METHOD type: str
+    :data OVERLAY_ALPHA: opacity of the text background, 0 - 255
+    :OVERLAY_ALPHA type: int
     :param image: An image to draw text on
     :type image: 'PIL.Image' object
     :param quote: A quote/text to draw
     :type quote: `QuoteModel` object
     :param fonts_dir: Parent dir to look for fonts in
     :type fonts: str, optional
+    :param color_strategy: strategy to find dominant image color,
+        one of `ColorAnalyzer.STRATEGIES`
+    :type color_strategy: str, optional
+    :param wrap_method: text wrap method, one of `TextLayout.METHODS`
+    :type wrap_method: str, optional
+    :param rng: random numbers generator for the font and text position,
+        default unseeded generator
+    :type rng: `random.Random`, optional
+    :param font_path: A path to the font to draw with,
+        default random font from `fonts_dir`
+    :type font_path: str, optional
     :return: `ImageCaptioner` instance
     """
 
     FONT_FORMAT = ".ttf"
     DEF_FONTS_DIR = "_data/_fonts"
     FONT_SIZE = 22
+    MIN_FONT_SIZE = 12
     IMG_MARGIN = 0.07
     SPACING = 4
+    COLOR_STRATEGY = "mode"
+    WRAP_METHOD = "greedy"
+    OVERLAY_ALPHA = 128
 
     def __init__(self, image: Image, quote: QuoteModel,
-                 fonts_dir: str = DEF_FONTS_DIR
+                 fonts_dir: str = DEF_FONTS_DIR,
+                 color_strategy: str = COLOR_STRATEGY,
+                 wrap_method: str = WRAP_METHOD,
+                 rng: Random = None,
+                 font_path: str = None
                  ) -> None:
         """Create an ImageCaptioner object."""
         self.image = image
         self.quote = quote
+        self.rng = rng if rng is not None else Random()
+        self.color_strategy = color_strategy
+        self.wrap_method = wrap_method
+        self.font_path = font_path
 
         self._canvas = self._get_canvas_size()
 
@@ -54,19 +87,23 @@ class ImageCaptioner():
             if fonts_dir != self.__class__.DEF_FONTS_DIR \
             else pathlib.Path(self.__class__.DEF_FONTS_DIR)
 
+        self._font_registry = FontRegistry.get_registry(self.fonts_dir)
+
         self.set_font_style()
 
     def set_font_style(self) -> ImageFont:
-        """Set random font path as an object field.
+        """Set the chosen or a random font as an object field.
 
         :return: A font to draw text
         :rtype: `PIL.ImageFont` instance
         """
-        fonts = self._get_fonts()
-        chosen_font = self._select_font(fonts)
+        chosen_font = self.font_path
+        if chosen_font is None:
+            chosen_font = self._select_font(self._get_fonts())
 
-        self._font = \
-            ImageFont.truetype(chosen_font, size=self.__class__.FONT_SIZE)
+        self._font_path = chosen_font
+        self._font = self._font_registry.get_font(
+            chosen_font, size=self.__class__.FONT_SIZE)
 
         return self._font
 
@@ -76,21 +113,116 @@ class ImageCaptioner():
         :return: drawable size of the image
         :rtype: tuple(int, int), first lenght, then height
         """
-        margin_rate = 1 - self.__class__.IMG_MARGIN * 2
+        return self.canvas_size(self.image.size)
+
+    @classmethod
+    def canvas_size(cls, image_size: Tuple[int, int]) -> Dict:
+        """Return drawable size of an image of the given size.
+
+        :param image_size: width and height of the image
+        :image_size type: Tuple[int, int]
+        :return: drawable size with keys `width` and `height`
+        :rtype: Dict
+        """
+        margin_rate = 1 - cls.IMG_MARGIN * 2
 
-        canvas_width = int(self.image.size[0] * margin_rate)
-        canvas_height = int(self.image.size[1] * margin_rate)
+        canvas_width = int(image_size[0] * margin_rate)
+        canvas_height = int(image_size[1] * margin_rate)
 
         return {"width": canvas_width, "height": canvas_height}
 
+    @classmethod
+    def layout_quote(cls, quote: QuoteModel, font: ImageFont,
+                     canvas_width: int,
+                     wrap_method: str = WRAP_METHOD) -> TextBlock:
+        """Lay the quote out the way it is drawn.
+
+        The quote is kept in one line if it fits the canvas width,
+        otherwise body and author are wrapped, each from a new line.
+        :param quote: A quote to lay out
+        :quote type: `QuoteModel`
+        :param font: A font to draw text
+        :font type: `PIL.ImageFont`
+        :param canvas_width: drawable width of the image
+        :canvas_width type: int
+        :param wrap_method: one of `TextLayout.METHODS`
+        :wrap_method type: str, optional
+        :return: laid out text with its size
+        :rtype: `TextBlock`
+        """
+        body = f"\"{quote.body}\""  # add `"` marks to body
+        author = f"-{quote.author}"  # add `-` mark to author
+
+        layout = TextLayout(font, spacing=cls.SPACING, method=wrap_method)
+        block = layout.single_line(f"{body} {author}")
+
+        if block.width > canvas_width:  # does not fit to one line
+            block = layout.wrap(  # body and author start with a new line
+                [body, author], canvas_width
+            )
+
+        return block
+
+    @classmethod
+    def fit_quote(cls, quote: QuoteModel, font_path: str, canvas: Dict,
+                  registry: FontRegistry,
+                  wrap_method: str = WRAP_METHOD) -> Tuple:
+        """Find the largest font size the quote fits the canvas with.
+
+        Sizes from `MIN_FONT_SIZE` to `FONT_SIZE` are binary searched,
+        each step is a single layout using cached glyph advances.
+        :param quote: A quote to lay out
+        :quote type: `QuoteModel`
+        :param font_path: A path to the font
+        :font_path type: str
+        :param canvas: drawable size with keys `width` and `height`
+        :canvas type: Dict
+        :param registry: registry to load the font sizes from
+        :registry type: `FontRegistry`
+        :param wrap_method: one of `TextLayout.METHODS`
+        :wrap_method type: str, optional
+        :return: font and laid out text, the smallest size
+            if the quote does not fit at all
+        :rtype: Tuple[`PIL.ImageFont`, `TextBlock`]
+        """
+        def layout(size):
+            font = registry.get_font(font_path, size=size)
+            return font, cls.layout_quote(
+                quote, font, canvas["width"], wrap_method)
+
+        def fits(block):
+            return block.width <= canvas["width"] \
+                and block.height <= canvas["height"]
+
+        low, high = cls.MIN_FONT_SIZE, cls.FONT_SIZE
+
+        best = layout(high)
+        if fits(best[1]):  # most quotes fit in the largest size
+            return best
+
+        best = layout(low)
+        if not fits(best[1]):
+            return best
+
+        high -= 1
+        while low < high:  # `low` always fits
+            size = (low + high + 1) // 2
+            candidate = layout(size)
+
+            if fits(candidate[1]):
+                low, best = size, candidate
+            else:
+                high = size - 1
+
+        return best
+
     def _get_fonts(self) -> List[str]:
         """Get paths to all found fonts in defined dir.
 
         :return: A collection of paths to found fonts
         :rtype: A list of str
         """
-        fonts = util.find_files_by_ext(
-            self.fonts_dir, self.__class__.FONT_FORMAT)
+        fonts = self._font_registry.paths
         assert fonts != []
 
         return fonts
@@ -103,7 +235,7 @@ class ImageCaptioner():
         :return: A path to selected font
         :rtype: str
         """
-        return choice(fonts)
+        return self.rng.choice(fonts)
 
     def run(self) -> Image:
         """Add a quote to the image.
@@ -111,45 +243,23 @@ class ImageCaptioner():
         :return: An `PIL.Image` object with drawn caption
         :rtype: `PIL.Image`
         """
-        self.quote.body = f"\"{self.quote.body}\""  # add `"` marks to body
-        self.quote.author = f"-{self.quote.author}"  # add `-` mark to author
-
-        text_to_draw = f"{self.quote.body} {self.quote.author}"
-
-        text_size_pixels = \
-            self._get_text_size(text_to_draw)  # text size in pixels
-
-        if text_size_pixels[0] <= self._canvas["width"]:  # fit to one line
-            pass  # leave text_text to draw in this format
-
-        else:  # Doen not fit to one line
-
-            author_size_pixel = \
-                self._get_text_size(str(self.quote.author))  # author size
+        return self.apply(self.image, self.plan())
 
-            body_size_pixel = \
-                self._get_text_size(str(self.quote.body))  # body size
+    def plan(self) -> Dict:
+        """Compute everything needed to draw the caption.
 
-            wrap_width = \
-                self._max_char_count(self._canvas["width"])  # max char count
-
-            if body_size_pixel[0] <= self._canvas["width"]:  # if body fit
-                text_to_draw = self.quote.body + "\n"  # draw body + new line
-
-            if body_size_pixel[0] > self._canvas["width"]:  # body not fit
-                text_to_draw = \
-                    self._wrap_text(self.quote.body, wrap_width)  # wrap body
-
-            if author_size_pixel[0] <= self._canvas["width"]:
-                text_to_draw += \
-                    self.quote.author  # author fits to the line
-
-            if author_size_pixel[0] > self._canvas["width"]:  # author not fit
-                wrap_width = self._max_char_count(self._canvas["width"])
-                text_to_draw += \
-                    self._wrap_text(self.quote.author, wrap_width)  # wrap
+        Layout, position and colors are computed once, so the same
+        caption can be drawn on every frame of an animation.
+        :return: caption plan with keys `text`, `size`, `coord`
+            and `background`
+        :rtype: Dict
+        """
+        self._font, block = self.fit_quote(  # the largest fitting size
+            self.quote, self._font_path, self._canvas,
+            self._font_registry, self.wrap_method)
 
-        final_text_size = self._get_text_size(text_to_draw)  # final text size
+        text_to_draw = block.text
+        final_text_size = block.size  # final text size
 
         if not self._is_enough_space(final_text_size):  # is text fits canvas
             raise TextTooLongError(
@@ -160,25 +270,51 @@ class ImageCaptioner():
         text_coord = \
             self._get_text_coord(final_text_size)  # random text coordinations
 
+        background = self._get_most_common_color(  # computed once per meme
+            {"x": text_coord["x"], "y": text_coord["y"],
+             "width": final_text_size[0], "height": final_text_size[1]}
+        )
+
+        return {"text": text_to_draw, "size": final_text_size,
+                "coord": text_coord, "background": background}
+
+    def apply(self, image: Image, plan: Dict) -> Image:
+        """Draw the planned caption on the image.
+
+        :param image: An image or animation frame of the planned size
+        :image type: `PIL.Image`
+        :param plan: caption plan returned by `plan`
+        :plan type: Dict
+        :return: An `PIL.Image` object with drawn caption
+        :rtype: `PIL.Image`
+        """
+        self.image = image
+
         self._draw_text_background(  # draw text backgroung
-                                   final_text_size,
-                                   text_coord
+                                   plan["size"],
+                                   plan["coord"],
+                                   plan["background"]
                                     )
 
-        self._draw(text_to_draw, text_coord)  # # draw final text
+        self._draw(  # draw final text
+            plan["text"], plan["coord"], plan["background"])
         return self.image
 
-    def _draw(self, text: str, text_coord: Dict) -> None:
+    def _draw(self, text: str, text_coord: Dict,
+              background: Tuple[int, int, int]) -> None:
         """Draw text on the image.
 
         Private method to encapsulate drawing text on the image.
         Check if the text is multiline or single line.
         :param text: text to draw
         :text type: str
+        :param text_coord: top-left corner of the text
+        :text_coord type: Dict
+        :param background: color of the text background
+        :background type: Tuple[int, int, int]
         """
         # Set up font color
-        rgb = self._get_most_common_color()
-        rgb = self._invert_color(rgb)
+        rgb = self._invert_color(background)
         color = self._rgb_to_hex(rgb)
 
         draw = ImageDraw.Draw(im=self.image)
@@ -207,49 +343,6 @@ class ImageCaptioner():
 
         return False
 
-    def _get_text_size(self, text: str) -> Tuple[int, int]:
-        """Get size of the text in pixels.
-
-        :param text: Text to measure
-        :type text: str
-        :return: With and height in pixels
-        :rtype: tuple[int,int]
-        """
-        if self._is_text_multiline:
-            return self._font.getsize_multiline(
-                text, spacing=self.__class__.SPACING
-            )
-
-        return self._font.getsize(text)
-
-    def _max_char_count(self, canvas_width: int) -> int:
-        """Get max char count can be fitted to canvas with.
-
-        :param canvas_width: Pixel count to use for drawing
-        :canvas_width type: int
-        :return: max char count fitted to canvas width
-        :rtype: int
-        """
-        # Get avg width of ascii char for defined font
-        avg_char_width = \
-            sum(self._font.getsize(char)[0] for char in ascii_letters) \
-            / len(ascii_letters)
-
-        return util.round_up(canvas_width / avg_char_width)
-
-    def _wrap_text(self, text: str, width_: int) -> str:
-        r"""Wrap text to the width.
-
-        :param text: Text to wrap
-        :type text: str
-        :param width: Max with of a single text line
-        :type width: str
-        :return: A wrapped text with `\n` as a new line
-        :rtype: str
-        """
-        lines = textwrap.fill(text, width_)
-        return lines + "\n"
-
     def _is_enough_space(self, text_size: Tuple[int, int]) -> bool:
         """Check if final text size is not bigger than canvas itself.
 
@@ -277,45 +370,95 @@ class ImageCaptioner():
         width_diff = self._canvas["width"] - text_size[0]
         height_diff = self._canvas["height"] - text_size[1]
 
-        x_pos = choice(range(0, width_diff))
-        y_pos = choice(range(0, height_diff))
+        x_pos = self.rng.choice(range(0, width_diff + 1))
+        y_pos = self.rng.choice(range(0, height_diff + 1))
 
         return {"x": x_pos, "y": y_pos}
 
-    def _draw_text_background(self,
-                              size: Tuple[int, int], pos: Dict) -> None:
+    def _draw_text_background(self, size: Tuple[int, int], pos: Dict,
+                              color: Tuple[int, int, int]) -> None:
         """Add half-opacity overlay as a background for the text.
 
+        Only the box under the text is blended with the color
+        using a lookup table and written back, the rest of the image
+        is not touched and no full-size overlay is created.
         :param size: text size
         :size tyle: Tuple[int, int]
         :param pos: top-left corner of the text
         :pos type: Dict
+        :param color: overlay color
+        :color type: Tuple[int, int, int]
         """
         padding = 1.05  # Add padding for the text
 
         re_size = tuple([int(x*padding) for x in size])  # recalculate size
-        color = self._get_most_common_color()  # dominant image color
-
-        overlay = Image.new('RGBA', re_size, color=color)  # create overlay
-
-        overlay.putalpha(128)  # Add opacity
 
         # Adjust text position to padding
         offset = (re_size[0] - size[0], re_size[1] - size[1])
         position = (
              pos["x"] - int(offset[0] / 2), pos['y'] - int(offset[1] / 2))
 
-        self.image.paste(overlay, position, overlay)
+        box = (  # clip the box to the image bounds
+            max(position[0], 0), max(position[1], 0),
+            min(position[0] + re_size[0], self.image.width),
+            min(position[1] + re_size[1], self.image.height)
+        )
+        if box[0] >= box[2] or box[1] >= box[3]:
+            return
+
+        if self.image.mode not in ("RGB", "RGBA", "L"):
+            self.image = self.image.convert("RGB")
+
+        region = self.image.crop(box)
+        region = region.point(self._blend_table(color, region.mode))
+        self.image.paste(region, box[:2])
+
+    def _blend_table(self, color: Tuple[int, int, int],
+                     mode: str) -> List[int]:
+        """Build lookup table blending each band with the color.
+
+        Matches pasting the color with `OVERLAY_ALPHA` opacity mask.
+        Alpha band of RGBA image is kept.
+        :param color: overlay color
+        :color type: Tuple[int, int, int]
+        :param mode: mode of the image, `RGB`, `RGBA` or `L`
+        :mode type: str
+        :return: table for `PIL.Image.point`, 256 entries per band
+        :rtype: List[int]
+        """
+        alpha = self.__class__.OVERLAY_ALPHA
 
-    def _get_most_common_color(self):
-        """Get image colors sorted from the less common to the most common."""
-        image = self.image.convert('RGB')
-        colors = sorted(
-            Image.Image.getcolors(
-                image, maxcolors=self.image.size[0]*self.image.size[1]
-                )
+        if mode == "L":  # the same grey level as `PIL.Image.convert`
+            color = (
+                (color[0] * 299 + color[1] * 587 + color[2] * 114) // 1000,
             )
-        return colors[-2][1]
+
+        values = np.arange(256)
+        table = (
+            values * (255 - alpha) + np.array(color)[:, np.newaxis] * alpha
+            + 127) // 255
+
+        if mode == "RGBA":
+            table = np.vstack((table, values))
+
+        return table.ravel().tolist()
+
+    def _get_most_common_color(self, region: Dict = None
+                               ) -> Tuple[int, int, int]:
+        """Get dominant color of the image.
+
+        The image is analysed on a thumbnail, only once per captioner.
+        :param region: box under the text with keys `x`, `y`,
+            `width` and `height`
+        :region type: Dict, optional
+        :return: rgb color
+        :rtype: Tuple[int, int, int]
+        """
+        if self.__dict__.get("_color_analyzer") is None:
+            self._color_analyzer = \
+                ColorAnalyzer(self.image, self.color_strategy)
+
+        return self._color_analyzer.get_color(region)
 
     def _invert_color(self, rgb: Tuple[int, int, int]
                       ) -> Tuple[int, int, int]:
@@ -0,0 +1,212 @@
+"""Encode images using selectable formats and settings."""
+
+from typing import BinaryIO, Dict, Iterable, Tuple
+
+from PIL import GifImagePlugin, Image
+
+
+class ImageEncoder():
+    """Encode `PIL.Image` objects with the given format and settings.
+
+    :data PROFILES: predefined encoder settings:
+        `png` default zlib compression,
+        `png-fast` low compression, fast to encode,
+        `jpeg` progressive JPEG,
+        `webp` lossy WebP,
+        `webp-lossless` lossless WebP,
+        `gif` GIF, the only profile for animations besides WebP ones
+    :PROFILES type: Dict[str, Dict]
+    :data DEF_PROFILE: profile used if none is selected
+    :DEF_PROFILE type: str
+    :data EXTENSIONS: file extension of each format
+    :EXTENSIONS type: Dict[str, str]
+    :data MIMETYPES: mimetype of each format
+    :MIMETYPES type: Dict[str, str]
+    :data ANIMATED_FORMATS: formats able to hold an animation
+    :ANIMATED_FORMATS type: Tuple[str]
+    :data ANIMATED_PROFILE: profile used for animations if the selected
+        format can't hold one
+    :ANIMATED_PROFILE type: str
+    :param format: Pillow format name, one of `EXTENSIONS` keys
+    :format type: str, optional
+    :param options: Pillow save options, e.g. `quality`
+    :options type: Dict
+    :raises ValueError: unsupported format
+    """
+
+    PROFILES = {
+        "png": {"format": "PNG"},
+        "png-fast": {"format": "PNG", "compress_level": 1},
+        "jpeg": {"format": "JPEG", "quality": 85, "progressive": True},
+        "webp": {"format": "WEBP", "quality": 80, "method": 4},
+        "webp-lossless": {"format": "WEBP", "lossless": True,
+                          "quality": 50, "method": 4},
+        "gif": {"format": "GIF"},
+    }
+    DEF_PROFILE = "png"
+
+    EXTENSIONS = {"PNG": ".png", "JPEG": ".jpg", "WEBP": ".webp",
+                  "GIF": ".gif"}
+    MIMETYPES = {"PNG": "image/png", "JPEG": "image/jpeg",
+                 "WEBP": "image/webp", "GIF": "image/gif"}
+
+    ANIMATED_FORMATS = ("GIF", "WEBP")
+    ANIMATED_PROFILE = "gif"
+
+    def __init__(self, format: str = "PNG", **options) -> None:
+        """Create an instance."""
+        format = format.upper()
+        if format not in self.__class__.EXTENSIONS:
+            raise ValueError(
+                f"Unsupported output format: {format}. Expected one of: "
+                f"{', '.join(self.__class__.EXTENSIONS)}."
+            )
+
+        self.format = format
+        self.options = options
+
+    @classmethod
+    def from_profile(cls, profile: str = DEF_PROFILE,
+                     **options) -> "ImageEncoder":
+        """Create an encoder from the predefined profile.
+
+        :param profile: one of `PROFILES` keys
+        :profile type: str, optional
+        :param options: Pillow save options overriding the profile ones,
+            None values are ignored
+        :options type: Dict
+        :return: encoder
+        :rtype: `ImageEncoder`
+        :raises ValueError: unknown profile
+        """
+        if profile not in cls.PROFILES:
+            raise ValueError(
+                f"Unknown encoder profile: {profile}. Expected one of: "
+                f"{', '.join(cls.PROFILES)}."
+            )
+
+        settings = dict(cls.PROFILES[profile])
+        settings.update(
+            {key: val for key, val in options.items() if val is not None})
+
+        return cls(**settings)
+
+    @property
+    def is_animated(self) -> bool:
+        """Check if the format can hold an animation."""
+        return self.format in self.__class__.ANIMATED_FORMATS
+
+    @property
+    def extension(self) -> str:
+        """Get file extension of the encoded image, with period."""
+        return self.__class__.EXTENSIONS[self.format]
+
+    @property
+    def mimetype(self) -> str:
+        """Get mimetype of the encoded image."""
+        return self.__class__.MIMETYPES[self.format]
+
+    @property
+    def settings(self) -> Dict:
+        """Get format and all options of the encoder."""
+        return {"format": self.format, **self.options}
+
+    def encode(self, image: Image, fp: BinaryIO) -> None:
+        """Encode the image.
+
+        :param image: image to encode
+        :image type: `PIL.Image`
+        :param fp: file name or writable binary stream
+        :fp type: str or BinaryIO
+        """
+        image = self._prepare(image)
+        image.save(fp, format=self.format, **self.options)
+
+    def encode_frames(self, frames: Iterable[Tuple[Image, int]],
+                      fp: BinaryIO) -> None:
+        """Encode an animation.
+
+        GIF frames are written one by one as they come, so only
+        a single frame is kept in memory. Pillow's WebP writer
+        collects all frames before it encodes them.
+        :param frames: (frame, duration in milliseconds) pairs
+        :frames type: Iterable[Tuple[`PIL.Image`, int]]
+        :param fp: file name or writable binary stream
+        :fp type: str or BinaryIO
+        :raises ValueError: the format can't hold an animation
+            or there are no frames
+        """
+        if not self.is_animated:
+            raise ValueError(f"{self.format} can't hold an animation.")
+
+        if isinstance(fp, str):
+            with open(fp, "wb") as file:
+                return self.encode_frames(frames, file)
+
+        if self.format == "GIF":
+            return self._write_gif(frames, fp)
+
+        images, durations = [], []
+        for frame, duration in frames:
+            images.append(self._prepare(frame))
+            durations.append(duration)
+
+        if not images:
+            raise ValueError("There are no frames to encode.")
+
+        images[0].save(fp, format=self.format, save_all=True,
+                       append_images=images[1:], duration=durations,
+                       loop=0, **self.options)
+
+    def _write_gif(self, frames: Iterable[Tuple[Image, int]],
+                   fp: BinaryIO) -> None:
+        """Write GIF animation frame by frame.
+
+        Each frame gets its own palette, fast octree quantization
+        is used since it is many times faster than median cut.
+        :param frames: (frame, duration in milliseconds) pairs
+        :frames type: Iterable[Tuple[`PIL.Image`, int]]
+        :param fp: writable binary stream
+        :fp type: BinaryIO
+        :raises ValueError: there are no frames
+        """
+        count = 0
+        for frame, duration in frames:
+            frame = frame.convert("RGB").quantize(method=Image.FASTOCTREE)
+
+            if not count:  # the first frame defines the screen
+                header, _ = GifImagePlugin.getheader(
+                    frame, info={"loop": 0, "duration": duration})
+                fp.write(b"".join(header))
+
+            fp.write(b"".join(GifImagePlugin.getdata(
+                frame, duration=duration, include_color_table=True)))
+            count += 1
+
+        if not count:
+            raise ValueError("There are no frames to encode.")
+
+        fp.write(b";")  # GIF trailer
+
+    def _prepare(self, image: Image) -> Image:
+        """Convert the image to a mode supported by the format.
+
+        :param image: image to convert
+        :image type: `PIL.Image`
+        :return: the same image if its mode is supported,
+            otherwise its converted copy
+        :rtype: `PIL.Image`
+        """
+        if self.format == "JPEG" and image.mode not in ("RGB", "L", "CMYK"):
+            return image.convert("RGB")
+
+        if self.format == "WEBP" and image.mode not in ("RGB", "RGBA"):
+            return image.convert(
+                "RGBA" if "transparency" in image.info
+                or image.mode in ("LA", "PA") else "RGB")
+
+        return image
+
+    def __repr__(self) -> str:
+        """Return string representation of an ImageEncoder."""
+        return f"ImageEncoder({self.settings})"
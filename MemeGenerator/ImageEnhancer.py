@@ -1,17 +1,32 @@
 """Enhance image changing its colors."""
 
 from abc import ABC, abstractmethod
+from random import Random
+from typing import List, Sequence
 
+import numpy as np
 from Helpers import Utilities as util
-from PIL import Image, ImageEnhance
+from PIL import Image, ImageEnhance, ImageFilter
 
 
 class ImageEnhancerInterface(ABC):
-    """Provides infracture interface to enhance image."""
+    """Provides infracture interface to enhance image.
+
+    :data FACTOR_RANGE: range a random factor is drawn from
+    :FACTOR_RANGE type: Tuple[float, float]
+    :data KIND: adjusted property, used by `EnhancerChain` to fuse
+        enhancers, one of `EnhancerChain.TONE_KINDS`
+        or `EnhancerChain.DETAIL_KINDS`
+    :KIND type: str
+    """
+
+    FACTOR_RANGE = (1.0, 1.0)
+    KIND = None
 
     @classmethod
     @abstractmethod
-    def enhance(cls, image: Image, factor: float) -> Image:
+    def enhance(cls, image: Image, factor: float = None,
+                rng: Random = None) -> Image:
         """Enhance given Image interface.
 
         :param image: An image to enhance
@@ -19,20 +34,35 @@ class ImageEnhancerInterface(ABC):
         :param factor: The factor changes the brithness of the image.
             1 is an original image brightness. 0 dark image,
             values above 1 make the image brigther
-        :factor type: float
+        :factor type: float, optional
+        :param rng: random numbers generator to draw the factor with
+        :rng type: `random.Random`, optional
         :return: transformed image
         :rtype: `PIL.Image`
         """
         pass
 
+    @classmethod
+    def draw_factor(cls, rng: Random = None) -> float:
+        """Draw a random factor from `FACTOR_RANGE`.
+
+        :param rng: random numbers generator, default `random` module
+        :rng type: `random.Random`, optional
+        :return: random factor
+        :rtype: float
+        """
+        return util.draw_float(*cls.FACTOR_RANGE, rng=rng)
+
 
 class BrightnessImageEnhancer(ImageEnhancerInterface):
     """Provides methods for adjust image brightness."""
 
+    FACTOR_RANGE = (0.4, 0.8)
+    KIND = "brightness"
+
     @classmethod
-    def enhance(cls, image: Image,
-                factor: float = util.draw_float(0.4, 0.8)
-                ) -> Image:
+    def enhance(cls, image: Image, factor: float = None,
+                rng: Random = None) -> Image:
         """Adjust brightness of the image.
 
         :param image: An image to enhance
@@ -42,9 +72,14 @@ class BrightnessImageEnhancer(ImageEnhancerInterface):
             values above 1 make the image brigther,
             default random number from 0.4 to 0.8
         :factor type: float, optional
+        :param rng: random numbers generator to draw the factor with
+        :rng type: `random.Random`, optional
         :return: transformed image
         :rtype: `PIL.Image`
         """
+        if factor is None:
+            factor = cls.draw_factor(rng)
+
         assert isinstance(factor, float) and factor >= 0
         filter = ImageEnhance.Brightness(image)
 
@@ -54,10 +89,12 @@ class BrightnessImageEnhancer(ImageEnhancerInterface):
 class ColorImageEnhancer(ImageEnhancerInterface):
     """Provides methods for adjust image brightness."""
 
+    FACTOR_RANGE = (0.2, 0.8)
+    KIND = "color"
+
     @classmethod
-    def enhance(cls, image: Image,
-                factor: float = util.draw_float(0.2, 0.8)
-                ) -> Image:
+    def enhance(cls, image: Image, factor: float = None,
+                rng: Random = None) -> Image:
         """Adjust color of the image.
 
         :param image: An image to enhance
@@ -66,9 +103,14 @@ class ColorImageEnhancer(ImageEnhancerInterface):
             1.0 is an original image, 0.0 is a black and white image,
             default random value from 0.2 to 0.8
         :factor type: float, optional
+        :param rng: random numbers generator to draw the factor with
+        :rng type: `random.Random`, optional
         :return: transformed image
         :rtype: `PIL.Image`
         """
+        if factor is None:
+            factor = cls.draw_factor(rng)
+
         assert isinstance(factor, float) and factor >= 0
         filter = ImageEnhance.Color(image)
 
@@ -78,10 +120,12 @@ class ColorImageEnhancer(ImageEnhancerInterface):
 class ContrastImageEnhancer(ImageEnhancerInterface):
     """Provides methods for adjust image contrast."""
 
+    FACTOR_RANGE = (0.0, 1.0)
+    KIND = "contrast"
+
     @classmethod
-    def enhance(cls, image: Image,
-                factor: float = util.draw_float(0.0, 1.0)
-                ) -> Image:
+    def enhance(cls, image: Image, factor: float = None,
+                rng: Random = None) -> Image:
         """Adjust contrast of the image.
 
         :param image: An image to enhance
@@ -90,9 +134,14 @@ class ContrastImageEnhancer(ImageEnhancerInterface):
             1.0 is an original image, 0.0 solid grey image
             defaults random from 0.0 to 1.0
         :factor type: float, optional
+        :param rng: random numbers generator to draw the factor with
+        :rng type: `random.Random`, optional
         :return: transformed image
         :rtype: `PIL.Image`
         """
+        if factor is None:
+            factor = cls.draw_factor(rng)
+
         assert isinstance(factor, float) and factor >= 0
         filter = ImageEnhance.Contrast(image)
 
@@ -102,10 +151,12 @@ class ContrastImageEnhancer(ImageEnhancerInterface):
 class SharpnessImageEnhancer(ImageEnhancerInterface):
     """Provides methods for adjust image sharpness."""
 
+    FACTOR_RANGE = (0.0, 4.0)
+    KIND = "sharpness"
+
     @classmethod
-    def enhance(cls, image: Image,
-                factor: float = util.draw_float(0.0, 4.0)
-                ) -> Image:
+    def enhance(cls, image: Image, factor: float = None,
+                rng: Random = None) -> Image:
         """Adjust sharpness of the image.
 
         :param image: An image to enhance
@@ -115,10 +166,197 @@ class SharpnessImageEnhancer(ImageEnhancerInterface):
             values above 1 make the image sharpened,
             defaults random value from 0.0 to 4.0
         :factor type: float, optional
+        :param rng: random numbers generator to draw the factor with
+        :rng type: `random.Random`, optional
         :return: transformed image
         :rtype: `PIL.Image`
         """
+        if factor is None:
+            factor = cls.draw_factor(rng)
+
         assert isinstance(factor, float) and factor >= 0
         filter = ImageEnhance.Sharpness(image)
 
         return filter.enhance(factor)
+
+
+class EnhancerChain():
+    """Apply several enhancers at once.
+
+    Brightness and contrast are folded into one lookup table applied
+    with `PIL.Image.point`. Sharpness is a single convolution and color
+    a single band transform, both done by Pillow. Tone enhancers run
+    first in the order of the chain, then sharpness and color.
+    The result matches applying the `PIL.ImageEnhance` classes one
+    by one, up to rounding, without creating an image per enhancer.
+    :data TONE_KINDS: kinds fused into the lookup table
+    :TONE_KINDS type: Tuple[str]
+    :data DETAIL_KINDS: kinds applied after the lookup table
+    :DETAIL_KINDS type: Tuple[str]
+    :data LUMA: weights of RGB bands in the grey level,
+        the same as `PIL.Image.convert("L")` uses
+    :LUMA type: Tuple[float, float, float]
+    :param enhancers: enhancer classes to apply
+    :enhancers type: `ImageEnhancerInterface`
+    :raises ValueError: enhancer with unknown kind
+    """
+
+    TONE_KINDS = ("brightness", "contrast")
+    DETAIL_KINDS = ("sharpness", "color")
+    LUMA = (0.299, 0.587, 0.114)
+
+    def __init__(self, *enhancers: ImageEnhancerInterface) -> None:
+        """Create an instance."""
+        kinds = self.__class__.TONE_KINDS + self.__class__.DETAIL_KINDS
+        for enhancer in enhancers:
+            if enhancer.KIND not in kinds:
+                raise ValueError(
+                    f"Can't chain enhancer {enhancer.__name__} "
+                    f"of kind {enhancer.KIND}.")
+
+        self.enhancers = tuple(enhancers)
+
+    def draw_factor(self, rng: Random = None) -> List[float]:
+        """Draw a random factor of each enhancer.
+
+        :param rng: random numbers generator, default `random` module
+        :rng type: `random.Random`, optional
+        :return: factors in the chain order
+        :rtype: List[float]
+        """
+        return [enhancer.draw_factor(rng) for enhancer in self.enhancers]
+
+    def enhance(self, image: Image, factor: Sequence[float] = None,
+                rng: Random = None) -> Image:
+        """Apply all enhancers of the chain.
+
+        :param image: An image to enhance
+        :image type: `PIL.Image`
+        :param factor: factor of each enhancer in the chain order,
+            default factors drawn at random from their ranges
+        :factor type: Sequence[float], optional
+        :param rng: random numbers generator to draw the factors with
+        :rng type: `random.Random`, optional
+        :return: transformed image
+        :rtype: `PIL.Image`
+        """
+        factors = self.draw_factor(rng) if factor is None else factor
+        assert len(factors) == len(self.enhancers)
+        assert all(f >= 0 for f in factors)
+
+        steps = list(zip((e.KIND for e in self.enhancers), factors))
+        tone = [(k, f) for k, f in steps if k in self.__class__.TONE_KINDS]
+        detail = sorted(
+            ((k, f) for k, f in steps if k in self.__class__.DETAIL_KINDS),
+            key=lambda step: self.__class__.DETAIL_KINDS.index(step[0]))
+
+        alpha = None
+        if image.mode == "RGBA":
+            alpha = image.getchannel("A")
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        if tone:
+            image = image.point(self._tone_table(image, tone))
+
+        if detail:
+            image = self._apply_detail(image, detail)
+
+        if alpha is not None:
+            image.putalpha(alpha)
+
+        return image
+
+    def _tone_table(self, image: Image, steps: list) -> List[int]:
+        """Fold brightness and contrast steps into one lookup table.
+
+        Contrast needs the mean grey level of the image it is applied
+        to, it is computed from the band histograms mapped through
+        the steps before it, so the image is not read twice.
+        :param image: RGB or L image to build the table for
+        :image type: `PIL.Image`
+        :param steps: (kind, factor) pairs
+        :steps type: List[Tuple[str, float]]
+        :return: table for `PIL.Image.point`, 256 entries per band
+        :rtype: List[int]
+        """
+        hist = np.array(image.histogram(), dtype=np.float64).reshape(-1, 256)
+        weights = self.__class__.LUMA if len(hist) == 3 else (1.0,)
+        table = np.arange(256, dtype=np.float64)
+
+        for kind, factor in steps:
+            if kind == "brightness":
+                table = table * factor
+            else:
+                means = hist @ table / max(hist[0].sum(), 1)
+                mean = int(np.dot(weights, means) + 0.5)
+                table = mean + factor * (table - mean)
+
+            table = np.clip(table, 0, 255)
+
+        table = np.rint(table).astype(np.uint8)
+
+        return table.tolist() * len(hist)
+
+    def _apply_detail(self, image: Image, steps: list) -> Image:
+        """Apply sharpness and color steps.
+
+        Sharpness blends the image with its smoothed copy, which is
+        the same as one convolution with a blended kernel.
+        Color blends the image with its grey level, which is one
+        linear transform of RGB bands.
+        :param image: RGB or L image
+        :image type: `PIL.Image`
+        :param steps: (kind, factor) pairs
+        :steps type: List[Tuple[str, float]]
+        :return: new image
+        :rtype: `PIL.Image`
+        """
+        for kind, factor in steps:
+            if kind == "sharpness":
+                image = image.filter(self._sharpness_kernel(factor))
+
+            elif image.mode == "RGB":  # color of grey image never changes
+                image = image.convert("RGB", self._color_matrix(factor))
+
+        return image
+
+    @classmethod
+    def _sharpness_kernel(cls, factor: float) -> ImageFilter.Kernel:
+        """Blend `ImageFilter.SMOOTH` kernel with the identity one.
+
+        :param factor: sharpness factor, 1 keeps the image
+        :factor type: float
+        :return: 3x3 kernel
+        :rtype: `PIL.ImageFilter.Kernel`
+        """
+        smooth = ImageFilter.SMOOTH
+        weights = [
+            (1 - factor) * weight / smooth.filterargs[1]
+            for weight in smooth.filterargs[3]
+        ]
+        weights[len(weights) // 2] += factor
+
+        return ImageFilter.Kernel(smooth.filterargs[0], weights, scale=1)
+
+    @classmethod
+    def _color_matrix(cls, factor: float) -> List[float]:
+        """Blend the grey level transform with the identity one.
+
+        :param factor: color factor, 1 keeps the image
+        :factor type: float
+        :return: 12-tuple matrix for `PIL.Image.convert`
+        :rtype: List[float]
+        """
+        matrix = []
+        for band in range(3):
+            row = [(1 - factor) * weight for weight in cls.LUMA]
+            row[band] += factor
+            matrix += row + [0.0]
+
+        return matrix
+
+    def __repr__(self) -> str:
+        """Return string representation of an EnhancerChain."""
+        names = ", ".join(enhancer.__name__ for enhancer in self.enhancers)
+        return f"EnhancerChain({names})"
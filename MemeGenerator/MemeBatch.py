@@ -0,0 +1,106 @@
+"""Render many memes across worker processes."""
+
+import random
+from typing import Dict, Iterable
+
+from Models.QuoteModel import QuoteModel
+from Models.QuoteStore import QuoteStore
+
+_engine = None  # worker process engine, set by `init_worker`
+_quotes = QuoteStore()  # worker process quotes, set by `init_worker`
+
+
+class MemeJobResult():
+    """Represent result of a single batch job.
+
+    :param index: position of the job in the batch
+    :index type: int
+    :param img_path: A path to the image file
+    :img_path type: str
+    :param quote: drawn quote, None if the job failed before choosing it
+    :quote type: `QuoteModel`
+    :param path: A path to generated meme, None if the job failed
+    :path type: str
+    :param error: exception raised by the job, None if it succeeded
+    :error type: Exception
+    """
+
+    def __init__(self, index: int, img_path: str, quote: QuoteModel = None,
+                 path: str = None, error: Exception = None) -> None:
+        """Create an instance."""
+        self.index = index
+        self.img_path = img_path
+        self.quote = quote
+        self.path = path
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """Check if the job succeeded."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        """Return string representation of a MemeJobResult."""
+        result = self.path if self.ok else repr(self.error)
+        return f"MemeJobResult({self.index}, {self.img_path}: {result})"
+
+
+def init_worker(engine_cls: type, engine_kwargs: Dict,
+                enhancer: object, quotes: Iterable[QuoteModel]) -> None:
+    """Set up a worker process, run once per process.
+
+    Creating the engine loads and checks all fonts, quotes are kept
+    to draw a random one for jobs which do not define it.
+    :param engine_cls: class of the engine to render memes with
+    :engine_cls type: type
+    :param engine_kwargs: arguments to create the engine
+    :engine_kwargs type: Dict
+    :param enhancer: enhancer set on the engine
+    :enhancer type: `ImageEnhancerInterface`
+    :param quotes: quotes to draw from, a `QuoteStore` is sent
+        to the worker in a few buffers instead of an object per quote
+    :quotes type: Iterable[QuoteModel]
+    """
+    global _engine, _quotes
+
+    _engine = engine_cls(**engine_kwargs)
+    _engine.enhancer = enhancer
+    _quotes = quotes if isinstance(quotes, QuoteStore) \
+        else QuoteStore(quotes or [])
+
+
+def render_job(index: int, img_path: str, quote: object,
+               options: Dict) -> MemeJobResult:
+    """Render a single job in a worker process.
+
+    :param index: position of the job in the batch
+    :index type: int
+    :param img_path: A path to the image file
+    :img_path type: str
+    :param quote: `QuoteModel`, (body, author) pair
+        or None for a random quote
+    :quote type: object
+    :param options: keyword arguments of `MemeEngine.make_meme`
+    :options type: Dict
+    :return: result of the job, it never raises
+    :rtype: `MemeJobResult`
+    """
+    result = MemeJobResult(index, img_path)
+
+    try:
+        if quote is None:
+            assert _quotes, "No quotes to draw from were given."
+            rng = random.Random((options or {}).get("seed"))
+            quote = rng.choice(_quotes)
+
+        elif not isinstance(quote, QuoteModel):
+            quote = QuoteModel(*quote)
+
+        result.quote = quote
+        result.path = _engine.make_meme(
+            img_path, quote.body, quote.author, **(options or {}))
+
+    except Exception as e:  # report failure of the job, keep the batch
+        result.error = e
+
+    return result
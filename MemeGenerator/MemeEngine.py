@@ -1,16 +1,28 @@
 """Module is responsible for manipulating images."""
 
+import io
 import os
 import pathlib
-from typing import Tuple
+import random
+import threading
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from multiprocessing.context import BaseContext
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
 
 from Helpers import Utilities as util
-from Models import QuoteModel
-from PIL import Image
+from Models import QuoteModel, QuoteStore
+from PIL import Image, ImageSequence
 from QuoteEngine.CustomErrors import UnsupportedFileError
 from Services.Exceptions.UnsupportedImageError import UnsuportedImageError
 
+from MemeGenerator.FontRegistry import FontRegistry
+from MemeGenerator.ImageCache import ImageCache
 from MemeGenerator.ImageCaptioner import ImageCaptioner
+from MemeGenerator.ImageEncoder import ImageEncoder
+from MemeGenerator.MemeBatch import MemeJobResult, init_worker, render_job
+from MemeGenerator.RenderCache import RenderCache
+from MemeGenerator.TextLayout import TextLayout
 from MemeGenerator.ImageEnhancer import *
 
 
@@ -21,27 +33,65 @@ class MemeEngine():
     :data SUPPOTED_FORMATS: Image formats/extensions digest by the class
     :SUPPOTED_FORMATS type: dict
         with full, start with period, extensions
+    :data ANIMATED_EXTENSIONS: extensions of files which can be animated,
+        animated ones are captioned frame by frame
+    :ANIMATED_EXTENSIONS type: Tuple[str]
+    :data DEF_FRAME_DURATION: frame duration in milliseconds
+        of animations which do not define it
+    :DEF_FRAME_DURATION type: int
     :data DEF_OUTPUT_DIR: folder to save the image
     :DEF_OUTPUT_DIR type: str
     :data MAX_WIDTH: max pixel count image can be resize to
     :MAX_WIDTH type: int
+    :data RESPONSIVE_WIDTHS: widths generated by `make_meme_set`
+    :RESPONSIVE_WIDTHS type: Tuple[int]
+    :data THUMBNAIL_SIZE: max thumbnail width and height
+    :THUMBNAIL_SIZE type: Tuple[int, int]
     :param output_dir: directory in which new generated
         image should be saved
     :output_dir tpe: str, optional
+    :param fonts_dir: Parent dir to look for fonts in,
+        all fonts are loaded and checked once per process
+    :fonts_dir type: str, optional
+    :param image_cache: cache of decoded and resized images,
+        if not given every image is decoded on each request
+    :image_cache type: `ImageCache`, optional
+    :param encoder: encoder memes are saved with,
+        default `ImageEncoder.DEF_PROFILE` profile
+    :encoder type: `ImageEncoder`, optional
+    :param render_cache: cache of encoded memes, if given identical
+        requests with a seed get the already encoded meme, requests
+        without one are random and always rendered
+    :render_cache type: `RenderCache`, optional
     """
 
     SUPPORTED_FORTMATS = {
         ".jpg": "JPEG",
         '.jpeg': "JPEG",
-        ".png": "PNG"
+        ".png": "PNG",
+        ".gif": "GIF",
+        ".webp": "WEBP"
     }
+    ANIMATED_EXTENSIONS = (".gif", ".webp", ".png")
+    DEF_FRAME_DURATION = 100
 
     DEF_OUTPUT_DIR = "_data/memes"
     MAX_WIDTH = 500
-
-    def __init__(self, output_dir: str = DEF_OUTPUT_DIR) -> None:
+    RESPONSIVE_WIDTHS = (500, 320, 160)
+    THUMBNAIL_SIZE = (96, 96)
+
+    def __init__(self, output_dir: str = DEF_OUTPUT_DIR,
+                 fonts_dir: str = ImageCaptioner.DEF_FONTS_DIR,
+                 image_cache: ImageCache = None,
+                 encoder: ImageEncoder = None,
+                 render_cache: RenderCache = None) -> None:
         """Create an instance."""
         self.output_dir = output_dir
+        self.image_cache = image_cache
+        self.render_cache = render_cache
+        self.encoder = encoder or ImageEncoder.from_profile()
+        self.fonts_dir = fonts_dir
+        self.fonts = FontRegistry.get_registry(fonts_dir)  # load fonts
         self.meme_path = None
 
     @property
@@ -56,15 +106,18 @@ class MemeEngine():
                 self, enhancer: ImageEnhancerInterface) -> Image:
         """Select enhancer.
 
-        :param enhancer: enhancement method
-        :enhancer type: `ImageEnhancerInterface`
+        :param enhancer: enhancement method, an `EnhancerChain`
+            applies several in one pass
+        :enhancer type: `ImageEnhancerInterface` or `EnhancerChain`
         :return: `ImageEnhancerInterface` class
         :rtype: `ImageEnhancerInterface`
         """
         self._enhancer = enhancer
 
     def make_meme(self, img_path: str, text: str,
-                  autor: str, width: int = MAX_WIDTH) -> str:
+                  autor: str, width: int = MAX_WIDTH,
+                  encoder: ImageEncoder = None, seed: int = None,
+                  font_path: str = None) -> str:
         """Generate meme.
 
         Open, resize, draw text and save transformed image.
@@ -76,31 +129,548 @@ class MemeEngine():
         :author type: str
         :param width: Desired width of the image (default: 500px)
         :width type: int
+        :param encoder: encoder to save the meme with,
+            default the engine one
+        :encoder type: `ImageEncoder`, optional
+        :param seed: seed of all random decisions, the same seed
+            gives the same meme, default random
+        :seed type: int, optional
+        :param font_path: A path to the font to draw with,
+            default random font
+        :font_path type: str, optional
         :return: A path/location to/of transformed image
         :rtype: str
         """
-        img_path = pathlib.Path(img_path)
-        image = self._open_image(img_path)  # open image
-        image = self._resize_image(image, width)  # resize image
+        encoder = self.select_encoder(img_path, encoder)
 
-        if self.enhancer is not None:
-            image = self.enhancer.enhance(image)
-
-        captioned_image = ImageCaptioner(
-            image, QuoteModel(text, autor)).run()  # add text to image
+        if self._is_cached(seed):  # keep meme in the cache dir
+            self.meme_path = self._render_cached(
+                img_path, text, autor, width, encoder, seed, font_path,
+                as_path=True)
+            return self.meme_path
 
         name_lenght = 10  # lenght of a file name
-        file_name = \
-            util.build_random_str(name_lenght) + '.png'  # build file name
+        file_name = util.build_random_str(name_lenght) \
+            + encoder.extension  # build file name
 
         pathlib.Path(self.output_dir).mkdir(
             parents=True, exist_ok=True)  # create dir if not exists
         save_path = os.path.join(self.output_dir, file_name)  # build full path
 
-        self.__class__.save_image(captioned_image, save_path)  # save image
+        self._encode(  # save image
+            save_path, img_path, text, autor, width, encoder, seed, font_path)
         self.meme_path = save_path
         return save_path  # return file path
 
+    def render(self, img_path: str, text: str,
+               autor: str, width: int = MAX_WIDTH, seed: int = None,
+               font_path: str = None) -> Image:
+        """Generate meme image without saving it.
+
+        Open, resize, enhance and draw text on the image.
+        :param img_path: A path to the image file
+        :img_path type: str
+        :param text: Text/quote to draw
+        :text type: str
+        :param: author: An author of the text
+        :author type: str
+        :param width: Desired width of the image (default: 500px)
+        :width type: int
+        :param seed: seed of all random decisions, the same seed
+            gives the same meme, default random
+        :seed type: int, optional
+        :param font_path: A path to the font to draw with,
+            default random font
+        :font_path type: str, optional
+        :return: captioned image
+        :rtype: `PIL.Image`
+        """
+        rng = random.Random(seed)  # the only source of randomness
+
+        img_path = pathlib.Path(img_path)
+        image = self._get_image(img_path, width)  # open and resize image
+
+        if self.enhancer is not None:
+            image = self.enhancer.enhance(image, rng=rng)
+
+        return ImageCaptioner(
+            image, QuoteModel(text, autor),
+            fonts_dir=self.fonts_dir, rng=rng,
+            font_path=font_path).run()  # add text to image
+
+    def render_to(self, stream: BinaryIO, img_path: str, text: str,
+                  autor: str, width: int = MAX_WIDTH,
+                  encoder: ImageEncoder = None,
+                  seed: int = None, font_path: str = None) -> BinaryIO:
+        """Generate meme and encode it straight into the stream.
+
+        :param stream: writable binary stream, e.g. `io.BytesIO`
+        :stream type: BinaryIO
+        :param img_path: A path to the image file
+        :img_path type: str
+        :param text: Text/quote to draw
+        :text type: str
+        :param: author: An author of the text
+        :author type: str
+        :param width: Desired width of the image (default: 500px)
+        :width type: int
+        :param encoder: encoder to encode the meme with,
+            default the engine one
+        :encoder type: `ImageEncoder`, optional
+        :param seed: seed of all random decisions, the same seed
+            gives the same meme, default random
+        :seed type: int, optional
+        :param font_path: A path to the font to draw with,
+            default random font
+        :font_path type: str, optional
+        :return: the given stream
+        :rtype: BinaryIO
+        """
+        encoder = self.select_encoder(img_path, encoder)
+
+        if self._is_cached(seed):
+            stream.write(self._render_cached(
+                img_path, text, autor, width, encoder, seed, font_path))
+            return stream
+
+        self._encode(
+            stream, img_path, text, autor, width, encoder, seed, font_path)
+
+        return stream
+
+    def render_frames(self, img_path: str, text: str, autor: str,
+                      width: int = MAX_WIDTH, seed: int = None,
+                      font_path: str = None) -> Iterator[Tuple[Image, int]]:
+        """Generate captioned frames of an animated image one by one.
+
+        Enhancement factors, text layout, position and colors are
+        computed once on the first frame and reused for the others.
+        Frames are decoded only when requested, so memory does not
+        depend on the animation length.
+        :param img_path: A path to the image file
+        :img_path type: str
+        :param text: Text/quote to draw
+        :text type: str
+        :param: author: An author of the text
+        :author type: str
+        :param width: Desired width of the image (default: 500px)
+        :width type: int
+        :param seed: seed of all random decisions, the same seed
+            gives the same meme, default random
+        :seed type: int, optional
+        :param font_path: A path to the font to draw with,
+            default random font
+        :font_path type: str, optional
+        :return: captioned frames with their durations in milliseconds
+        :rtype: Iterator[Tuple[`PIL.Image`, int]]
+        """
+        rng = random.Random(seed)  # the only source of randomness
+        enhancer = self.enhancer
+        factor = enhancer.draw_factor(rng) if enhancer is not None else None
+
+        captioner = None
+        with self._open_image(img_path) as source:
+            for frame in ImageSequence.Iterator(source):
+                image = frame.convert("RGB")  # loads the frame and its info
+                duration = frame.info.get(
+                    "duration", self.DEF_FRAME_DURATION)
+                image = self._resize_image(image, width)
+
+                if enhancer is not None:
+                    image = enhancer.enhance(image, factor)
+
+                if captioner is None:  # plan caption on the first frame
+                    captioner = ImageCaptioner(
+                        image, QuoteModel(text, autor),
+                        fonts_dir=self.fonts_dir, rng=rng,
+                        font_path=font_path)
+                    plan = captioner.plan()
+
+                yield captioner.apply(image, plan), duration
+
+    def select_encoder(self, img_path: str,
+                       encoder: ImageEncoder = None) -> ImageEncoder:
+        """Get encoder the meme of the image is encoded with.
+
+        Animated images keep their animation, so if the requested
+        format can't hold one `ImageEncoder.ANIMATED_PROFILE` is used.
+        :param img_path: A path to the image file
+        :img_path type: str
+        :param encoder: requested encoder, default the engine one
+        :encoder type: `ImageEncoder`, optional
+        :return: encoder to use
+        :rtype: `ImageEncoder`
+        """
+        encoder = encoder or self.encoder
+
+        if not encoder.is_animated and self.is_animated(img_path):
+            return ImageEncoder.from_profile(ImageEncoder.ANIMATED_PROFILE)
+
+        return encoder
+
+    def is_animated(self, img_path: str) -> bool:
+        """Check if the image has more than one frame.
+
+        :param img_path: A path to the image file
+        :img_path type: str
+        :return: True if the image is animated, otherwise False
+        :rtype: bool
+        """
+        if util.get_extension(img_path) not in self.ANIMATED_EXTENSIONS:
+            return False
+
+        with Image.open(img_path) as image:
+            return getattr(image, "is_animated", False)
+
+    def _encode(self, fp: BinaryIO, img_path: str, text: str, autor: str,
+                width: int, encoder: ImageEncoder, seed: int = None,
+                font_path: str = None) -> None:
+        """Render meme and encode it, keep animation of animated images.
+
+        :param fp: file name or writable binary stream
+        :fp type: str or BinaryIO
+        :param img_path: A path to the image file
+        :img_path type: str
+        :param text: Text/quote to draw
+        :text type: str
+        :param: author: An author of the text
+        :author type: str
+        :param width: Desired width of the image
+        :width type: int
+        :param encoder: encoder selected by `select_encoder`
+        :encoder type: `ImageEncoder`
+        :param seed: seed of all random decisions
+        :seed type: int, optional
+        :param font_path: A path to the font to draw with
+        :font_path type: str, optional
+        """
+        if encoder.is_animated and self.is_animated(img_path):
+            encoder.encode_frames(self.render_frames(
+                img_path, text, autor, width, seed, font_path), fp)
+        else:
+            encoder.encode(
+                self.render(img_path, text, autor, width, seed, font_path),
+                fp)
+
+    def render_bytes(self, img_path: str, text: str,
+                     autor: str, width: int = MAX_WIDTH,
+                     encoder: ImageEncoder = None,
+                     seed: int = None, font_path: str = None) -> bytes:
+        """Generate meme and return its encoded content.
+
+        :param img_path: A path to the image file
+        :img_path type: str
+        :param text: Text/quote to draw
+        :text type: str
+        :param: author: An author of the text
+        :author type: str
+        :param width: Desired width of the image (default: 500px)
+        :width type: int
+        :param encoder: encoder to encode the meme with,
+            default the engine one
+        :encoder type: `ImageEncoder`, optional
+        :param seed: seed of all random decisions, the same seed
+            gives the same meme, default random
+        :seed type: int, optional
+        :param font_path: A path to the font to draw with,
+            default random font
+        :font_path type: str, optional
+        :return: encoded image
+        :rtype: bytes
+        """
+        return self.render_to(
+            io.BytesIO(), img_path, text, autor, width, encoder, seed,
+            font_path
+        ).getvalue()
+
+    def render_spec(self, img_path: str, text: str, autor: str,
+                    width: int, encoder: ImageEncoder,
+                    seed: int = None, font_path: str = None) -> Dict:
+        """Describe everything the meme depends on.
+
+        :param img_path: A path to the image file
+        :img_path type: str
+        :param text: Text/quote to draw
+        :text type: str
+        :param: author: An author of the text
+        :author type: str
+        :param width: Desired width of the image
+        :width type: int
+        :param encoder: encoder to encode the meme with
+        :encoder type: `ImageEncoder`
+        :param seed: seed of all random decisions
+        :seed type: int, optional
+        :param font_path: A path to the font to draw with
+        :font_path type: str, optional
+        :return: json serializable render spec
+        :rtype: Dict
+        """
+        enhancer = self.enhancer
+        factor = None
+        if enhancer is not None and seed is not None:
+            # the first draw of the render, see `render`
+            factor = enhancer.draw_factor(random.Random(seed))
+
+        return {
+            "image": RenderCache.file_digest(img_path),
+            "text": text,
+            "author": autor,
+            "width": min(width, self.MAX_WIDTH),
+            "fonts": [util.get_filename(path) for path in self.fonts.paths],
+            "enhancer": getattr(enhancer, "__name__", repr(enhancer))
+            if enhancer is not None else None,
+            "enhancer_factor": factor,
+            "encoder": encoder.settings,
+            "seed": seed,
+            "font": util.get_filename(font_path)
+            if font_path is not None else None,
+            "layout": TextLayout.LAYOUT_VERSION,
+        }
+
+    def _is_cached(self, seed: int = None) -> bool:
+        """Check if the meme goes through the render cache.
+
+        A meme without a seed is random, the cache would freeze
+        the first one drawn, so it is never cached.
+        :param seed: seed of all random decisions
+        :seed type: int, optional
+        :return: True if the render cache is used, otherwise False
+        :rtype: bool
+        """
+        return self.render_cache is not None and seed is not None
+
+    def _render_cached(self, img_path: str, text: str, autor: str,
+                       width: int, encoder: ImageEncoder, seed: int = None,
+                       font_path: str = None, as_path: bool = False) -> object:
+        """Get meme from the render cache, render and cache it if missing.
+
+        :param img_path: A path to the image file
+        :img_path type: str
+        :param text: Text/quote to draw
+        :text type: str
+        :param: author: An author of the text
+        :author type: str
+        :param width: Desired width of the image
+        :width type: int
+        :param encoder: encoder to encode the meme with
+        :encoder type: `ImageEncoder`
+        :param seed: seed of all random decisions
+        :seed type: int, optional
+        :param font_path: A path to the font to draw with
+        :font_path type: str, optional
+        :param as_path: return path to the cached file instead of content
+        :as_path type: bool, optional
+        :return: encoded meme or path to it
+        :rtype: bytes or str
+        """
+        key = RenderCache.make_key(
+            self.render_spec(
+                img_path, text, autor, width, encoder, seed, font_path))
+        ext = encoder.extension
+
+        cached = self.render_cache.get_path(key, ext) if as_path \
+            else self.render_cache.get_bytes(key, ext)
+
+        if cached is not None:
+            return cached
+
+        buffer = io.BytesIO()
+        self._encode(
+            buffer, img_path, text, autor, width, encoder, seed, font_path)
+        path = self.render_cache.put_bytes(key, ext, buffer.getvalue())
+
+        return path if as_path else buffer.getvalue()
+
+    def make_meme_set(self, img_path: str, text: str, autor: str,
+                      widths: Iterable[int] = RESPONSIVE_WIDTHS,
+                      thumbnail: Tuple[int, int] = THUMBNAIL_SIZE,
+                      encoder: ImageEncoder = None, seed: int = None,
+                      font_path: str = None, as_bytes: bool = False,
+                      workers: int = None) -> Dict[object, object]:
+        """Generate the meme in several sizes, e.g. for `srcset`.
+
+        The image is decoded and captioned once at the largest width,
+        smaller sizes are downscaled from it, so all sizes show
+        the same meme. Animated images give stills of the first frame.
+        :param img_path: A path to the image file
+        :img_path type: str
+        :param text: Text/quote to draw
+        :text type: str
+        :param: author: An author of the text
+        :author type: str
+        :param widths: widths to generate, limited to `MAX_WIDTH`
+        :widths type: Iterable[int], optional
+        :param thumbnail: max width and height of the thumbnail,
+            None to skip it
+        :thumbnail type: Tuple[int, int], optional
+        :param encoder: encoder to encode the memes with,
+            default the engine one
+        :encoder type: `ImageEncoder`, optional
+        :param seed: seed of all random decisions, the same seed
+            gives the same meme, default random
+        :seed type: int, optional
+        :param font_path: A path to the font to draw with,
+            default random font
+        :font_path type: str, optional
+        :param as_bytes: return encoded memes instead of paths
+        :as_bytes type: bool, optional
+        :param workers: count of threads to downscale and encode
+            sizes with, default current thread only
+        :workers type: int, optional
+        :return: width -> path or content of the meme,
+            `thumbnail` -> path or content of the thumbnail
+        :rtype: Dict[object, object]
+        :raises ValueError: no widths are given
+        """
+        encoder = encoder or self.encoder
+        widths = sorted(
+            {min(width, self.MAX_WIDTH) for width in widths}, reverse=True)
+        if not widths:
+            raise ValueError("At least one width of the meme is required.")
+        sizes = list(widths) + (["thumbnail"] if thumbnail else [])
+        ext = encoder.extension
+
+        keys = {}
+        if self._is_cached(seed):  # all sizes cached, no render
+            spec = self.render_spec(
+                img_path, text, autor, widths[0], encoder, seed, font_path)
+            keys = {size: RenderCache.make_key(
+                {**spec, "size": size, "thumbnail": thumbnail})
+                for size in sizes}
+
+            get = self.render_cache.get_bytes if as_bytes \
+                else self.render_cache.get_path
+            cached = {size: get(keys[size], ext) for size in sizes}
+            if None not in cached.values():
+                if not as_bytes:
+                    self.meme_path = cached[widths[0]]
+                return cached
+
+        image = self.render(
+            img_path, text, autor, widths[0], seed, font_path)
+        name = util.build_random_str(10)  # one name for all sizes
+
+        def make_size(size):
+            if size == "thumbnail":
+                resized = image.copy()
+                resized.thumbnail(thumbnail, resample=Image.LANCZOS)
+            elif size < image.size[0]:
+                resized = self._resize_image(image, size)
+            else:
+                resized = image
+
+            buffer = io.BytesIO()
+            encoder.encode(resized, buffer)
+
+            if keys:
+                path = self.render_cache.put_bytes(
+                    keys[size], ext, buffer.getvalue())
+                return buffer.getvalue() if as_bytes else path
+
+            if as_bytes:
+                return buffer.getvalue()
+
+            pathlib.Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+            path = os.path.join(self.output_dir, f"{name}-{size}{ext}")
+            with open(path, "wb") as file:
+                file.write(buffer.getvalue())
+
+            return path
+
+        if workers and workers > 1:  # Pillow releases the GIL
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(make_size, sizes))
+        else:
+            results = [make_size(size) for size in sizes]
+
+        memes = dict(zip(sizes, results))
+        if not as_bytes:
+            self.meme_path = memes[widths[0]]
+
+        return memes
+
+    def make_memes(self, jobs: Iterable[Tuple], workers: int = None,
+                   quotes: Iterable[QuoteModel] = None,
+                   mp_context: BaseContext = None
+                   ) -> Iterator[MemeJobResult]:
+        """Generate many memes using all processor cores.
+
+        Each worker process loads fonts and quotes once.
+        Results are yielded as soon as they are ready,
+        not in the order of jobs. A failed job does not stop the batch,
+        its error is reported in the result.
+        :param jobs: (img_path, quote, options) tuples,
+            quote is a `QuoteModel`, (body, author) pair or None
+            to draw a random one from `quotes`,
+            options are keyword arguments of `make_meme` or None
+        :jobs type: Iterable[Tuple]
+        :param workers: count of worker processes, default cpu count
+        :workers type: int, optional
+        :param quotes: quotes to draw from for jobs without a quote
+        :quotes type: Iterable[QuoteModel], optional
+        :param mp_context: start method context of worker processes,
+            default the platform one
+        :mp_context type: `multiprocessing.context.BaseContext`, optional
+        :return: result of each job
+        :rtype: Iterator[`MemeJobResult`]
+        """
+        workers = workers or os.cpu_count() or 1
+        if not isinstance(quotes, QuoteStore):  # compact to send workers
+            quotes = QuoteStore(quotes or [])
+        engine_kwargs = {
+            "output_dir": self.output_dir,
+            "fonts_dir": self.fonts_dir,
+            "image_cache": self.image_cache,  # pickled empty
+            "encoder": self.encoder
+        }
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=init_worker,
+            initargs=(self.__class__, engine_kwargs, self.enhancer, quotes)
+        ) as pool:
+
+            pending = {}  # future -> (index, img_path)
+            max_pending = workers * 4  # do not queue the whole batch
+
+            def collect():
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, img_path = pending.pop(future)
+                    try:
+                        yield future.result()
+                    except Exception as e:  # worker died
+                        yield MemeJobResult(index, img_path, error=e)
+
+            for index, (img_path, quote, options) in enumerate(jobs):
+                pending[pool.submit(
+                    render_job, index, str(img_path), quote, options)
+                ] = (index, img_path)
+
+                while len(pending) >= max_pending:
+                    yield from collect()
+
+            while pending:
+                yield from collect()
+
+    def warm_cache(self, img_paths: Iterable[str],
+                   width: int = MAX_WIDTH) -> threading.Thread:
+        """Decode and resize images in the background.
+
+        :param img_paths: paths to the image files
+        :img_paths type: Iterable[str]
+        :param width: Desired width of the image (default: 500px)
+        :width type: int
+        :return: started thread or None if the engine has no cache
+        :rtype: `threading.Thread`
+        """
+        if self.image_cache is None:
+            return None
+
+        return self.image_cache.warm(
+            list(img_paths), min(width, self.MAX_WIDTH), self._load_image)
+
     @classmethod
     def is_supported(cls, filename: str) -> bool:
         """Check if the file is supported by MemeEngine.
@@ -116,11 +686,60 @@ class MemeEngine():
             return True
         False
 
-    def _open_image(self, img_path: str) -> Image:
+    def rendered_size(self, img_path: str,
+                      width: int = MAX_WIDTH) -> Tuple[int, int]:
+        """Get size of the meme without decoding the image.
+
+        :param img_path: A path to the image file
+        :img_path type: str
+        :param width: Desired width of the image (default: 500px)
+        :width type: int
+        :return: width and height of the meme
+        :rtype: Tuple[int, int]
+        """
+        with Image.open(img_path) as image:  # reads the header only
+            return self._get_new_size(image.size, width)
+
+    def _get_image(self, img_path: str, width: int) -> Image:
+        """Get resized image, from the cache if the engine has one.
+
+        :param img_path: A path to the image file
+        :img_path type: str
+        :param width: Desired width of the image
+        :width type: int
+        :return: resized image safe to draw on
+        :rtype: `PIL.Image`
+        """
+        width = min(width, self.MAX_WIDTH)
+
+        if self.image_cache is None:
+            return self._load_image(img_path, width)
+
+        return self.image_cache.get_or_load(
+            img_path, width, self._load_image)
+
+    def _load_image(self, img_path: str, width: int) -> Image:
+        """Open and resize image.
+
+        :param img_path: A path to the image file
+        :img_path type: str
+        :param width: Desired width of the image
+        :width type: int
+        :return: resized image
+        :rtype: `PIL.Image`
+        """
+        image = self._open_image(img_path, width)  # open image
+        return self._resize_image(image, width)  # resize image
+
+    def _open_image(self, img_path: str, width: int = None) -> Image:
         """Open an image using given location.
 
+        If the width is given, JPEG images are decoded at the smallest
+        power-of-two scale which is still not narrower than the width.
         :param img_string:A path to the image file
         :img_string type: str
+        :param width: width the image is going to be resized to
+        :width type: int, optional
         :return: `PIL.Image` object
         :exceptions: `UnsupportedFileError`
             raises if file format is not supported
@@ -133,18 +752,27 @@ class MemeEngine():
             raise UnsuportedImageError(
                 f"Failed to open image: {img_path}. Unsupported type."
             )
-        return Image.open(img_path)
+        image = Image.open(img_path)
+
+        if width is not None:  # no-op for formats other than JPEG
+            image.draft(image.mode, self._get_new_size(image.size, width))
+
+        return image
 
     @classmethod
-    def save_image(cls, image: Image, file_name: str) -> None:
+    def save_image(cls, image: Image, file_name: str,
+                   format: str = None) -> None:
         """Save image.
 
         :param image: image to save
         :image type: `PIL.Image`
-        :param file_name: file name
-        :file_name type: str
+        :param file_name: file name or writable binary stream
+        :file_name type: str or BinaryIO
+        :param format: image format, required for streams,
+            default taken from the file extension
+        :format type: str, optional
         """
-        image.save(file_name)
+        image.save(file_name, format=format)
 
     def _get_new_size(self, size: Tuple[int, int],
                       width: int) -> Tuple[int, int]:
@@ -164,6 +792,8 @@ class MemeEngine():
     def _resize_image(self, image: Image, width: int) -> Image:
         """Resize image.
 
+        Large images are first reduced by a power-of-two factor
+        with a cheap box filter, then resized with a high-quality filter.
         :param image: An image to resize
         :image type: `PIL.Image`
         :param width: width to image resize to
@@ -172,4 +802,13 @@ class MemeEngine():
         :rtype: `PIL.Image`
         """
         new_size = self._get_new_size(image.size, width)
-        return image.resize(new_size)
+
+        factor = 1
+        while image.size[0] // (factor * 2) >= new_size[0] \
+                and image.size[1] // (factor * 2) >= new_size[1]:
+            factor *= 2
+
+        if factor > 1 and image.mode not in ("1", "P"):
+            image = image.reduce(factor)
+
+        return image.resize(new_size, resample=Image.LANCZOS)
@@ -0,0 +1,175 @@
+"""Index of quotes fitting images for each font."""
+
+import random
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+from Models.QuoteModel import QuoteModel
+from Models.QuoteStore import QuoteStore
+
+from .Exeptions.TextTooLongError import TextTooLongError
+from .FontRegistry import FontRegistry
+from .ImageCaptioner import ImageCaptioner
+
+
+class QuoteFitIndex():
+    """Know in advance which quote fits an image with which font.
+
+    For each font and canvas width the index keeps the size every quote
+    takes once laid out with `ImageCaptioner.MIN_FONT_SIZE`, the size
+    the captioner shrinks long quotes to, so the quote fits an image
+    if its height is not bigger than the canvas height. Sizes for
+    a canvas width are computed on the first request for an image
+    of that width. Quotes are kept in a `QuoteStore`.
+    :param quotes: quotes to index
+    :quotes type: Iterable[QuoteModel]
+    :param fonts_dir: Parent dir to look for fonts in
+    :fonts_dir type: str, optional
+    :param wrap_method: text wrap method, one of `TextLayout.METHODS`
+    :wrap_method type: str, optional
+    """
+
+    def __init__(self, quotes: Iterable[QuoteModel],
+                 fonts_dir: str = ImageCaptioner.DEF_FONTS_DIR,
+                 wrap_method: str = ImageCaptioner.WRAP_METHOD) -> None:
+        """Create an instance."""
+        self.quotes = quotes if isinstance(quotes, QuoteStore) \
+            else QuoteStore(quotes)
+        self.fonts = FontRegistry.get_registry(fonts_dir)
+        self.wrap_method = wrap_method
+
+        self._sizes = {}  # canvas width -> {font path: (widths, heights)}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return count of indexed quotes."""
+        return len(self.quotes)
+
+    def build(self, image_widths: List[int]) -> None:
+        """Index quotes for images of the given widths ahead of time.
+
+        :param image_widths: widths of the images
+        :image_widths type: List[int]
+        """
+        for width in image_widths:
+            self._get_sizes(ImageCaptioner.canvas_size((width, 0))["width"])
+
+    def fits(self, quote_index: int, font_path: str,
+             image_size: Tuple[int, int]) -> bool:
+        """Check if the quote fits the image with the font.
+
+        :param quote_index: position of the quote in `quotes`
+        :quote_index type: int
+        :param font_path: A path to the font
+        :font_path type: str
+        :param image_size: width and height of the image
+        :image_size type: Tuple[int, int]
+        :return: True if the quote fits, otherwise False
+        :rtype: bool
+        """
+        return bool(self._fit_masks(image_size)[font_path][quote_index])
+
+    def compatible(self, image_size: Tuple[int, int]
+                   ) -> List[Tuple[QuoteModel, str]]:
+        """Get all quote and font pairs fitting the image.
+
+        :param image_size: width and height of the image
+        :image_size type: Tuple[int, int]
+        :return: (quote, font path) pairs
+        :rtype: List[Tuple[QuoteModel, str]]
+        """
+        return [
+            (self.quotes[index], font_path)
+            for font_path, mask in self._fit_masks(image_size).items()
+            for index in np.flatnonzero(mask)
+        ]
+
+    def sample(self, image_size: Tuple[int, int],
+               rng: random.Random = None) -> Tuple[QuoteModel, str]:
+        """Draw a random quote and font pair fitting the image.
+
+        Every compatible pair has the same chance to be drawn.
+        :param image_size: width and height of the image
+        :image_size type: Tuple[int, int]
+        :param rng: random numbers generator, default `random` module
+        :rng type: `random.Random`, optional
+        :return: quote and path to the font
+        :rtype: Tuple[QuoteModel, str]
+        :raises TextTooLongError: no quote fits the image
+        """
+        rng = rng or random
+        masks = self._fit_masks(image_size)
+        counts = {font: int(np.count_nonzero(m)) for font, m in masks.items()}
+
+        total = sum(counts.values())
+        if not total:
+            raise TextTooLongError(
+                "None of the quotes fits to the image size.")
+
+        drawn = rng.randrange(total)
+        for font_path, count in counts.items():
+            if drawn < count:
+                index = np.flatnonzero(masks[font_path])[drawn]
+                return self.quotes[index], font_path
+            drawn -= count
+
+    def _fit_masks(self, image_size: Tuple[int, int]) -> Dict:
+        """Mark quotes fitting the image for each font.
+
+        :param image_size: width and height of the image
+        :image_size type: Tuple[int, int]
+        :return: font path -> boolean array with value for each quote
+        :rtype: Dict[str, `numpy.ndarray`]
+        """
+        canvas = ImageCaptioner.canvas_size(image_size)
+        sizes = self._get_sizes(canvas["width"])
+
+        return {
+            font_path: (widths <= canvas["width"])
+            & (heights <= canvas["height"])
+            for font_path, (widths, heights) in sizes.items()
+        }
+
+    def _get_sizes(self, canvas_width: int) -> Dict:
+        """Get size of each quote laid out with each font.
+
+        :param canvas_width: drawable width of the image
+        :canvas_width type: int
+        :return: font path -> (widths, heights) arrays
+        :rtype: Dict[str, Tuple[`numpy.ndarray`, `numpy.ndarray`]]
+        """
+        sizes = self._sizes.get(canvas_width)
+        if sizes is not None:
+            return sizes
+
+        with self._lock:
+            if canvas_width not in self._sizes:
+                self._sizes[canvas_width] = {
+                    font_path: self._measure(font_path, canvas_width)
+                    for font_path in self.fonts.paths
+                }
+
+            return self._sizes[canvas_width]
+
+    def _measure(self, font_path: str, canvas_width: int) -> Tuple:
+        """Lay out all quotes with the smallest size of the font.
+
+        :param font_path: A path to the font
+        :font_path type: str
+        :param canvas_width: drawable width of the image
+        :canvas_width type: int
+        :return: widths and heights of the quotes
+        :rtype: Tuple[`numpy.ndarray`, `numpy.ndarray`]
+        """
+        font = self.fonts.get_font(
+            font_path, size=ImageCaptioner.MIN_FONT_SIZE)
+
+        blocks = [
+            ImageCaptioner.layout_quote(
+                quote, font, canvas_width, self.wrap_method)
+            for quote in self.quotes
+        ]
+
+        return (np.array([block.width for block in blocks], dtype=np.int32),
+                np.array([block.height for block in blocks], dtype=np.int32))
@@ -0,0 +1,203 @@
+"""Content-addressed cache of encoded memes."""
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+from typing import Dict
+
+from Helpers import ExLogger
+
+
+class RenderCache():
+    """Keep encoded memes on disk under the hash of their render spec.
+
+    The same spec always gives the same meme, so a repeated request
+    gets the already encoded file. The least recently used files
+    are removed when the cache takes more bytes than allowed.
+    :data DEF_CACHE_DIR: default dir to keep memes in
+    :DEF_CACHE_DIR type: str
+    :data DEF_MAX_BYTES: default byte budget of the cache
+    :DEF_MAX_BYTES type: int
+    :data MAX_DIGESTS: max count of remembered file digests
+    :MAX_DIGESTS type: int
+    :param cache_dir: dir to keep memes in
+    :cache_dir type: str, optional
+    :param max_bytes: byte budget of the cache
+    :max_bytes type: int, optional
+    """
+
+    DEF_CACHE_DIR = "_data/memes/cache"
+    DEF_MAX_BYTES = 256 * 1024 * 1024
+    MAX_DIGESTS = 4096
+
+    _digests = {}  # (path, mtime, size) -> digest of the file content
+    _digests_lock = threading.Lock()
+
+    def __init__(self, cache_dir: str = DEF_CACHE_DIR,
+                 max_bytes: int = DEF_MAX_BYTES) -> None:
+        """Create an instance."""
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.nbytes = sum(entry.stat().st_size for entry in self._entries())
+
+    @classmethod
+    def make_key(cls, spec: Dict) -> str:
+        """Hash the full render spec.
+
+        :param spec: everything the meme depends on,
+            values must be json serializable
+        :spec type: Dict
+        :return: hex digest of the spec
+        :rtype: str
+        """
+        content = json.dumps(spec, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def file_digest(cls, path: str) -> str:
+        """Hash the file content.
+
+        Digests are remembered until the file changes.
+        :param path: A path to the file
+        :path type: str
+        :return: hex digest of the file content
+        :rtype: str
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+        digest = cls._digests.get(key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(path, "rb") as file:
+                for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+
+            with cls._digests_lock:
+                if len(cls._digests) >= cls.MAX_DIGESTS:
+                    cls._digests.clear()
+                cls._digests[key] = digest
+
+        return digest
+
+    def get_path(self, key: str, extension: str) -> str:
+        """Get the path of the cached meme.
+
+        :param key: hash of the render spec
+        :key type: str
+        :param extension: file extension with period, e.g. '.png'
+        :extension type: str
+        :return: A path to the meme, None if it is not cached
+        :rtype: str
+        """
+        path = self.cache_dir / f"{key}{extension}"
+
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            return None
+
+        return str(path)
+
+    def get_bytes(self, key: str, extension: str) -> bytes:
+        """Get content of the cached meme.
+
+        :param key: hash of the render spec
+        :key type: str
+        :param extension: file extension with period, e.g. '.png'
+        :extension type: str
+        :return: encoded meme, None if it is not cached
+        :rtype: bytes
+        """
+        path = self.get_path(key, extension)
+        if path is None:
+            return None
+
+        try:
+            with open(path, "rb") as file:
+                return file.read()
+
+        except FileNotFoundError:  # removed in the meantime
+            return None
+
+    def put_bytes(self, key: str, extension: str, content: bytes) -> str:
+        """Put encoded meme in the cache.
+
+        :param key: hash of the render spec
+        :key type: str
+        :param extension: file extension with period, e.g. '.png'
+        :extension type: str
+        :param content: encoded meme
+        :content type: bytes
+        :return: A path to the cached meme
+        :rtype: str
+        """
+        path = self.cache_dir / f"{key}{extension}"
+        tmp_path = self.cache_dir / f".{key}.{threading.get_ident()}.tmp"
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as file:
+            file.write(content)
+        os.replace(tmp_path, path)  # readers never see a partial file
+
+        with self._lock:
+            self.nbytes += len(content)
+            if self.nbytes > self.max_bytes:
+                self._evict()
+
+        return str(path)
+
+    def clear(self) -> None:
+        """Remove all cached memes."""
+        with self._lock:
+            for entry in self._entries():
+                self._remove(entry.path)
+            self.nbytes = 0
+
+    def _entries(self) -> list:
+        """Get all cached files.
+
+        :return: directory entries of cached memes
+        :rtype: List[`os.DirEntry`]
+        """
+        try:
+            return [
+                entry for entry in os.scandir(self.cache_dir)
+                if entry.is_file() and not entry.name.startswith(".")
+            ]
+        except FileNotFoundError:
+            return []
+
+    def _evict(self) -> None:
+        """Remove the least recently used memes until within budget."""
+        entries = sorted(
+            ((entry.stat().st_mtime_ns, entry.stat().st_size, entry.path)
+             for entry in self._entries())
+        )
+        self.nbytes = sum(size for _, size, _ in entries)  # resync
+
+        for _, size, path in entries:
+            if self.nbytes <= self.max_bytes:
+                break
+
+            self._remove(path)
+            self.nbytes -= size
+
+    def _remove(self, path: str) -> None:
+        """Remove the cached file, ignore it if already removed.
+
+        :param path: A path to the file
+        :path type: str
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            ExLogger().log(f"Can't remove cached meme {path}: {e}\n")
@@ -0,0 +1,322 @@
+"""Wrap text to the pixel width using cached glyph advances."""
+
+import math
+import threading
+from collections import OrderedDict
+from string import printable
+from typing import List
+
+from PIL import ImageFont
+
+
+class GlyphAdvanceTable():
+    """Advance widths of characters for one font and size.
+
+    Tables are shared by the whole process, use `get_table`
+    to get one. Widths of printable ascii chars are measured up front,
+    any other char is measured once, the first time it is used.
+    :data MAX_TABLES: max count of tables to keep
+    :MAX_TABLES type: int
+    :param font: font to measure chars with
+    :font type: `PIL.ImageFont.FreeTypeFont`
+    """
+
+    MAX_TABLES = 256
+
+    _tables = OrderedDict()
+    _tables_lock = threading.Lock()
+
+    def __init__(self, font: ImageFont.FreeTypeFont) -> None:
+        """Create an instance."""
+        self._font = font
+        self._widths = {char: font.getlength(char) for char in printable}
+        self.line_height = font.getbbox("A")[3]  # same as Pillow uses
+        self.descent = font.getmetrics()[1]  # below the last baseline
+
+    @classmethod
+    def get_table(cls, font: ImageFont.FreeTypeFont) -> "GlyphAdvanceTable":
+        """Get the table for the font and its size.
+
+        :param font: font to measure chars with
+        :font type: `PIL.ImageFont.FreeTypeFont`
+        :return: shared table of the font
+        :rtype: `GlyphAdvanceTable`
+        """
+        key = (font.path, font.size)
+
+        with cls._tables_lock:
+            table = cls._tables.get(key)
+
+            if table is None:
+                table = cls._tables[key] = cls(font)
+
+                if len(cls._tables) > cls.MAX_TABLES:
+                    cls._tables.popitem(last=False)
+            else:
+                cls._tables.move_to_end(key)
+
+            return table
+
+    def measure(self, text: str) -> float:
+        """Get width of the text in pixels.
+
+        :param text: single line text to measure
+        :text type: str
+        :return: sum of advance widths of all chars
+        :rtype: float
+        """
+        widths = self._widths
+        try:
+            return sum([widths[char] for char in text])
+
+        except KeyError:  # char not measured yet
+            for char in text:
+                if char not in widths:
+                    widths[char] = self._font.getlength(char)
+
+            return sum([widths[char] for char in text])
+
+
+class TextBlock():
+    """Represent wrapped text and size of the box it takes.
+
+    :param lines: lines of the text
+    :lines type: List[str]
+    :param width: width of the widest line in pixels
+    :width type: int
+    :param height: height of all lines with spacing and descent
+        of the last line in pixels
+    :height type: int
+    """
+
+    def __init__(self, lines: List[str], width: int, height: int) -> None:
+        """Create an instance."""
+        self.lines = lines
+        self.width = width
+        self.height = height
+
+    @property
+    def text(self) -> str:
+        r"""Get the text with `\n` as a new line."""
+        return "\n".join(self.lines)
+
+    @property
+    def size(self) -> tuple:
+        """Get width and height of the text box in pixels."""
+        return (self.width, self.height)
+
+    def __repr__(self) -> str:
+        """Return string representation of a TextBlock."""
+        return f"TextBlock({self.lines}, {self.width}, {self.height})"
+
+
+class TextLayout():
+    """Wrap text by its real pixel width.
+
+    :data METHODS: supported wrap methods:
+        `greedy` fills every line as much as possible,
+        `optimal` minimizes unused space of all lines but the last
+    :METHODS type: Tuple[str]
+    :data LAYOUT_VERSION: version of the layout, bump it when
+        the same text is laid out differently
+    :LAYOUT_VERSION type: int
+    :param font: font the text is drawn with
+    :font type: `PIL.ImageFont.FreeTypeFont`
+    :param spacing: interline for multiline text
+    :spacing type: int, optional
+    :param method: one of `METHODS`, default `greedy`
+    :method type: str, optional
+    :raises ValueError: unknown method
+    """
+
+    METHODS = ("greedy", "optimal")
+    LAYOUT_VERSION = 2
+
+    def __init__(self, font: ImageFont.FreeTypeFont, spacing: int = 4,
+                 method: str = "greedy") -> None:
+        """Create an instance."""
+        if method not in self.__class__.METHODS:
+            raise ValueError(
+                f"Unknown wrap method: {method}. "
+                f"Expected one of: {', '.join(self.__class__.METHODS)}."
+            )
+
+        self.spacing = spacing
+        self.method = method
+        self._table = GlyphAdvanceTable.get_table(font)
+
+    def measure(self, text: str) -> float:
+        """Get width of the single line text in pixels.
+
+        :param text: text to measure
+        :text type: str
+        :return: width in pixels
+        :rtype: float
+        """
+        return self._table.measure(text)
+
+    def wrap(self, paragraphs: List[str], max_width: int) -> TextBlock:
+        """Wrap paragraphs to the width, each starts with a new line.
+
+        :param paragraphs: texts to wrap
+        :paragraphs type: List[str]
+        :param max_width: max width of the line in pixels
+        :max_width type: int
+        :return: wrapped text with its size
+        :rtype: `TextBlock`
+        """
+        lines = []
+        widths = []
+        space = self._table.measure(" ")
+
+        for paragraph in paragraphs:
+            words, word_widths = self._split_words(paragraph, max_width)
+
+            if not words:
+                continue
+
+            if self.method == "greedy":
+                breaks = self._greedy(word_widths, space, max_width)
+            else:
+                breaks = self._optimal(word_widths, space, max_width)
+
+            start = 0
+            for end in breaks:
+                lines.append(" ".join(words[start:end]))
+                widths.append(
+                    sum(word_widths[start:end]) + space * (end - start - 1)
+                )
+                start = end
+
+        return self._to_block(lines, widths)
+
+    def single_line(self, text: str) -> TextBlock:
+        """Lay the text out in one line.
+
+        :param text: text to lay out
+        :text type: str
+        :return: the text with its size
+        :rtype: `TextBlock`
+        """
+        return self._to_block([text], [self._table.measure(text)])
+
+    def _to_block(self, lines: List[str], widths: List[float]) -> TextBlock:
+        """Build the text block for lines with known widths.
+
+        :param lines: lines of the text
+        :lines type: List[str]
+        :param widths: width of each line in pixels
+        :widths type: List[float]
+        :return: text with its size
+        :rtype: `TextBlock`
+        """
+        width = math.ceil(max(widths)) if widths else 0
+        height = len(lines) * self._table.line_height \
+            + max(len(lines) - 1, 0) * self.spacing \
+            + (self._table.descent if lines else 0)  # g, p, y
+
+        return TextBlock(lines, width, height)
+
+    def _split_words(self, text: str, max_width: int) -> tuple:
+        """Split text into words, break words longer than the line.
+
+        :param text: text to split
+        :text type: str
+        :param max_width: max width of the line in pixels
+        :max_width type: int
+        :return: words and width of each word
+        :rtype: Tuple[List[str], List[float]]
+        """
+        words = []
+        word_widths = []
+        measure = self._table.measure
+
+        for word in text.split():
+            width = measure(word)
+
+            if width <= max_width:
+                words.append(word)
+                word_widths.append(width)
+                continue
+
+            chunk = ""
+            for char in word:  # break long word, as textwrap does
+                if chunk and measure(chunk + char) > max_width:
+                    words.append(chunk)
+                    word_widths.append(measure(chunk))
+                    chunk = ""
+                chunk += char
+
+            words.append(chunk)
+            word_widths.append(measure(chunk))
+
+        return words, word_widths
+
+    def _greedy(self, widths: List[float], space: float,
+                max_width: int) -> List[int]:
+        """Put as many words as possible in each line.
+
+        :param widths: width of each word
+        :widths type: List[float]
+        :param space: width of a space
+        :space type: float
+        :param max_width: max width of the line in pixels
+        :max_width type: int
+        :return: index of the word after the last one of each line
+        :rtype: List[int]
+        """
+        breaks = []
+        line_width = widths[0]
+
+        for i in range(1, len(widths)):
+            if line_width + space + widths[i] <= max_width:
+                line_width += space + widths[i]
+            else:
+                breaks.append(i)
+                line_width = widths[i]
+
+        breaks.append(len(widths))
+        return breaks
+
+    def _optimal(self, widths: List[float], space: float,
+                 max_width: int) -> List[int]:
+        """Break lines minimizing squared unused space of the lines.
+
+        The last line is free, it is not taken into account.
+        :param widths: width of each word
+        :widths type: List[float]
+        :param space: width of a space
+        :space type: float
+        :param max_width: max width of the line in pixels
+        :max_width type: int
+        :return: index of the word after the last one of each line
+        :rtype: List[int]
+        """
+        count = len(widths)
+        costs = [0.0] * (count + 1)  # cost of words from i to the end
+        breaks = [count] * (count + 1)
+
+        for i in range(count - 1, -1, -1):
+            costs[i] = math.inf
+            line_width = -space
+
+            for j in range(i, count):
+                line_width += space + widths[j]
+
+                if line_width > max_width and j > i:
+                    break
+
+                cost = 0.0 if j == count - 1 \
+                    else (max_width - line_width) ** 2 + costs[j + 1]
+
+                if cost < costs[i]:
+                    costs[i] = cost
+                    breaks[i] = j + 1
+
+        result = []
+        i = 0
+        while i < count:
+            i = breaks[i]
+            result.append(i)
+
+        return result
@@ -1,4 +1,11 @@
 from .MemeEngine import *
 from .ImageCaptioner import *
+from .ColorAnalyzer import *
+from .FontRegistry import *
+from .ImageCache import *
+from .ImageEncoder import *
+from .MemeBatch import MemeJobResult
+from .RenderCache import *
+from .QuoteFitIndex import *
 from .Exeptions.TextTooLongError import *
 from .ImageEnhancer import *
@@ -4,6 +4,8 @@
 class QuoteModel():
     """Represent data model for quotes."""
 
+    __slots__ = ("body", "author")
+
     def __init__(self, body: str, author: str) -> None:
         """Construct an object of QuoteModel class.
 
@@ -30,6 +32,14 @@ class QuoteModel():
         """
         return len(f"{self.body} {self.author}")
 
+    def to_dict(self) -> dict:
+        """Return the quote as a json serializable dict.
+
+        :return: `body` and `author` of the quote
+        :rtype: dict
+        """
+        return {"body": self.body, "author": self.author}
+
     def __repr__(self) -> str:
         """Return string representation of a QuoteModel."""
         return f"{self.body}-{self.author}"
@@ -0,0 +1,131 @@
+"""Compact storage of many quotes."""
+
+import sys
+from array import array
+from typing import Iterable, Iterator, List
+
+from .QuoteModel import QuoteModel
+
+
+class QuoteStore():
+    """Keep quotes in columns instead of one object per quote.
+
+    Bodies are joined in a single utf-8 buffer with an array of their
+    offsets, each author is kept once and quotes refer to it by number.
+    Quotes are handed out as new `QuoteModel` objects on access,
+    so the store behaves like a read only list of quotes.
+    :param quotes: quotes to store
+    :quotes type: Iterable[QuoteModel], optional
+    """
+
+    def __init__(self, quotes: Iterable[QuoteModel] = ()) -> None:
+        """Create an instance."""
+        self._bodies = bytearray()  # utf-8 bodies one after another
+        self._offsets = array("Q", [0])  # body i is [offsets[i]:[i + 1]]
+        self._author_ids = array("I")  # author of each quote
+        self._authors = []  # unique authors
+        self._author_index = {}  # author -> position in `_authors`
+
+        self.extend(quotes)
+
+    def __len__(self) -> int:
+        """Return count of stored quotes."""
+        return len(self._author_ids)
+
+    def __getitem__(self, index: int) -> QuoteModel:
+        """Get the quote at the position.
+
+        :param index: position of the quote, negative counts from the end
+        :index type: int
+        :return: new `QuoteModel` object of the quote
+        :rtype: `QuoteModel`
+        :raises IndexError: position is out of range
+        """
+        return QuoteModel(self.get_body(index), self.get_author(index))
+
+    def __iter__(self) -> Iterator[QuoteModel]:
+        """Iterate over the quotes in the order they were added."""
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        """Return string representation of a QuoteStore."""
+        return f"QuoteStore({len(self)} quotes, {len(self._authors)} authors)"
+
+    @property
+    def authors(self) -> List[str]:
+        """Get unique authors in the order of their first quote."""
+        return list(self._authors)
+
+    @property
+    def nbytes(self) -> int:
+        """Get count of bytes taken by the columns, without authors."""
+        return (len(self._bodies)
+                + self._offsets.itemsize * len(self._offsets)
+                + self._author_ids.itemsize * len(self._author_ids))
+
+    def append(self, quote: QuoteModel) -> None:
+        """Add the quote at the end.
+
+        :param quote: quote to add
+        :quote type: `QuoteModel`
+        """
+        author_id = self._author_index.get(quote.author)
+        if author_id is None:
+            author_id = len(self._authors)
+            self._authors.append(sys.intern(quote.author))
+            self._author_index[self._authors[-1]] = author_id
+
+        self._bodies += quote.body.encode("utf-8")
+        self._offsets.append(len(self._bodies))
+        self._author_ids.append(author_id)
+
+    def extend(self, quotes: Iterable[QuoteModel]) -> None:
+        """Add all the quotes at the end.
+
+        :param quotes: quotes to add
+        :quotes type: Iterable[QuoteModel]
+        """
+        for quote in quotes:
+            self.append(quote)
+
+    def get_body(self, index: int) -> str:
+        """Get body of the quote without creating the quote.
+
+        :param index: position of the quote, negative counts from the end
+        :index type: int
+        :return: the body
+        :rtype: str
+        :raises IndexError: position is out of range
+        """
+        index = self._check_index(index)
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._bodies[start:end].decode("utf-8")
+
+    def get_author(self, index: int) -> str:
+        """Get author of the quote without creating the quote.
+
+        :param index: position of the quote, negative counts from the end
+        :index type: int
+        :return: the author
+        :rtype: str
+        :raises IndexError: position is out of range
+        """
+        return self._authors[self._author_ids[self._check_index(index)]]
+
+    def _check_index(self, index: int) -> int:
+        """Turn the position into a non negative one.
+
+        :param index: position of the quote, negative counts from the end
+        :index type: int
+        :return: non negative position
+        :rtype: int
+        :raises IndexError: position is out of range
+        """
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError("QuoteStore index out of range")
+
+        return index
@@ -1 +1,2 @@
 from .QuoteModel import*
+from .QuoteStore import *
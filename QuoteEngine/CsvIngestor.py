@@ -3,9 +3,9 @@
 The QuoteEngine module is responsible for
 ingesting many types of files that contain quotes.
 """
-from typing import List
+import csv
+from typing import Iterator, List
 
-import pandas as pd
 from Models.QuoteModel import QuoteModel
 
 from QuoteEngine.CustomErrors import WrongFileStructureError
@@ -14,9 +14,23 @@ from .IngestorInterface import IngestorInterface
 
 
 class CsvIngestor(IngestorInterface):
-    """An infractructure to process csv files."""
+    """An infractructure to process csv files.
+
+    :data COLUMNS: columns with the quote and the author
+    :COLUMNS type: List[str]
+    :data NA_VALUES: cell values meaning a missing value
+    :NA_VALUES type: Set[str]
+    """
 
     SUPPORTED_FORMATS = [".csv"]
+    PARSER_VERSION = 2
+    CPU_BOUND = True  # parsed in a process pool
+    COLUMNS = ["body", "author"]
+    NA_VALUES = {
+        "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN",
+        "-nan", "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN",
+        "n/a", "nan", "null"
+    }
 
     @classmethod
     def parse(cls, path: str) -> List[QuoteModel]:
@@ -27,11 +41,44 @@ class CsvIngestor(IngestorInterface):
         :return: Collection of `QuoteModel` objects
         :rtype: List[QuoteModel]
         """
-        data = []
+        return list(cls.iter_parse(path))
+
+    @classmethod
+    def iter_parse(cls, path: str) -> Iterator[QuoteModel]:
+        """Parse csv file row by row.
+
+        :param path: path to csv file
+        :path type: str
+        :return: `QuoteModel` objects in the file order
+        :rtype: Iterator[QuoteModel]
+        :raises WrongFileStructureError: file has no `body`
+            and `author` columns
+        """
+        with open(path, "r", encoding="utf-8-sig", newline="") as file:
+            reader = csv.reader(file)
+            positions = cls.get_positions(next(reader, []))
+
+            for row in reader:  # map and check values
+                if not row:  # skip blank lines
+                    continue
+
+                quote = cls.row_to_quote(row, positions)
+                if quote is not None:
+                    yield quote  # return only good quotes
+
+    @classmethod
+    def get_positions(cls, header: List[str]) -> List[int]:
+        """Find positions of the `body` and `author` columns.
+
+        :param header: column names
+        :header type: List[str]
+        :return: position of each of `COLUMNS`
+        :rtype: List[int]
+        :raises WrongFileStructureError: file has no `body`
+            and `author` columns
+        """
         try:
-            data = pd.read_csv(
-                path, usecols=["body", "author"], encoding="utf-8"
-            )
+            return [header.index(column) for column in cls.COLUMNS]
 
         except ValueError:  # map value error to custom error
 
@@ -41,17 +88,27 @@ class CsvIngestor(IngestorInterface):
                 f"'body' and 'author'."
             )
 
-        else:  # file in proper structure, map and check values
-            quotes = list(map(cls.data_to_quotemodel, data.values.tolist()))
-            quotes = list(  # filer None results
-                filter(
-                    lambda q: True if q.body is not None
-                    and q.author is not None else False,
-                    quotes
-                )
-            )
+    @classmethod
+    def row_to_quote(cls, row: List[str],
+                     positions: List[int]) -> QuoteModel:
+        """Map a row of the file to QuoteModel object.
+
+        :param row: cells of the row
+        :row type: List[str]
+        :param positions: positions of the `body` and `author` columns
+        :positions type: List[int]
+        :return: the quote, None if the row is not a valid quote
+        :rtype: `QuoteModel`
+        """
+        data = [row[i] if i < len(row) else "" for i in positions]
+        if any(cell in cls.NA_VALUES for cell in data):  # missing value
+            return None
+
+        quote = cls.data_to_quotemodel(data)
+        if quote.body is None or quote.author is None:
+            return None
 
-            return quotes  # return only good quotes
+        return quote
 
     @classmethod
     def can_ingest(cls, path: str) -> bool:
@@ -3,9 +3,10 @@
 The QuoteEngine module is responsible for
 ingesting many types of files that contain quotes.
 """
-from typing import List
+import zipfile
+from typing import Iterator, List
+from xml.etree import ElementTree
 
-from docx import Document
 from Helpers import ExLogger
 from Models.QuoteModel import QuoteModel
 
@@ -14,9 +15,29 @@ from .IngestorInterface import IngestorInterface
 
 
 class DocxIngestor(IngestorInterface):
-    """An infractructure to process docx files."""
+    """An infractructure to process docx files.
+
+    Paragraphs are streamed from the document xml, so memory does not
+    depend on the document size.
+    :data DOCUMENT: zip member with the document body
+    :DOCUMENT type: str
+    :data W: namespace of WordprocessingML tags
+    :W type: str
+    :data RUN_TEXT: text of run content tags other than `w:t`
+    :RUN_TEXT type: Dict[str, str]
+    """
 
     SUPPORTED_FORMATS = [".docx"]
+    PARSER_VERSION = 2
+    CPU_BOUND = True  # parsed in a process pool
+    DOCUMENT = "word/document.xml"
+    W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+    RUN_TEXT = {
+        f"{W}tab": "\t",
+        f"{W}ptab": "\t",
+        f"{W}cr": "\n",
+        f"{W}noBreakHyphen": "-",
+    }
 
     @classmethod
     def parse(cls, path: str) -> List[QuoteModel]:
@@ -27,21 +48,96 @@ class DocxIngestor(IngestorInterface):
         :return: a `QuoteModel` collection
         :rtype: List[QuoteModel]
         """
-        quotes = []  # quotes to return
+        return list(cls.iter_parse(path))
 
-        document = Document(path)  # object to work with
+    @classmethod
+    def iter_parse(cls, path: str) -> Iterator[QuoteModel]:
+        """Parse docx file paragraph by paragraph.
 
-        for par in document.paragraphs:  # iterate each paragaph
-            data = DocxIngestor.clean_data(par.text)  # prepare uploaded data
+        :param path: `.docx`file path
+        :path type: str
+        :return: `QuoteModel` objects in the document order
+        :rtype: Iterator[QuoteModel]
+        :raises WrongFileStructureError: file is not a docx document
+        """
+        for text in cls.iter_paragraphs(path):  # iterate each paragaph
+            data = DocxIngestor.clean_data(text)  # prepare uploaded data
             if data:
                 try:
-                    quotes.append(
-                        cls.map_to_quote(data)
-                    )
+                    yield cls.map_to_quote(data)
                 except ValueError as e:
                     ExLogger().log(e)  # log error
 
-        return quotes
+    @classmethod
+    def iter_paragraphs(cls, path: str) -> Iterator[str]:
+        """Stream text of body paragraphs, tables are skipped.
+
+        Each top level element of the body is dropped once read.
+        :param path: `.docx`file path
+        :path type: str
+        :return: text of the paragraphs in the document order
+        :rtype: Iterator[str]
+        :raises WrongFileStructureError: file is not a docx document
+        """
+        try:
+            with zipfile.ZipFile(path) as archive, \
+                    archive.open(cls.DOCUMENT) as document:
+                depth = 0  # document -> body -> paragraph
+                body = None
+
+                for event, elem in ElementTree.iterparse(
+                        document, events=("start", "end")):
+
+                    if event == "start":
+                        depth += 1
+                        if depth == 2 and elem.tag == f"{cls.W}body":
+                            body = elem
+                        continue
+
+                    depth -= 1
+                    if depth == 2 and body is not None:  # top level element
+                        if elem.tag == f"{cls.W}p":
+                            yield cls.paragraph_text(elem)
+                        body.clear()  # keep memory constant
+
+        except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+            raise WrongFileStructureError(
+                f"File content is not a docx document: {e}")
+
+    @classmethod
+    def paragraph_text(cls, paragraph: ElementTree.Element) -> str:
+        """Get text of the paragraph as python-docx 1.x gives it.
+
+        Unlike python-docx 0.8, text of hyperlinks is included
+        and tabs, carriage returns and non breaking hyphens are kept.
+
+        :param paragraph: `w:p` element
+        :paragraph type: `xml.etree.ElementTree.Element`
+        :return: text of runs, including runs of hyperlinks
+        :rtype: str
+        """
+        text = []
+
+        for child in paragraph:
+            if child.tag == f"{cls.W}r":
+                runs = [child]
+            elif child.tag == f"{cls.W}hyperlink":
+                runs = child.iterfind(f"{cls.W}r")
+            else:
+                continue
+
+            for run in runs:
+                for elem in run:
+                    if elem.tag == f"{cls.W}t":
+                        text.append(elem.text or "")
+                    elif elem.tag == f"{cls.W}br":  # only line breaks
+                        if elem.get(f"{cls.W}type", "textWrapping") \
+                                == "textWrapping":
+                            text.append("\n")
+                    else:
+                        text.append(cls.RUN_TEXT.get(elem.tag, ""))
+
+        return "".join(text)
 
     @classmethod
     def clean_data(cls, data: str) -> List[str]:
@@ -0,0 +1,38 @@
+"""A part of a QuoteEngine module describing result of parsing a file.
+
+The QuoteEngine module is responsible for
+ingesting many types of files that contain quotes.
+"""
+from typing import List
+
+from Models.QuoteModel import QuoteModel
+
+
+class IngestResult():
+    """Represent result of parsing a single file.
+
+    :param path: path to the file
+    :path type: str
+    :param quotes: parsed quotes, empty if parsing failed
+    :quotes type: List[QuoteModel]
+    :param error: exception raised by the parser, None if it succeeded
+    :error type: Exception
+    """
+
+    def __init__(self, path: str, quotes: List[QuoteModel] = None,
+                 error: Exception = None) -> None:
+        """Create an instance."""
+        self.path = path
+        self.quotes = quotes if quotes is not None else []
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        """Check if the file was parsed."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        """Return string representation of an IngestResult."""
+        result = f"{len(self.quotes)} quotes" if self.ok \
+            else repr(self.error)
+        return f"IngestResult({self.path}: {result})"
@@ -1,13 +1,17 @@
 """Implements IngestorInterface and encapsulates helper classes."""
 
-from typing import List
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, Iterator, List
 
+from Helpers import ExLogger
 from Helpers import Utilities as util
 from Models.QuoteModel import QuoteModel
 
 from .CsvIngestor import CsvIngestor
 from .CustomErrors import UnsupportedFileError
 from .DocxIngestor import DocxIngestor
+from .IngestResult import IngestResult
 from .IngestorInterface import IngestorInterface
 from .PdfIngestor import PdfIngestor
 from .TextIngestor import TextIngestor
@@ -38,12 +42,124 @@ class Ingestor(IngestorInterface):
         :raises UnsupportedFileError: engine does not support
             file with the extentinon
         """
+        return cls.get_ingestor(path).parse(path)
+
+    @classmethod
+    def iter_parse(cls, path: str) -> Iterator[QuoteModel]:
+        """Parse the file lazily with the ingestor of its type.
+
+        :param path: path to the file
+        :path type: str
+        :return: `QuoteModel` objects in the file order
+        :rtype: Iterator[QuoteModel]
+        :raises UnsupportedFileError: engine does not support
+            file with the extentinon
+        """
+        return cls.get_ingestor(path).iter_parse(path)
+
+    @classmethod
+    def iter_corpus(cls, paths: Iterable[str]) -> Iterator[QuoteModel]:
+        """Parse many files lazily, one quote at a time.
+
+        Only a part of a single file is kept in memory, so quote dumps
+        of any size can be filtered or sampled. A file which fails
+        to parse is logged and skipped, quotes it already gave are kept.
+        :param paths: paths to the files
+        :paths type: Iterable[str]
+        :return: `QuoteModel` objects in the order of files
+        :rtype: Iterator[QuoteModel]
+        """
+        for path in paths:
+            try:
+                yield from cls.iter_parse(path)
+
+            except Exception as e:  # report failure of the file
+                ExLogger().log(f"Can't parse quotes from {path}: {e}\n")
+
+    @classmethod
+    def parse_many(cls, paths: List[str],
+                   workers: int = None) -> List[IngestResult]:
+        """Parse many files in parallel.
+
+        Files of `CPU_BOUND` ingestors are parsed in a process pool,
+        text of pdf files is extracted concurrently by `PdfIngestor`,
+        others are parsed in a thread pool. A failed file does not stop
+        the others, its error is reported in the result.
+        :param paths: paths to the files
+        :paths type: List[str]
+        :param workers: count of workers of each pool,
+            default cpu count
+        :workers type: int, optional
+        :return: result of each file in the order of paths
+        :rtype: List[IngestResult]
+        """
+        workers = workers or os.cpu_count() or 1
+        paths = list(paths)
+
+        ingestors = []
+        for path in paths:
+            try:
+                ingestors.append(cls.get_ingestor(path))
+            except UnsupportedFileError:
+                ingestors.append(None)  # reported by the thread pool
+
+        cpu_bound = [i is not None and i.CPU_BOUND for i in ingestors]
+        use_processes = workers > 1 and sum(cpu_bound) > 1
+
+        pdf_paths = [p for p, i in zip(paths, ingestors) if i is PdfIngestor]
+
+        with ThreadPoolExecutor(max_workers=workers) as threads:
+            processes = ProcessPoolExecutor(max_workers=workers) \
+                if use_processes else None
+
+            try:
+                pdf_future = threads.submit(  # one concurrent batch
+                    PdfIngestor.parse_many, pdf_paths) if pdf_paths else None
+
+                futures = [
+                    None if ingestor is PdfIngestor
+                    else (processes if use_processes and is_cpu_bound
+                          else threads).submit(cls.parse, path)
+                    for path, ingestor, is_cpu_bound
+                    in zip(paths, ingestors, cpu_bound)
+                ]
+
+                pdf_results = iter(pdf_future.result() if pdf_future else [])
+
+                results = []
+                for path, future in zip(paths, futures):
+                    if future is None:  # pdf file
+                        results.append(next(pdf_results))
+                        continue
+
+                    try:
+                        results.append(IngestResult(path, future.result()))
+                    except Exception as e:  # report failure of the file
+                        results.append(IngestResult(path, error=e))
+
+            finally:
+                if processes is not None:
+                    processes.shutdown()
+
+        return results
+
+    @classmethod
+    def get_ingestor(cls, path: str) -> IngestorInterface:
+        """Find ingestor for the given file type.
+
+        :param path: path to the file
+        :path type: str
+        :return: ingestor class supporting the file
+        :rtype: `IngestorInterface`
+        :raises UnsupportedFileError: engine does not support
+            file with the extentinon
+        """
         format = util.get_extension(path)  # extract extension from path
 
         for ingestor in cls.INGESTORS:  # find proper ingestor for the file
 
             if format in ingestor.__dict__.get("SUPPORTED_FORMATS", False):
-                return ingestor.parse(path)
+                return ingestor
 
         raise UnsupportedFileError(f"File format: {format} is not supported!")
 
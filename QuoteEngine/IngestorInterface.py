@@ -4,14 +4,26 @@ The QuoteEngine module is responsible for
 ingesting many types of files that contain quotes.
 """
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 
 from Helpers import Utilities as util
 from Models.QuoteModel import QuoteModel
 
 
 class IngestorInterface(ABC):
-    """Abstract base class for all class responsible for parsing files."""
+    """Abstract base class for all class responsible for parsing files.
+
+    :data PARSER_VERSION: version of the parser, bump it when
+        the parsing changes to invalidate cached quotes
+    :PARSER_VERSION type: int
+    :data CPU_BOUND: True if parsing is limited by the processor
+        and runs in a process pool, False if it waits for I/O
+        or a subprocess and runs in a thread pool
+    :CPU_BOUND type: bool
+    """
+
+    PARSER_VERSION = 1
+    CPU_BOUND = False
 
     @classmethod
     def can_ingest(cls, path: str) -> bool:
@@ -40,3 +52,16 @@ class IngestorInterface(ABC):
         :rtype: List[QuoteModel]
         """
         pass
+
+    @classmethod
+    def iter_parse(cls, path: str) -> Iterator[QuoteModel]:
+        """Parse given file lazily, quote by quote.
+
+        Ingestors able to read the file in parts override it,
+        by default the whole file is parsed at once.
+        :param path: path to file
+        :path type: str
+        :return: `QuoteModel` objects in the file order
+        :rtype: Iterator[QuoteModel]
+        """
+        yield from cls.parse(path)
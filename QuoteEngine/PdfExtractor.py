@@ -0,0 +1,257 @@
+"""A part of a QuoteEngine module extracting text from pdf files.
+
+The QuoteEngine module is responsible for
+ingesting many types of files that contain quotes.
+"""
+import asyncio
+import hashlib
+import os
+import pathlib
+import signal
+import subprocess
+import tempfile
+import threading
+from typing import List
+
+from .CustomErrors import WrongFileStructureError
+
+
+class PdfExtractor():
+    """Extract text of many pdf files concurrently, each only once.
+
+    Text is extracted by `pdftotext` subprocesses, at most
+    `max_workers` at once, a process running longer than `TIMEOUT`
+    is killed. If `pdftotext` is not installed or fails, the text is
+    extracted with the pure python `pypdf` package, if it is installed.
+    Extracted text is kept on disk under the hash of the file content,
+    so a file is extracted again only if its content changes.
+    :data DEF_CACHE_DIR: default dir to keep extracted text in
+    :DEF_CACHE_DIR type: str
+    :data TIMEOUT: max seconds of a single extraction
+    :TIMEOUT type: int
+    :data COMMAND: command extracting text to stdout, without the path
+    :COMMAND type: List[str]
+    :param cache_dir: dir to keep extracted text in,
+        None to extract files every time
+    :cache_dir type: str, optional
+    :param max_workers: max count of concurrent extractions,
+        default cpu count
+    :max_workers type: int, optional
+    """
+
+    DEF_CACHE_DIR = "_data/cache/pdf_text"
+    TIMEOUT = 15
+    COMMAND = ["pdftotext"]
+
+    _extractors = {}
+    _extractors_lock = threading.Lock()
+
+    def __init__(self, cache_dir: str = DEF_CACHE_DIR,
+                 max_workers: int = None) -> None:
+        """Create an instance."""
+        self.cache_dir = pathlib.Path(cache_dir) \
+            if cache_dir is not None else None
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+        self._digests = {}  # (path, mtime, size) -> digest of the file
+
+    @classmethod
+    def get_extractor(cls, cache_dir: str = DEF_CACHE_DIR) -> "PdfExtractor":
+        """Get the process-wide extractor for the cache dir.
+
+        :param cache_dir: dir to keep extracted text in
+        :cache_dir type: str, optional
+        :return: extractor shared by the whole process
+        :rtype: `PdfExtractor`
+        """
+        with cls._extractors_lock:
+            if cache_dir not in cls._extractors:
+                cls._extractors[cache_dir] = cls(cache_dir)
+
+            return cls._extractors[cache_dir]
+
+    def extract(self, path: str) -> str:
+        """Extract text of the pdf file.
+
+        :param path: path to pdf file
+        :path type: str
+        :return: text of the file
+        :rtype: str
+        :raises subprocess.TimeoutExpired: extraction took too long
+        :raises WrongFileStructureError: text can't be extracted
+        """
+        text, = self.extract_many([path])
+        if isinstance(text, Exception):
+            raise text
+
+        return text
+
+    def extract_many(self, paths: List[str]) -> List[object]:
+        """Extract text of many pdf files concurrently.
+
+        A failed file does not stop the others.
+        :param paths: paths to pdf files
+        :paths type: List[str]
+        :return: text of each file or the exception raised
+            extracting it, in the order of paths
+        :rtype: List[object]
+        """
+        return asyncio.run(self._extract_all(list(paths)))
+
+    def file_digest(self, path: str) -> str:
+        """Hash the file content.
+
+        Digests are remembered until the file changes.
+        :param path: A path to the file
+        :path type: str
+        :return: hex digest of the file content
+        :rtype: str
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+        digest = self._digests.get(key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(path, "rb") as file:
+                for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                    sha.update(chunk)
+            digest = self._digests[key] = sha.hexdigest()
+
+        return digest
+
+    async def _extract_all(self, paths: List[str]) -> List[object]:
+        """Extract all files with at most `max_workers` at once.
+
+        :param paths: paths to pdf files
+        :paths type: List[str]
+        :return: text or exception of each file
+        :rtype: List[object]
+        """
+        limit = asyncio.Semaphore(self.max_workers)
+
+        async def extract(path: str) -> str:
+            async with limit:
+                return await self._extract_cached(path)
+
+        return await asyncio.gather(
+            *(extract(path) for path in paths), return_exceptions=True)
+
+    async def _extract_cached(self, path: str) -> str:
+        """Get the text from the cache, extract and cache it if missing.
+
+        :param path: path to pdf file
+        :path type: str
+        :return: text of the file
+        :rtype: str
+        """
+        if self.cache_dir is None:
+            return await self._extract(path)
+
+        # no extension, not to be found as a txt quote file
+        cache_path = self.cache_dir / self.file_digest(path)
+        try:
+            return cache_path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            pass
+
+        text = await self._extract(path)
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self.cache_dir,
+                prefix=".", suffix=".tmp", delete=False) as file:
+            file.write(text)
+        os.replace(file.name, cache_path)  # readers never see a partial file
+
+        return text
+
+    async def _extract(self, path: str) -> str:
+        """Extract text with `pdftotext`, fall back to `pypdf`.
+
+        :param path: path to pdf file
+        :path type: str
+        :return: text of the file
+        :rtype: str
+        :raises subprocess.TimeoutExpired: `pdftotext` took too long
+        :raises WrongFileStructureError: text can't be extracted
+        """
+        command = [*self.__class__.COMMAND, str(path), "-"]
+
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                start_new_session=True  # own process group to kill
+            )
+
+        except FileNotFoundError:  # pdftotext is not installed
+            return await self._extract_fallback(path, None)
+
+        try:
+            stdout, _ = await asyncio.wait_for(
+                proc.communicate(), timeout=self.__class__.TIMEOUT)
+
+        except asyncio.TimeoutError:
+            self._kill(proc)
+            await proc.wait()
+
+            raise subprocess.TimeoutExpired(command, self.__class__.TIMEOUT)
+
+        if proc.returncode != 0:
+            return await self._extract_fallback(
+                path, f"pdftotext exited with code {proc.returncode}")
+
+        return stdout.decode("utf-8", errors="replace")
+
+    @classmethod
+    def _kill(cls, proc: asyncio.subprocess.Process) -> None:
+        """Kill the process with all processes it started.
+
+        :param proc: the process
+        :proc type: `asyncio.subprocess.Process`
+        """
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:  # Windows
+                proc.kill()
+
+        except ProcessLookupError:  # already finished
+            pass
+
+    async def _extract_fallback(self, path: str, reason: str) -> str:
+        """Extract text with `pypdf` in a worker thread.
+
+        :param path: path to pdf file
+        :path type: str
+        :param reason: why `pdftotext` was not used,
+            None if it is not installed
+        :reason type: str
+        :return: text of the file
+        :rtype: str
+        :raises WrongFileStructureError: text can't be extracted
+        """
+        try:
+            from pypdf import PdfReader  # optional pure python extractor
+
+        except ImportError:
+            raise WrongFileStructureError(
+                f"Can't extract text from {path}: "
+                f"{reason or 'pdftotext is not installed'}."
+            )
+
+        def read() -> str:
+            try:
+                pages = PdfReader(path).pages
+                text = "\n".join(page.extract_text() or "" for page in pages)
+
+            except Exception as e:  # map pypdf errors to custom error
+                raise WrongFileStructureError(
+                    f"Can't extract text from {path}: {e}")
+
+            # no trailing spaces and blank lines made of them, as pdftotext
+            return "\n".join(line.rstrip() for line in text.splitlines())
+
+        return await asyncio.get_running_loop().run_in_executor(None, read)
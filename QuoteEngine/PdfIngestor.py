@@ -3,23 +3,28 @@
 The QuoteEngine module is responsible for
 ingesting many types of files that contain quotes.
 """
-import subprocess
-from asyncio.subprocess import PIPE
-from typing import List
+from typing import Iterator, List
 
 from Models.QuoteModel import QuoteModel
 
 from .CustomErrors import WrongFileStructureError
 from .IngestorInterface import IngestorInterface
+from .IngestResult import IngestResult
+from .PdfExtractor import PdfExtractor
 
 
 class PdfIngestor(IngestorInterface):
     """An infractructure to process pdf files.
 
+    Text of the files is extracted by `PdfExtractor`.
     :data SUPPORTED_FORMATS: supported file extensions
+    :data TEXT_CACHE_DIR: dir to keep extracted text in,
+        None to extract files every time
+    :TEXT_CACHE_DIR type: str
     """
 
     SUPPORTED_FORMATS = [".pdf"]
+    TEXT_CACHE_DIR = PdfExtractor.DEF_CACHE_DIR
 
     @classmethod
     def parse(cls, path: str) -> List[QuoteModel]:
@@ -30,30 +35,57 @@ class PdfIngestor(IngestorInterface):
         :return: a collection of `QuoteModel` objects
         :rtype: List[`QuoteModel`]
         """
-        quotes = []
+        return list(cls.iter_parse(path))
 
-        with subprocess.Popen(
-            ["pdftotext", path, "-"],  # the command
-            stdout=PIPE,
-            stderr=PIPE
-        ) as proc:
+    @classmethod
+    def iter_parse(cls, path: str) -> Iterator[QuoteModel]:
+        """Parse pdf file line by line.
+
+        :param path: path to pdf file
+        :param type: srt
+        :return: `QuoteModel` objects in the file order
+        :rtype: Iterator[`QuoteModel`]
+        :raises subprocess.TimeoutExpired: text extraction took too long
+        """
+        text = PdfExtractor.get_extractor(cls.TEXT_CACHE_DIR).extract(path)
+        yield from cls.text_to_quotes(text)
+
+    @classmethod
+    def parse_many(cls, paths: List[str]) -> List[IngestResult]:
+        """Parse many pdf files, extract their text concurrently.
 
+        :param paths: paths to pdf files
+        :paths type: List[str]
+        :return: result of each file in the order of paths
+        :rtype: List[IngestResult]
+        """
+        extractor = PdfExtractor.get_extractor(cls.TEXT_CACHE_DIR)
+        results = []
+
+        for path, text in zip(paths, extractor.extract_many(paths)):
             try:
-                out, err = proc.communicate(timeout=15)
+                if isinstance(text, Exception):
+                    raise text
 
-            except TimeoutError:
-                proc.kill()  # kill the process
-                out, err = proc.communicate()
+                results.append(IngestResult(path, cls.text_to_quotes(text)))
 
-            else:
-                data = PdfIngestor.clean_data(out.decode("utf-8"))  # prepare
+            except Exception as e:  # report failure of the file
+                results.append(IngestResult(path, error=e))
 
-                for data_row in data:
-                    quotes.append(
-                        cls.map_to_quote(data_row)  # map to QuoteModel
-                    )
+        return results
+
+    @classmethod
+    def text_to_quotes(cls, text: str) -> List[QuoteModel]:
+        """Map extracted text to `QuoteModel` objects.
 
-        return quotes
+        :param text: text of pdf file
+        :text type: str
+        :return: a collection of `QuoteModel` objects
+        :rtype: List[`QuoteModel`]
+        :raises WrongFileStructureError: a line is not a quote
+        """
+        return [cls.map_to_quote(data_row)  # map each line to QuoteModel
+                for data_row in cls.clean_data(text)]
 
     @classmethod
     def clean_data(cls, data: str) -> List[str]:
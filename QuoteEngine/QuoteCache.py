@@ -0,0 +1,206 @@
+"""A part of a QuoteEngine module caching parsed quotes on disk.
+
+The QuoteEngine module is responsible for
+ingesting many types of files that contain quotes.
+"""
+import os
+import pathlib
+import sqlite3
+import threading
+from typing import Callable, Iterable, List, Tuple
+
+from Models.QuoteModel import QuoteModel
+
+from .Ingestor import Ingestor
+
+
+class QuoteCache():
+    """Keep quotes parsed from files in a SQLite database.
+
+    Quotes of a file are reused as long as the file modification time,
+    size and the version of its parser are unchanged, otherwise the file
+    is parsed again. Files which fail to parse are never cached.
+    :data DEF_CACHE_PATH: default location of the database
+    :DEF_CACHE_PATH type: str
+    :data SCHEMA: tables of the database
+    :SCHEMA type: str
+    :param cache_path: location of the database
+    :cache_path type: str, optional
+    """
+
+    DEF_CACHE_PATH = "_data/cache/quotes.sqlite3"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            parser TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS quotes (
+            path TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            body TEXT NOT NULL,
+            author TEXT NOT NULL,
+            PRIMARY KEY (path, position)
+        );
+    """
+
+    def __init__(self, cache_path: str = DEF_CACHE_PATH) -> None:
+        """Create an instance."""
+        self.cache_path = cache_path
+
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parser_version(cls, path: str) -> str:
+        """Get name and version of the parser of the file.
+
+        :param path: path to the file
+        :path type: str
+        :return: e.g. `CsvIngestor:1`
+        :rtype: str
+        :raises UnsupportedFileError: engine does not support
+            file with the extentinon
+        """
+        ingestor = Ingestor.get_ingestor(path)
+        return f"{ingestor.__name__}:{ingestor.PARSER_VERSION}"
+
+    @classmethod
+    def make_key(cls, path: str) -> Tuple[str, int, int, str]:
+        """Build the cache key of the file.
+
+        :param path: path to the file
+        :path type: str
+        :return: path, modification time, size and parser version
+        :rtype: Tuple[str, int, int, str]
+        :raises FileNotFoundError: file does not exist
+        """
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size,
+                cls.parser_version(path))
+
+    def get(self, path: str) -> List[QuoteModel]:
+        """Get cached quotes of the file.
+
+        :param path: path to the file
+        :path type: str
+        :return: quotes or None if the file changed or is not cached
+        :rtype: List[QuoteModel]
+        """
+        key = self.make_key(path)
+
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT mtime_ns, size, parser FROM files WHERE path = ?",
+                (key[0],)
+            ).fetchone()
+
+            if row is None or tuple(row) != key[1:]:
+                return None
+
+            rows = connection.execute(
+                "SELECT body, author FROM quotes "
+                "WHERE path = ? ORDER BY position",
+                (key[0],)
+            ).fetchall()
+
+        return [QuoteModel(body, author) for body, author in rows]
+
+    def put(self, path: str, quotes: List[QuoteModel]) -> None:
+        """Cache quotes of the file, replace the old ones.
+
+        :param path: path to the file
+        :path type: str
+        :param quotes: quotes parsed from the file
+        :quotes type: List[QuoteModel]
+        """
+        key = self.make_key(path)
+
+        with self._lock:
+            connection = self._connect()
+            with connection:  # one transaction
+                connection.execute(
+                    "DELETE FROM quotes WHERE path = ?", (key[0],))
+                connection.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", key)
+                connection.executemany(
+                    "INSERT INTO quotes VALUES (?, ?, ?, ?)",
+                    ((key[0], position, quote.body, quote.author)
+                     for position, quote in enumerate(quotes))
+                )
+
+    def parse(self, path: str,
+              parser: Callable[[str], List[QuoteModel]] = Ingestor.parse
+              ) -> List[QuoteModel]:
+        """Get cached quotes of the file, parse and cache them if missing.
+
+        :param path: path to the file
+        :path type: str
+        :param parser: function to parse the file with
+        :parser type: Callable[[str], List[QuoteModel]], optional
+        :return: quotes of the file
+        :rtype: List[QuoteModel]
+        """
+        quotes = self.get(path)
+
+        if quotes is None:
+            quotes = parser(path)
+            self.put(path, quotes)
+
+        return quotes
+
+    def prune(self, paths: Iterable[str]) -> None:
+        """Remove cached quotes of all files but the given ones.
+
+        :param paths: paths to files which are still in use
+        :paths type: Iterable[str]
+        """
+        keep = {os.path.abspath(path) for path in paths}
+
+        with self._lock:
+            connection = self._connect()
+            stale = [
+                (path,) for path, in connection.execute(
+                    "SELECT path FROM files")
+                if path not in keep
+            ]
+
+            with connection:
+                connection.executemany(
+                    "DELETE FROM quotes WHERE path = ?", stale)
+                connection.executemany(
+                    "DELETE FROM files WHERE path = ?", stale)
+
+    def clear(self) -> None:
+        """Remove all cached quotes."""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM quotes")
+                connection.execute("DELETE FROM files")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and create missing tables.
+
+        :return: database connection
+        :rtype: `sqlite3.Connection`
+        """
+        if self._connection is None:
+            pathlib.Path(self.cache_path).parent.mkdir(
+                parents=True, exist_ok=True)
+
+            self._connection = sqlite3.connect(
+                self.cache_path, check_same_thread=False)
+            self._connection.executescript(self.__class__.SCHEMA)
+
+        return self._connection
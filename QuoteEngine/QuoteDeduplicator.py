@@ -0,0 +1,152 @@
+"""A part of a QuoteEngine module dropping repeated quotes.
+
+The QuoteEngine module is responsible for
+ingesting many types of files that contain quotes.
+"""
+import hashlib
+import re
+import unicodedata
+from typing import Iterable, Iterator, List, Tuple
+
+from Models.QuoteModel import QuoteModel
+
+
+class QuoteDeduplicator():
+    """Find the same quotes written in slightly different ways.
+
+    Body and author are normalized, the hash of the normalized quote
+    is kept for every distinct quote together with count of its
+    occurrences and sources it came from. A quote is a duplicate if
+    a quote with the same hash was already added, so any number
+    of quotes is deduplicated in a single pass.
+    :data QUOTE_MARKS: unicode quotation marks and their ascii versions
+    :QUOTE_MARKS type: Dict[int, str]
+    :data DASHES: unicode dashes and hyphens
+    :DASHES type: str
+    :data DIGEST_SIZE: bytes of the hash of a quote
+    :DIGEST_SIZE type: int
+    """
+
+    QUOTE_MARKS = str.maketrans({
+        "‘": "'", "’": "'", "‚": "'", "‛": "'",
+        "′": "'", "‹": "'", "›": "'",
+        "“": '"', "”": '"', "„": '"', "‟": '"',
+        "″": '"', "«": '"', "»": '"',
+    })
+    DASHES = "‐‑‒–—―−﹘﹣－"
+    DIGEST_SIZE = 16
+
+    _dashes = re.compile(f"[{DASHES}]")
+
+    def __init__(self) -> None:
+        """Create an instance."""
+        self.quotes = []  # distinct quotes in the order of first occurrence
+        self._entries = {}  # hash -> [position in `quotes`, count, sources]
+
+    def __len__(self) -> int:
+        """Return count of distinct quotes."""
+        return len(self.quotes)
+
+    @classmethod
+    def normalize(cls, text: str) -> str:
+        """Normalize the text to compare it with other texts.
+
+        Apply NFKC, turn unicode quotation marks and dashes into ascii,
+        collapse whitespace, drop surrounding quotation marks
+        and ignore case.
+        :param text: body or author of a quote
+        :text type: str
+        :return: normalized text
+        :rtype: str
+        """
+        if not text.isascii():  # most quotes are plain ascii
+            text = unicodedata.normalize("NFKC", text)
+            text = cls._dashes.sub("-", text.translate(cls.QUOTE_MARKS))
+
+        return " ".join(text.split()).strip("\"'").strip().casefold()
+
+    @classmethod
+    def make_key(cls, quote: QuoteModel) -> bytes:
+        """Hash the normalized quote.
+
+        :param quote: the quote
+        :quote type: `QuoteModel`
+        :return: digest of the normalized body and author
+        :rtype: bytes
+        """
+        content = f"{cls.normalize(quote.body)}\x1f" \
+                  f"{cls.normalize(quote.author)}"
+        return hashlib.blake2b(
+            content.encode("utf-8"), digest_size=cls.DIGEST_SIZE).digest()
+
+    def add(self, quote: QuoteModel, source: str = None) -> bool:
+        """Add the quote, remember it if it was not added yet.
+
+        :param quote: the quote
+        :quote type: `QuoteModel`
+        :param source: where the quote comes from, e.g. a file path
+        :source type: str, optional
+        :return: True if the quote is new, False for a duplicate
+        :rtype: bool
+        """
+        key = self.make_key(quote)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self._entries[key] = [len(self.quotes), 1, [source]]
+            self.quotes.append(quote)
+            return True
+
+        entry[1] += 1
+        if source not in entry[2]:
+            entry[2].append(source)
+        return False
+
+    def iter_unique(self, quotes: Iterable[QuoteModel],
+                    source: str = None) -> Iterator[QuoteModel]:
+        """Add the quotes, yield only new ones.
+
+        :param quotes: quotes to add
+        :quotes type: Iterable[QuoteModel]
+        :param source: where the quotes come from, e.g. a file path
+        :source type: str, optional
+        :return: quotes which were not added before
+        :rtype: Iterator[QuoteModel]
+        """
+        for quote in quotes:
+            if self.add(quote, source):
+                yield quote
+
+    def count(self, quote: QuoteModel) -> int:
+        """Get how many times the quote was added.
+
+        :param quote: the quote, in any of its forms
+        :quote type: `QuoteModel`
+        :return: count of occurrences, 0 if it was never added
+        :rtype: int
+        """
+        entry = self._entries.get(self.make_key(quote))
+        return entry[1] if entry is not None else 0
+
+    def sources(self, quote: QuoteModel) -> List[str]:
+        """Get sources the quote was added from.
+
+        :param quote: the quote, in any of its forms
+        :quote type: `QuoteModel`
+        :return: sources in the order of first occurrence
+        :rtype: List[str]
+        """
+        entry = self._entries.get(self.make_key(quote))
+        return list(entry[2]) if entry is not None else []
+
+    def duplicates(self) -> List[Tuple[QuoteModel, int, List[str]]]:
+        """Get quotes added more than once.
+
+        :return: (kept quote, count of occurrences, sources) tuples
+        :rtype: List[Tuple[QuoteModel, int, List[str]]]
+        """
+        return [
+            (self.quotes[position], count, list(sources))
+            for position, count, sources in self._entries.values()
+            if count > 1
+        ]
@@ -0,0 +1,689 @@
+"""A part of a QuoteEngine module drawing quotes without parsing files.
+
+The QuoteEngine module is responsible for
+ingesting many types of files that contain quotes.
+"""
+import csv
+import hashlib
+import mmap
+import os
+import pathlib
+import random
+import struct
+import sys
+import threading
+from array import array
+from typing import Dict, List, Set, Tuple
+
+from Helpers import ExLogger
+from Helpers import Utilities as util
+from Models.QuoteModel import QuoteModel
+
+from .CsvIngestor import CsvIngestor
+from .CustomErrors import WrongFileStructureError
+from .Ingestor import Ingestor
+from .QuoteCache import QuoteCache
+from .QuoteDeduplicator import QuoteDeduplicator
+from .TextIngestor import TextIngestor
+
+
+class QuoteOffsetIndex():
+    """Draw a random quote from many files in constant time.
+
+    For each line oriented file, txt or csv without line breaks inside
+    cells, a sidecar file keeps the byte offset of every valid quote
+    record and their count. A quote is drawn by choosing a file
+    weighted by its count and reading a single record through mmap,
+    so the cost does not depend on the corpus size. Sidecars are built
+    once and rebuilt when the file modification time, size or parser
+    version change. Other files are parsed, through `QuoteCache`,
+    and kept in memory. The sidecar also keeps the
+    `QuoteDeduplicator` key of every record, so a quote repeated
+    in the same or a later file is skipped and every distinct quote
+    has the same chance to be drawn. What was counted is saved in
+    a manifest of the whole set of files, next runs only check the
+    files and read the records to draw from the mapped manifest.
+    :data DEF_INDEX_DIR: default dir to keep sidecar files in
+    :DEF_INDEX_DIR type: str
+    :data INDEXED_FORMATS: line oriented file formats
+    :INDEXED_FORMATS type: List[str]
+    :data VERSION: version of the sidecar layout
+    :VERSION type: int
+    :data HEADER: sidecar header: magic, layout version, parser version,
+        file modification time, file size and record count,
+        followed by the offsets and keys of the records
+    :HEADER type: `struct.Struct`
+    :data MANIFEST_HEADER: manifest header: magic, layout version and
+        file count, followed by a `MANIFEST_ENTRY` of each file and
+        the drawn records of files with repeated quotes
+    :MANIFEST_HEADER type: `struct.Struct`
+    :data MANIFEST_ENTRY: file modification time, file size, parser
+        version, if the file is indexed, record count, quote count
+        and position of its drawn records, -1 if all are drawn
+    :MANIFEST_ENTRY type: `struct.Struct`
+    :param paths: paths to quote files
+    :paths type: List[str]
+    :param index_dir: dir to keep sidecar files in
+    :index_dir type: str, optional
+    :param cache_path: location of parsed quotes cache of not indexed
+        files, None to parse them every time
+    :cache_path type: str, optional
+    :param dedupe: skip quotes repeated in the files
+    :dedupe type: bool, optional
+    """
+
+    DEF_INDEX_DIR = "_data/cache/offsets"
+    INDEXED_FORMATS = [".txt", ".csv"]
+    VERSION = 2
+
+    MAGIC = b"QOFF"
+    HEADER = struct.Struct("<4sHHqQQ")
+    OFFSET = struct.Struct("<Q")
+
+    MANIFEST_MAGIC = b"QMAN"
+    MANIFEST_HEADER = struct.Struct("<4sHQ")
+    MANIFEST_ENTRY = struct.Struct("<qQH?QQq")
+    DRAWN = struct.Struct("<I")
+
+    def __init__(self, paths: List[str], index_dir: str = DEF_INDEX_DIR,
+                 cache_path: str = QuoteCache.DEF_CACHE_PATH,
+                 dedupe: bool = True) -> None:
+        """Create an instance."""
+        self.paths = sorted(paths)  # the same seed draws the same quote
+        self.index_dir = pathlib.Path(index_dir)
+        self.cache_path = cache_path
+        self.dedupe = dedupe
+
+        # (file -> count of quotes, not indexed file -> quotes, file ->
+        #  (is indexed, count of records, drawn records or None if all))
+        self._index = None
+        self._cache = None  # `QuoteCache` open while counting
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return count of quotes in all files."""
+        return sum(self.counts().values())
+
+    @classmethod
+    def can_index(cls, path: str) -> bool:
+        """Check if the file format is line oriented.
+
+        A csv file with line breaks inside cells is still not indexed,
+        it is found out while building its sidecar.
+        :param path: path to the file
+        :path type: str
+        :return: True if the file may be indexed, otherwise False
+        :rtype: bool
+        """
+        return util.get_extension(path) in cls.INDEXED_FORMATS
+
+    def counts(self) -> Dict[str, int]:
+        """Get count of quotes in each file.
+
+        Counts are read from the manifest if none of the files changed,
+        otherwise missing and stale sidecars are built, not indexed
+        files parsed and the manifest saved again. Repeated quotes
+        are counted only in the file they occur first.
+        :return: file path -> count of quotes
+        :rtype: Dict[str, int]
+        """
+        return self._get_index()[0]
+
+    def sample(self, rng: random.Random = None) -> QuoteModel:
+        """Draw a random quote.
+
+        Every distinct quote has the same chance to be drawn.
+        :param rng: random numbers generator, default `random` module
+        :rng type: `random.Random`, optional
+        :return: drawn quote
+        :rtype: `QuoteModel`
+        :raises IndexError: there are no quotes in the files
+        """
+        rng = rng or random
+
+        while True:
+            counts = self.counts()
+
+            total = sum(counts.values())
+            if not total:
+                raise IndexError("There are no quotes to draw from.")
+
+            drawn = rng.randrange(total)
+            for path, count in counts.items():
+                if drawn < count:
+                    try:
+                        return self.get(path, drawn)
+
+                    except IndexError:  # file shrank, draw again
+                        break
+                drawn -= count
+
+    def get(self, path: str, position: int) -> QuoteModel:
+        """Get the quote at the position in the file.
+
+        A file edited after its quotes were counted is counted again.
+        :param path: path to the file
+        :path type: str
+        :param position: position of the quote among quotes
+            counted in the file
+        :position type: int
+        :return: the quote
+        :rtype: `QuoteModel`
+        :raises IndexError: position is out of range
+        """
+        index = self._get_index()
+        counts, quotes, records = index
+
+        count = counts.get(path, 0)
+        if not 0 <= position < count:
+            raise IndexError(
+                f"No quote {position} in {path}, it has {count} quotes.")
+
+        indexed, count, drawn = records[path]
+        record = drawn[position] if drawn is not None else position
+
+        if not indexed:
+            parsed = quotes.get(path)
+            if parsed is None:  # counted from the manifest, parse it now
+                with self._lock:
+                    parsed = quotes.get(path)
+                    if parsed is None:
+                        parsed = self._parse(path, quotes)
+
+            if len(parsed) != count:  # edited after counting
+                self._recount(index)
+                return self.get(path, position)
+
+            return parsed[record]
+
+        with open(path, "rb") as file:
+            try:
+                with open(self.sidecar_path(path), "rb") as sidecar:
+                    header = sidecar.read(self.HEADER.size)
+                    if self._check_header(
+                            path, header, os.fstat(file.fileno())) != count:
+                        raise FileNotFoundError(sidecar.name)
+
+                    sidecar.seek(
+                        self.HEADER.size + record * self.OFFSET.size)
+                    offset, = self.OFFSET.unpack(
+                        sidecar.read(self.OFFSET.size))
+
+            except FileNotFoundError:  # edited or removed after counting
+                self._recount(index)
+                return self.get(path, position)
+
+            with mmap.mmap(
+                    file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                positions = self._read_positions(self._read_line(data, 0)) \
+                    if util.get_extension(path) == ".csv" else None
+                return self._parse_record(
+                    path, self._read_line(data, offset), positions)
+
+    def build(self, path: str) -> int:
+        """Build the sidecar of the line oriented file.
+
+        :param path: path to the file
+        :path type: str
+        :return: count of records, None if the file is not line oriented
+        :rtype: int
+        """
+        stat = os.stat(path)
+        offsets = array("Q")
+        keys = []
+
+        with open(path, "rb") as file:
+            positions = None
+            offset = 0
+            if util.get_extension(path) == ".csv":
+                header = file.readline()
+                positions = self._read_positions(header)
+                offset = len(header)
+
+            for line in file:
+                try:
+                    quote = self._parse_record(path, line, positions)
+
+                except WrongFileStructureError:  # line break inside a cell
+                    return None
+
+                if quote is not None:
+                    offsets.append(offset)
+                    keys.append(QuoteDeduplicator.make_key(quote))
+                offset += len(line)
+
+        if sys.byteorder == "big":  # sidecars are little endian
+            offsets.byteswap()
+
+        sidecar = self.sidecar_path(path)
+        tmp_path = sidecar.with_name(
+            f".{sidecar.name}.{threading.get_ident()}.tmp")
+
+        sidecar.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as file:
+            file.write(self.HEADER.pack(
+                self.MAGIC, self.VERSION, self._parser_version(path),
+                stat.st_mtime_ns, stat.st_size, len(offsets)))
+            offsets.tofile(file)
+            file.write(b"".join(keys))
+        os.replace(tmp_path, sidecar)  # readers never see a partial file
+
+        return len(offsets)
+
+    def sidecar_path(self, path: str) -> pathlib.Path:
+        """Get the path of the sidecar of the file.
+
+        :param path: path to the file
+        :path type: str
+        :return: path of the sidecar
+        :rtype: `pathlib.Path`
+        """
+        name = hashlib.sha256(os.path.abspath(path).encode("utf-8"))
+        return self.index_dir / f"{name.hexdigest()[:32]}.idx"
+
+    def manifest_path(self) -> pathlib.Path:
+        """Get the path of the manifest of the files.
+
+        :return: path of the manifest
+        :rtype: `pathlib.Path`
+        """
+        name = hashlib.sha256(f"{self.dedupe:d}".encode("utf-8"))
+        for path in self.paths:
+            name.update(b"\0" + os.path.abspath(path).encode("utf-8"))
+        return self.index_dir / f"{name.hexdigest()[:32]}.corpus"
+
+    def _get_index(self) -> Tuple[Dict, Dict, Dict]:
+        """Count quotes in all files once.
+
+        :return: file -> count of quotes, not indexed file -> quotes,
+            file -> (is indexed, count of records, drawn records or None)
+        :rtype: Tuple[Dict, Dict, Dict]
+        """
+        if self._index is not None:
+            return self._index
+
+        with self._lock:
+            if self._index is None:
+                self._index = self._load_manifest() or self._build_index()
+
+        return self._index
+
+    def _recount(self, index: Tuple[Dict, Dict, Dict]) -> None:
+        """Count quotes in all files again after one was edited.
+
+        A repeated quote may now occur first in another file,
+        so all files are counted, their sidecars are still fresh.
+        :param index: the index found stale
+        :index type: Tuple[Dict, Dict, Dict]
+        """
+        with self._lock:
+            if self._index is index:  # not recounted by another thread
+                self._index = self._build_index()
+
+    def _build_index(self) -> Tuple[Dict, Dict, Dict]:
+        """Count quotes in all files in order and save the manifest.
+
+        :return: file -> count of quotes, not indexed file -> quotes,
+            file -> (is indexed, count of records, drawn records or None)
+        :rtype: Tuple[Dict, Dict, Dict]
+        """
+        counts, quotes, records, stats = {}, {}, {}, {}
+        seen = set() if self.dedupe else None  # keys of earlier quotes
+
+        try:
+            for path in self.paths:
+                try:
+                    stats[path] = os.stat(path)  # before reading the file
+                    counts[path] = self._count(path, seen, quotes, records)
+
+                except Exception as e:  # report failure of the file
+                    ExLogger().log(f"Can't index quotes from {path}: {e}\n")
+                    counts[path] = 0
+                    quotes.pop(path, None)
+                    records[path] = (False, 0, None)
+                    stats[path] = None  # counted again next time
+
+        finally:
+            self._close_cache()
+
+        self._save_manifest(records, stats)
+
+        return counts, quotes, records
+
+    def _count(self, path: str, seen: Set[bytes], quotes: Dict,
+               records: Dict) -> int:
+        """Count quotes in the file, build its sidecar or parse it.
+
+        :param path: path to the file
+        :path type: str
+        :param seen: keys of quotes in earlier files, updated with keys
+            of the file, None to keep repeated quotes
+        :seen type: Set[bytes]
+        :param quotes: not indexed file -> quotes, updated
+        :quotes type: Dict[str, List[QuoteModel]]
+        :param records: file -> (is indexed, count of records,
+            drawn records or None if all), updated
+        :records type: Dict[str, Tuple[bool, int, array]]
+        :return: count of quotes
+        :rtype: int
+        """
+        count = self._load(path) if self.can_index(path) else None
+
+        if count is None and self.can_index(path):
+            count = self.build(path)
+
+        indexed = count is not None
+        if indexed:
+            keys = self._read_keys(path) if seen is not None else None
+        else:  # parse the whole file
+            parsed = self._parse(path, quotes)
+            count = len(parsed)
+            keys = [QuoteDeduplicator.make_key(quote) for quote in parsed] \
+                if seen is not None else None
+
+        drawn = None
+        if keys is not None:
+            drawn = array("I", (
+                record for record, key in enumerate(keys)
+                if self._is_first(key, seen)))
+            if len(drawn) == count:  # no repeated quotes, draw any record
+                drawn = None
+
+        records[path] = (indexed, count, drawn)
+        return len(drawn) if drawn is not None else count
+
+    def _parse(self, path: str, quotes: Dict) -> List[QuoteModel]:
+        """Parse the not indexed file, through `QuoteCache` if it is set.
+
+        :param path: path to the file
+        :path type: str
+        :param quotes: not indexed file -> quotes, updated
+        :quotes type: Dict[str, List[QuoteModel]]
+        :return: quotes of the file
+        :rtype: List[QuoteModel]
+        """
+        if self.cache_path is None:
+            quotes[path] = Ingestor.parse(path)
+            return quotes[path]
+
+        if self._cache is None:
+            self._cache = QuoteCache(self.cache_path)
+            opened = True
+        else:  # shared while counting
+            opened = False
+
+        try:
+            quotes[path] = self._cache.parse(path)
+
+        finally:
+            if opened:
+                self._close_cache()
+
+        return quotes[path]
+
+    @classmethod
+    def _is_first(cls, key: bytes, seen: Set[bytes]) -> bool:
+        """Check if the key was not seen yet and remember it.
+
+        :param key: key of a quote
+        :key type: bytes
+        :param seen: keys of earlier quotes, updated
+        :seen type: Set[bytes]
+        :return: True for the first occurrence of the quote
+        :rtype: bool
+        """
+        if key in seen:
+            return False
+
+        seen.add(key)
+        return True
+
+    def _read_keys(self, path: str) -> List[bytes]:
+        """Read keys of all records from the sidecar of the file.
+
+        :param path: path to the file
+        :path type: str
+        :return: `QuoteDeduplicator` key of each record
+        :rtype: List[bytes]
+        :raises WrongFileStructureError: sidecar is truncated
+        """
+        size = QuoteDeduplicator.DIGEST_SIZE
+
+        with open(self.sidecar_path(path), "rb") as sidecar:
+            *_, count = self.HEADER.unpack(sidecar.read(self.HEADER.size))
+            sidecar.seek(self.HEADER.size + count * self.OFFSET.size)
+            data = sidecar.read(count * size)
+
+        if len(data) != count * size:
+            raise WrongFileStructureError(
+                f"Sidecar of {path} is truncated.")
+
+        return [data[start:start + size]
+                for start in range(0, len(data), size)]
+
+    def _save_manifest(self, records: Dict, stats: Dict) -> None:
+        """Save what was counted, to draw without counting next time.
+
+        :param records: file -> (is indexed, count of records,
+            drawn records or None if all)
+        :records type: Dict[str, Tuple[bool, int, array]]
+        :param stats: file -> its status before counting,
+            None if it failed
+        :stats type: Dict[str, os.stat_result]
+        """
+        entries = []
+        drawn_all = array("I")
+
+        for path in self.paths:
+            indexed, count, drawn = records[path]
+            stat = stats[path]
+            entries.append(self.MANIFEST_ENTRY.pack(
+                stat.st_mtime_ns if stat is not None else -1,
+                stat.st_size if stat is not None else 0,
+                self._parser_version(path) if stat is not None else 0,
+                indexed, count,
+                len(drawn) if drawn is not None else count,
+                len(drawn_all) if drawn is not None else -1))
+            if drawn is not None:
+                drawn_all.extend(drawn)
+
+        if sys.byteorder == "big":  # manifests are little endian
+            drawn_all.byteswap()
+
+        manifest = self.manifest_path()
+        tmp_path = manifest.with_name(
+            f".{manifest.name}.{threading.get_ident()}.tmp")
+
+        try:
+            manifest.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as file:
+                file.write(self.MANIFEST_HEADER.pack(
+                    self.MANIFEST_MAGIC, self.VERSION, len(entries)))
+                file.write(b"".join(entries))
+                drawn_all.tofile(file)
+            os.replace(tmp_path, manifest)  # readers never see a partial file
+
+        except OSError as e:  # drawing works without it
+            ExLogger().log(f"Can't save quotes manifest {manifest}: {e}\n")
+
+    def _load_manifest(self) -> Tuple[Dict, Dict, Dict]:
+        """Read what was counted from the manifest of the files.
+
+        Only the files are checked, the drawn records stay in the
+        mapped manifest, so the cost does not depend on the corpus size.
+        :return: file -> count of quotes, not indexed file -> quotes,
+            file -> (is indexed, count of records, drawn records or None),
+            None if the manifest is missing or stale
+        :rtype: Tuple[Dict, Dict, Dict]
+        """
+        try:
+            with open(self.manifest_path(), "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        except (FileNotFoundError, ValueError):  # missing or empty
+            return None
+
+        header_size = self.MANIFEST_HEADER.size
+        entries_end = header_size + \
+            len(self.paths) * self.MANIFEST_ENTRY.size
+        if len(data) < entries_end or \
+                (len(data) - entries_end) % self.DRAWN.size or \
+                self.MANIFEST_HEADER.unpack_from(data) != (
+                    self.MANIFEST_MAGIC, self.VERSION, len(self.paths)):
+            return None
+
+        drawn_all = memoryview(data)[entries_end:]
+        if sys.byteorder == "little":
+            drawn_all = drawn_all.cast("I")
+        else:  # manifests are little endian
+            drawn_all = array("I", drawn_all)
+            drawn_all.byteswap()
+
+        counts, records = {}, {}
+        for number, path in enumerate(self.paths):
+            mtime_ns, size, parser, indexed, count, drawn_count, start = \
+                self.MANIFEST_ENTRY.unpack_from(
+                    data, header_size + number * self.MANIFEST_ENTRY.size)
+
+            try:
+                stat = os.stat(path)
+                if (mtime_ns, size, parser) != (
+                        stat.st_mtime_ns, stat.st_size,
+                        self._parser_version(path)):
+                    return None
+
+            except (OSError, WrongFileStructureError):
+                return None
+
+            drawn = None
+            if start != -1:
+                if start + drawn_count > len(drawn_all):
+                    return None
+                drawn = drawn_all[start:start + drawn_count]
+
+            counts[path] = drawn_count
+            records[path] = (bool(indexed), count, drawn)
+
+        return counts, {}, records
+
+    def _close_cache(self) -> None:
+        """Close the parsed quotes cache if it was opened."""
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+
+    def _load(self, path: str) -> int:
+        """Read count of records from the sidecar of the file.
+
+        :param path: path to the file
+        :path type: str
+        :return: count of records, None if the sidecar is missing or stale
+        :rtype: int
+        """
+        try:
+            with open(self.sidecar_path(path), "rb") as sidecar:
+                header = sidecar.read(self.HEADER.size)
+
+        except FileNotFoundError:
+            return None
+
+        return self._check_header(path, header, os.stat(path))
+
+    def _check_header(self, path: str, header: bytes,
+                      stat: os.stat_result) -> int:
+        """Check if the sidecar header matches the file.
+
+        :param path: path to the file
+        :path type: str
+        :param header: header read from the sidecar
+        :header type: bytes
+        :param stat: status of the file
+        :stat type: `os.stat_result`
+        :return: count of records, None if the sidecar is stale
+        :rtype: int
+        """
+        if len(header) != self.HEADER.size:
+            return None
+
+        magic, version, parser, mtime_ns, size, count = \
+            self.HEADER.unpack(header)
+
+        if (magic, version, parser, mtime_ns, size) != (
+                self.MAGIC, self.VERSION, self._parser_version(path),
+                stat.st_mtime_ns, stat.st_size):
+            return None
+
+        return count
+
+    @classmethod
+    def _parser_version(cls, path: str) -> int:
+        """Get version of the parser of the file.
+
+        :param path: path to the file
+        :path type: str
+        :return: `PARSER_VERSION` of the ingestor
+        :rtype: int
+        """
+        return Ingestor.get_ingestor(path).PARSER_VERSION
+
+    @classmethod
+    def _read_line(cls, data: mmap.mmap, offset: int) -> bytes:
+        """Read a single line starting at the offset.
+
+        :param data: content of the file
+        :data type: `mmap.mmap`
+        :param offset: position of the first byte of the line
+        :offset type: int
+        :return: the line with its line break
+        :rtype: bytes
+        """
+        end = data.find(b"\n", offset)
+        return data[offset:end + 1 if end != -1 else len(data)]
+
+    @classmethod
+    def _read_positions(cls, header: bytes) -> List[int]:
+        """Find quote columns in the first line of a csv file.
+
+        :param header: the first line
+        :header type: bytes
+        :return: positions of the `body` and `author` columns
+        :rtype: List[int]
+        :raises WrongFileStructureError: file has no `body`
+            and `author` columns
+        """
+        return CsvIngestor.get_positions(
+            next(csv.reader([header.decode("utf-8-sig")]), []))
+
+    @classmethod
+    def _parse_record(cls, path: str, line: bytes,
+                      positions: List[int] = None) -> QuoteModel:
+        """Parse a single record the way its ingestor does.
+
+        :param path: path to the file
+        :path type: str
+        :param line: the record
+        :line type: bytes
+        :param positions: positions of the quote columns of a csv file,
+            None for txt files
+        :positions type: List[int], optional
+        :return: the quote, None if the record is not a valid quote
+        :rtype: `QuoteModel`
+        :raises WrongFileStructureError: csv record is not complete
+        """
+        if positions is None:  # txt record
+            text = line.decode("utf-8-sig")
+            try:
+                return next((
+                    TextIngestor.map_to_quote(data_row)
+                    for data_row in TextIngestor.clean_data(text)), None)
+
+            except (WrongFileStructureError, AssertionError):
+                return None
+
+        text = line.decode("utf-8")
+        if text.count('"') % 2:  # a quoted cell goes on in the next line
+            raise WrongFileStructureError(
+                f"Line break inside a cell of {path}.")
+
+        row = next(csv.reader([text]), None)
+        return CsvIngestor.row_to_quote(row, positions) if row else None
@@ -3,7 +3,7 @@
 The QuoteEngine module is responsible for
 ingesting many types of files that contain quotes.
 """
-from typing import List
+from typing import Iterator, List
 
 from Helpers.ExLogger import ExLogger
 from Models.QuoteModel import QuoteModel
@@ -31,26 +31,31 @@ class TextIngestor(IngestorInterface):
         :return: collection of quotes and authors
         :rtype: List[QuoteModel]
         """
-        quotes = []
+        return list(cls.iter_parse(path))
 
+    @classmethod
+    def iter_parse(cls, path: str) -> Iterator[QuoteModel]:
+        """Parse txt file line by line.
+
+        :param path: path to the file
+        :path type: str
+        :return: quotes and authors in the file order
+        :rtype: Iterator[QuoteModel]
+        """
         # `utf-8-sig` to avoid unwanted chars
         with open(path, "r", encoding="utf-8-sig") as file:
-            data = TextIngestor().clean_data(file.read())  # prepare data
-            quote = None
-            for data_row in data:
-                try:
-                    quote = cls.map_to_quote(data_row)
-
-                except WrongFileStructureError as e:
-                    quote = None
-                    e.__dict__["file_name"] = path
-                    ExLogger().log(e)
-
-                finally:
-                    if quote:
-                        quotes.append(quote)
+            for line in file:
+                for data_row in cls.clean_data(line):  # prepare data
+                    try:
+                        quote = cls.map_to_quote(data_row)
 
-        return quotes
+                    except WrongFileStructureError as e:
+                        quote = None
+                        e.__dict__["file_name"] = path
+                        ExLogger().log(e)
+
+                    if quote:
+                        yield quote
 
     @classmethod
     def clean_data(cls, data: str) -> List[str]:
@@ -2,5 +2,10 @@ from .CsvIngestor import *
 from .CustomErrors import *
 from .Ingestor import *
 from .IngestorInterface import *
+from .IngestResult import *
+from .PdfExtractor import *
 from .PdfIngestor import *
+from .QuoteCache import *
+from .QuoteDeduplicator import *
+from .QuoteOffsetIndex import *
 from .TextIngestor import *
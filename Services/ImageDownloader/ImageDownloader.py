@@ -13,7 +13,7 @@ from Services.Exceptions.UnsupportedImageError import UnsuportedImageError
 class ImageDownloader():
     """Download image."""
 
-    SUPPORTED_FORMATS = {'jpeg', "png"}
+    SUPPORTED_FORMATS = {'jpeg', "png", "gif", "webp"}
 
     @classmethod
     def download_bytes(cls, url: str) -> bytes:
@@ -6,14 +6,16 @@ The purpse is to build wilder base of quotes for the meme engine.
 import re
 import time
 from random import choice
-from typing import List
+from typing import TYPE_CHECKING, List
 
 import requests
-from bs4 import BeautifulSoup, Tag
 from Models import QuoteModel
 from Services.QuoteScrapper.QuoteScrapperInterface import \
     QuoteScrapperInterface
 
+if TYPE_CHECKING:
+    from bs4 import Tag
+
 
 class GoodReadScrapper(QuoteScrapperInterface):
     """Scrap quotes from the webpage.
@@ -76,6 +78,8 @@ class GoodReadScrapper(QuoteScrapperInterface):
         :return: a collection of found author and quotes
         :rtype: `List[QuoteModel]`
         """
+        from bs4 import BeautifulSoup  # loaded only when scrapping
+
         soup = BeautifulSoup(content, 'html.parser')
         quotes = soup.select(".quote")
 
@@ -84,7 +88,7 @@ class GoodReadScrapper(QuoteScrapperInterface):
             )
 
     @classmethod
-    def _extract_quotemodel(cls, quote: Tag) -> List[QuoteModel]:
+    def _extract_quotemodel(cls, quote: "Tag") -> List[QuoteModel]:
         """Extract quote and model.
 
         :param quote: full element with quote and author html element
@@ -4,14 +4,16 @@ The purpse is to build wilder base of quotes for the meme engine.
 """
 
 import time
-from typing import List
+from typing import TYPE_CHECKING, List
 
 import requests
-from bs4 import BeautifulSoup, Tag
 from Models import QuoteModel
 from Services.QuoteScrapper.QuoteScrapperInterface import \
     QuoteScrapperInterface
 
+if TYPE_CHECKING:
+    from bs4 import Tag
+
 
 class QuoteToScrapScrapper(QuoteScrapperInterface):
     """Scrap quotes from the webpage.
@@ -86,6 +88,8 @@ class QuoteToScrapScrapper(QuoteScrapperInterface):
         :return: a collection of found author and quotes
         :rtype: `List[QuoteModel]`
         """
+        from bs4 import BeautifulSoup  # loaded only when scrapping
+
         soup = BeautifulSoup(content, 'html.parser')
         quotes = soup.select(".quote")
         return cls.filter_empty(
@@ -93,7 +97,7 @@ class QuoteToScrapScrapper(QuoteScrapperInterface):
             )
 
     @classmethod
-    def _extract_quotemodel(cls, quote: Tag) -> List[QuoteModel]:
+    def _extract_quotemodel(cls, quote: "Tag") -> List[QuoteModel]:
         """Extract quote and model.
 
         :param quote: full element with quote and author html element
@@ -1,21 +1,25 @@
 """Flask version of meme app."""
 
 import atexit
+import io
 import multiprocessing
 import os
 import pathlib
 import random
+import re
 
 import requests
-from flask import Flask, redirect, render_template,\
+from flask import Flask, abort, redirect, render_template,\
                   request, send_file, url_for
 
 import common
 from Helpers import ExLogger
 from Helpers import Utilities as util
-from MemeGenerator import MemeEngine
+from MemeGenerator import (ImageCache, ImageEncoder, MemeEngine,
+                           QuoteFitIndex, RenderCache)
 from MemeGenerator.Exeptions.TextTooLongError import TextTooLongError
 from Models.QuoteModel import QuoteModel
+from Models.QuoteStore import QuoteStore
 from Services import GoodReadScrapper, UnsplashService
 from Services.Exceptions.InvalidUrlError import InvalidUrlError
 from Services.Exceptions.UnsupportedImageError import UnsuportedImageError
@@ -30,7 +34,13 @@ app = Flask(__name__,
             static_url_path=static_url,
             static_folder=storage)
 
-meme = MemeEngine(storage)
+meme = MemeEngine(storage, image_cache=ImageCache(),
+                  render_cache=RenderCache(f"{storage}/cache"))
+encoders = {
+    profile: ImageEncoder.from_profile(profile)
+    for profile in ImageEncoder.PROFILES
+}
+cached_name = re.compile(r"(?P<key>[0-9a-f]{64})(?P<ext>\.[a-z]+)")
 
 
 def get_online_quotes():
@@ -67,29 +77,129 @@ def get_unsplash_image():
     return un_images[0].local_path
 
 
+def get_encoder(profile: str) -> ImageEncoder:
+    """Get encoder of the requested profile.
+
+    :param profile: one of `ImageEncoder.PROFILES` keys
+    :profile type: str
+    :return: encoder of the profile, default engine one if unknown
+    :rtype: `ImageEncoder`
+    """
+    return encoders.get(profile, meme.encoder)
+
+
+def draw_meme_content():
+    """Draw a random image with a quote and font fitting it.
+
+    :return: A path to the image, quote and path to the font
+    :rtype: Tuple[str, `QuoteModel`, str]
+    :raises TextTooLongError: none of the quotes fits the image
+    """
+    img = random.choice(imgs)
+    quote, font_path = fit_index.sample(meme.rendered_size(img))
+
+    return img, quote, font_path
+
+
+def render_meme_page(img_path: str, quote: QuoteModel,
+                     profile: str = None, font_path: str = None):
+    """Render meme in all responsive sizes and show it in the page.
+
+    Sizes are kept only in the render cache under the hash of their
+    render spec, the page gets them from `meme_size_image`, so any
+    worker process sharing the cache can serve them.
+    :param img_path: A path to the image file
+    :img_path type: str
+    :param quote: A quote to draw
+    :quote type: `QuoteModel`
+    :param profile: encoder profile, default the engine encoder
+    :profile type: str, optional
+    :param font_path: A path to the font, default random font
+    :font_path type: str, optional
+    """
+    encoder = get_encoder(profile)
+
+    if meme.is_animated(img_path):  # sizes would lose the animation
+        path = meme.make_meme(img_path, quote.body, quote.author,
+                              encoder=encoder, font_path=font_path)
+        url = url_for('static', filename=pathlib.Path(path).relative_to(
+            storage).as_posix())
+        return render_template('meme.html', path=url, download=url,
+                               filename=f"meme{util.get_extension(path)}")
+
+    # seeded, so the sizes go to the render cache, not the output dir
+    memes = meme.make_meme_set(
+        img_path, quote.body, quote.author, thumbnail=None, encoder=encoder,
+        seed=random.getrandbits(32), font_path=font_path)
+    urls = {
+        width: url_for('meme_size_image', name=pathlib.Path(path).name)
+        for width, path in memes.items()
+    }
+    srcset = ", ".join(f"{url} {width}w" for width, url in urls.items())
+    largest = urls[max(urls)]
+
+    return render_template('meme.html', path=largest, srcset=srcset,
+                           download=largest,
+                           filename=f"meme{encoder.extension}")
+
+
 def setup():
     """Load all resources."""
-    quotes = common.get_local_quotes()
+    quotes = QuoteStore(common.get_local_quotes())  # kept for process life
     images = common.get_local_images()
+    meme.warm_cache(images)  # decode and resize photos in the background
+
+    fit_index = QuoteFitIndex(quotes, fonts_dir=meme.fonts_dir)
+    fit_index.build([meme.MAX_WIDTH])  # memes are rendered this wide
 
-    return quotes, images
+    return quotes, images, fit_index
 
 
-quotes, imgs = setup()
+quotes, imgs, fit_index = setup()
 
 
 @app.route('/')
 def meme_rand():
     """Generate a random meme."""
-    img = random.choice(imgs)
-    quote = random.choice(quotes)
+    try:
+        img, quote, font_path = draw_meme_content()
+        return render_meme_page(
+            img, quote, request.args.get("format"), font_path)
+    except TextTooLongError:  # none of the quotes fits the image
+        return redirect(url_for('meme_rand', **request.args))
+
+
+@app.route('/meme.png')
+def meme_rand_image():
+    """Stream a random meme image."""
+    encoder = get_encoder(request.args.get("format"))
 
     try:
-        path = meme.make_meme(img, quote.body, quote.author)
-    except TextTooLongError:
-        return redirect(url_for('meme_rand'))
+        img, quote, font_path = draw_meme_content()
+        encoder = meme.select_encoder(img, encoder)
+        content = meme.render_bytes(
+            img, quote.body, quote.author, encoder=encoder,
+            font_path=font_path)
+    except TextTooLongError:  # none of the quotes fits the image
+        return redirect(url_for('meme_rand_image', **request.args))
+
+    return send_file(io.BytesIO(content), mimetype=encoder.mimetype)
+
+
+@app.route('/meme/<name>')
+def meme_size_image(name):
+    """Stream a size of a meme shown in a page from the render cache."""
+    match = cached_name.fullmatch(name)
+    mimetypes = {encoder.extension: encoder.mimetype
+                 for encoder in encoders.values()}
+    if match is None or match["ext"] not in mimetypes:
+        abort(404)
+
+    content = meme.render_cache.get_bytes(match["key"], match["ext"])
+    if content is None:  # evicted
+        abort(404)
 
-    return render_template('meme.html', path=path)
+    return send_file(io.BytesIO(content), mimetype=mimetypes[match["ext"]])
 
 
 @app.route('/create', methods=['GET'])
@@ -119,7 +229,7 @@ def meme_post():
             temp_img = os.path.join(tmp, filename)
             temp_img = ImageDownloader.dowload_to_file(url, temp_img)
 
-            path = meme.make_meme(temp_img, quote.body, quote.author)
+            page = render_meme_page(temp_img, quote, result.get("format"))
 
         except AssertionError as e:
             error = str(e)
@@ -146,7 +256,7 @@ def meme_post():
                 "Something gone wrong with the connection."
 
         else:
-            return render_template('meme.html', path=path)
+            return page
 
     return render_template('meme_form.html', error=error)
 
@@ -193,7 +303,7 @@ def unsplash_post():
 
             quote = QuoteModel(body, author)
 
-            path = meme.make_meme(img_path, quote.body, quote.author)
+            page = render_meme_page(img_path, quote, result.get("format"))
 
         except AssertionError as e:
             error = str(e)
@@ -220,7 +330,7 @@ def unsplash_post():
             return render_template('base.html', error=error)
 
         else:
-            return render_template('meme.html', path=path)
+            return page
 
         if os.path.exists(img_path):
             return render_template('unsplash_form.html',
@@ -2,16 +2,19 @@
 
 import json
 import os
+import random
 import re
 from datetime import datetime
 from typing import List
 
 import requests
 
+from Helpers import ExLogger
 from Helpers import Utilities as util
-from MemeGenerator import MemeEngine
+from MemeGenerator import ImageEncoder, MemeEngine
 from Models import QuoteModel
-from QuoteEngine import CustomErrors, Ingestor
+from QuoteEngine import (CustomErrors, Ingestor, QuoteCache,
+                         QuoteDeduplicator, QuoteOffsetIndex)
 from Services import QuoteToScrapScrapper
 
 
@@ -28,7 +31,7 @@ def load_quotestoscrap_quotes():
         """Get quotes from the website."""
         try:
             new_quotes = QuoteToScrapScrapper.get_quotes()
-            new_quotes = json.dumps([q.__dict__ for q in new_quotes])
+            new_quotes = json.dumps([q.to_dict() for q in new_quotes])
             util.save_csv(new_quotes, local_storage)
 
         except requests.HTTPError as e:
@@ -71,22 +74,124 @@ def load_quotestoscrap_quotes():
 
 def get_local_quotes(
                      data_storage: str = '_data',
-                     excluded_dir: str = 'SimpleLines'
+                     excluded_dir: str = 'SimpleLines',
+                     cache_path: str = QuoteCache.DEF_CACHE_PATH,
+                     workers: int = None,
+                     dedupe: bool = True,
+                     deduplicator: QuoteDeduplicator = None
                      ) -> QuoteModel:
     """Get random quote from local files.
 
     Look for supported by 'IngestorInterface' files in specified catalog,
     collect all the found quotes and draw one of them to use in meme.
+    Only files changed since the last run are parsed again, in parallel.
+    Files which fail to parse are logged and skipped. The same quote
+    found many times, even written differently, is kept once.
     :param data_storage: parent directory with quote files
     :data_storage type: str
     :param excluded_dir: subdir to exclude from the search process,
         default 'SimpleLines'
     :excluded_dir type: str, optional
+    :param cache_path: location of parsed quotes cache,
+        None to parse all files
+    :cache_path type: str, optional
+    :param workers: count of parallel parsers, default cpu count
+    :workers type: int, optional
+    :param dedupe: drop repeated quotes, default True
+    :dedupe type: bool, optional
+    :param deduplicator: deduplicator to collect counts and files
+        of repeated quotes in, default a new one
+    :deduplicator type: `QuoteDeduplicator`, optional
+    """
+    quote_files = get_quote_files(data_storage, excluded_dir)
+
+    cache = QuoteCache(cache_path) if cache_path is not None else None
+
+    parsed = {}  # file -> quotes
+    if cache is not None:
+        parsed = {f: cache.get(f) for f in quote_files}
+
+    missing = [f for f in quote_files if parsed.get(f) is None]
+    for result in Ingestor.parse_many(missing, workers):
+        if result.ok:
+            parsed[result.path] = result.quotes
+            if cache is not None:
+                cache.put(result.path, result.quotes)
+        else:
+            ExLogger().log(
+                f"Can't parse quotes from {result.path}: {result.error}\n")
+
+    if cache is not None:
+        cache.close()
+
+    if dedupe and deduplicator is None:
+        deduplicator = QuoteDeduplicator()
+
+    quotes = []
+    for f in quote_files:  # keep the order of files
+        file_quotes = parsed.get(f) or []
+        quotes.extend(deduplicator.iter_unique(file_quotes, f)
+                      if dedupe else file_quotes)
+
+    return quotes
+
+
+def get_random_quote(
+                     data_storage: str = '_data',
+                     excluded_dir: str = 'SimpleLines',
+                     rng: random.Random = None,
+                     index_dir: str = QuoteOffsetIndex.DEF_INDEX_DIR,
+                     cache_path: str = QuoteCache.DEF_CACHE_PATH,
+                     dedupe: bool = True
+                     ) -> QuoteModel:
+    """Draw a random quote from local files without loading all of them.
+
+    Txt and csv files are read through offset sidecars, one record
+    per draw, only other files are parsed.
+    :param data_storage: parent directory with quote files
+    :data_storage type: str
+    :param excluded_dir: subdir to exclude from the search process,
+        default 'SimpleLines'
+    :excluded_dir type: str, optional
+    :param rng: random numbers generator, default `random` module
+    :rng type: `random.Random`, optional
+    :param index_dir: dir to keep offset sidecars in
+    :index_dir type: str, optional
+    :param cache_path: location of parsed quotes cache,
+        None to parse all not indexed files
+    :cache_path type: str, optional
+    :param dedupe: draw repeated quotes only once, default True
+    :dedupe type: bool, optional
+    :return: drawn quote
+    :rtype: `QuoteModel`
+    :raises IndexError: there are no quotes in the files
+    """
+    index = QuoteOffsetIndex(
+        get_quote_files(data_storage, excluded_dir),
+        index_dir=index_dir, cache_path=cache_path, dedupe=dedupe
+        )
+
+    return index.sample(rng)
+
+
+def get_quote_files(
+                    data_storage: str = '_data',
+                    excluded_dir: str = 'SimpleLines'
+                    ) -> List[str]:
+    """Collect paths to all local files with quotes.
+
+    Limit results to files supported by the `Ingestor`.
+    :param data_storage: parent directory with quote files
+    :data_storage type: str
+    :param excluded_dir: subdir to exclude from the search process,
+        default 'SimpleLines'
+    :excluded_dir type: str, optional
+    :return: collection of paths to quote files
+    :rtype: List[str]
     """
-    supported_formats = Ingestor.get_supported_formats()
     quote_files = []
 
-    for format in supported_formats:
+    for format in Ingestor.get_supported_formats():
         quote_files.extend(
             util.find_files_by_ext(
                 base_dir=data_storage,
@@ -95,11 +200,7 @@ def get_local_quotes(
                 )
             )
 
-    quotes = []
-    for f in quote_files:
-        quotes.extend(Ingestor.parse(f))
-
-    return quotes
+    return quote_files
 
 
 def get_local_images(data_storage: str = '_data/photos') -> List[str]:
@@ -156,7 +257,10 @@ def remove_old_memes(dir_path: str, older_than: int = 172800) -> None:
     :older_than type: int
     """
     files = []
-    for format in MemeEngine.SUPPORTED_FORTMATS.keys():
+    formats = set(MemeEngine.SUPPORTED_FORTMATS.keys())
+    formats.update(ImageEncoder.EXTENSIONS.values())  # output formats
+
+    for format in formats:
         files.extend(util.find_files_by_ext(dir_path, format))
 
     now = datetime.now()
@@ -6,7 +6,7 @@ import multiprocessing
 import os
 import pathlib
 import random
-from secrets import choice
+import sys
 from typing import List
 
 import requests
@@ -15,10 +15,11 @@ from Services.Exceptions.UnsupportedImageError import UnsuportedImageError
 
 import common
 from Helpers import Utilities as util
-from MemeGenerator import MemeEngine
+from MemeGenerator import ImageEncoder, MemeEngine
 from MemeGenerator.ImageEnhancer import (BrightnessImageEnhancer,
                                          ColorImageEnhancer,
                                          ContrastImageEnhancer,
+                                         EnhancerChain,
                                          SharpnessImageEnhancer)
 from Models import QuoteModel
 from Services import ImageDownloader, UnsplashService
@@ -32,7 +33,8 @@ tmp_dir = f"{default_dir}/tmp"
 
 def generate_meme(
         path=None, url=None, unsplash=None,
-        body=None, author=None, goodread=None, enhance=None
+        body=None, author=None, goodread=None, enhance=None,
+        stream=None, output_format=None, quality=None, seed=None
         ):
     """Generate a meme given an path and a quote.
 
@@ -50,21 +52,34 @@ def generate_meme(
     :param goodread: if selected, 'https://www.goodreads.com/' random
         page will be scrapped and random quote will be selected
     :goodread type: bool
-    :param enhance: random enhancer (color, contrast, sharpness, brightness)
-        will be selected and add to the picture with random factor
+    :param enhance: random enhancers (color, contrast, sharpness,
+        brightness) will be selected and applied to the picture
+        in one pass, each with random factor
     :enhance type: bool
-    :return: path to generated file
+    :param stream: if given, the meme is encoded into the binary stream
+        instead of a file
+    :stream type: BinaryIO, optional
+    :param output_format: encoder profile, one of
+        `ImageEncoder.PROFILES` keys, default png
+    :output_format type: str, optional
+    :param quality: encoder quality for jpeg and webp profiles
+    :quality type: int, optional
+    :param seed: seed of all random choices, the same seed
+        and arguments give the same meme
+    :seed type: int, optional
+    :return: path to generated file, None if the stream is given
 
     :rtype: str
     """
     img_path = None
     quote = None
     enhancer = None
+    rng = random.Random(seed)
 
     """Section responsible for selecting image/ image path"""
     if not path and not url and not unsplash:  # random image
         image_paths = common.get_local_images()
-        img_path = random.choice(image_paths)
+        img_path = rng.choice(sorted(image_paths))
 
     elif path and not url and not unsplash:  # local image
         img_path = path
@@ -95,12 +110,11 @@ def generate_meme(
 
     """Section responsible for selecting quote"""
     if not body and not author and not goodread:  # random local quote
-        quotes = common.get_local_quotes(data_storage)
-        quote = choice(quotes)
+        quote = common.get_random_quote(data_storage, rng=rng)
 
     elif goodread and not body and not author:  # goodread quote
         quotes = GoodReadScrapper.get_quotes()
-        quote = random.choice(quotes)
+        quote = rng.choice(quotes)
 
     elif not goodread and body and author:  # use user input
         quote = QuoteModel(body, author)
@@ -121,10 +135,22 @@ def generate_meme(
             ContrastImageEnhancer
         ]
 
-        enhancer = choice(enhancers)
+        count = rng.randint(1, len(enhancers))  # fused by the chain
+        enhancer = EnhancerChain(*rng.sample(enhancers, count))
 
-    meme = MemeEngine(pathlib.Path(default_dir))
-    path = meme.make_meme(img_path, quote.body, quote.author)
+    encoder = ImageEncoder.from_profile(
+        output_format or ImageEncoder.DEF_PROFILE, quality=quality)
+    meme = MemeEngine(pathlib.Path(default_dir), encoder=encoder)
+    meme.enhancer = enhancer
+    render_seed = rng.getrandbits(32) if seed is not None else None
+
+    if stream is not None:
+        meme.render_to(stream, img_path, quote.body, quote.author,
+                       seed=render_seed)
+        return None
+
+    path = meme.make_meme(img_path, quote.body, quote.author,
+                          seed=render_seed)
 
     return path
 
@@ -139,13 +165,6 @@ if __name__ == "__main__":
     :param author: text author
     :author type: str, optional
     """
-    p = multiprocessing.Process(
-        target=common.remove_old_memes, args=(default_dir,))
-    p.daemon = True
-    p.start()
-
-    atexit.register(common.remove_temp_files, dir_path=tmp_dir)
-
     parser = argparse.ArgumentParser()
 
     parser.add_argument(
@@ -203,7 +222,53 @@ if __name__ == "__main__":
                         action="store_true"
                         )
 
+    parser.add_argument(
+                        "--format",
+                        help="Optional: output image format. "
+                             "Default png.",
+                        choices=list(ImageEncoder.PROFILES),
+                        type=str
+                        )
+
+    parser.add_argument(
+                        "--quality",
+                        help="Optional: quality of jpeg and webp output "
+                             "from 1 to 100.",
+                        type=int
+                        )
+
+    parser.add_argument(
+                        "--seed",
+                        help="Optional: seed of all random choices. "
+                             "The same seed gives the same meme.",
+                        type=int
+                        )
+
+    parser.add_argument(
+                        "--stdout",
+                        help="Optional: use with no value. "
+                             "Write the meme image to the standard output "
+                             "instead of a file.",
+                        action="store_true"
+                        )
+
     args = parser.parse_args()
+
+    image_stream = None
+    if args.stdout:
+        # only the image goes to the standard output, messages of this
+        # and child processes are moved to the standard error
+        sys.stdout.flush()
+        image_stream = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    p = multiprocessing.Process(
+        target=common.remove_old_memes, args=(default_dir,))
+    p.daemon = True
+    p.start()
+
+    atexit.register(common.remove_temp_files, dir_path=tmp_dir)
+
     common.load_quotestoscrap_quotes()
     path = None
 
@@ -215,7 +280,11 @@ if __name__ == "__main__":
             body=args.body,
             author=args.author,
             goodread=args.goodread,
-            enhance=args.enhance
+            enhance=args.enhance,
+            stream=image_stream,
+            output_format=args.format,
+            quality=args.quality,
+            seed=args.seed
         )
     except UnsuportedImageError as e:
         print(e)
@@ -239,4 +308,8 @@ if __name__ == "__main__":
             "from we've got locally."
             )
     else:
-        print(path)
+        if path:
+            print(path)
+
+    if image_stream is not None:
+        image_stream.close()
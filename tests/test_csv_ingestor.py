@@ -0,0 +1,62 @@
+"""Check the stdlib csv parser against the pandas one it replaced."""
+
+import pathlib
+
+import pytest
+
+from QuoteEngine import CsvIngestor
+from QuoteEngine.CustomErrors import WrongFileStructureError
+
+pd = pytest.importorskip("pandas")  # the parser used before
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+SAMPLE = (
+    "id,author,body,tags\n"
+    '1,Rex,"Bark, then bark again",dog\n'
+    "2,,No author,dog\n"
+    "3,Fido,,dog\n"
+    "4,NA,Author is NA,dog\n"
+    "5,Max,null,dog\n"
+    "\n"
+    "6,1234,Numbers only author,dog\n"
+    '7,Zażółć,"Gęślą ""jaźń""",dog\n'
+    "8,  Spaced  ,  Kept as is  ,dog\n"
+    "9,Short\n"
+    "10,Chewy,RAWRGWAWGGR,dog\n"
+)
+
+
+def pandas_quotes(path):
+    """Parse the file the way the pandas based parser did."""
+    data = pd.read_csv(path, usecols=["body", "author"], encoding="utf-8")
+    return [
+        (quote.body, quote.author)
+        for quote in map(CsvIngestor.data_to_quotemodel,
+                         data[["body", "author"]].values.tolist())
+        if quote.body is not None and quote.author is not None
+    ]
+
+
+@pytest.mark.parametrize("name", ["sample", "DogQuotesCSV"])
+def test_quotes_match_pandas(tmp_path, name):
+    """Give the same quotes as pandas."""
+    if name == "sample":
+        path = tmp_path / "sample.csv"
+        path.write_text(SAMPLE, encoding="utf-8")
+    else:
+        path = ROOT / "_data" / "DogQuotes" / f"{name}.csv"
+
+    quotes = [(quote.body, quote.author)
+              for quote in CsvIngestor.parse(str(path))]
+
+    assert quotes == pandas_quotes(path)
+    assert quotes
+
+
+def test_missing_columns(tmp_path):
+    """Refuse files without body and author columns."""
+    path = tmp_path / "no_body.csv"
+    path.write_text("text,author\nBark,Rex\n", encoding="utf-8")
+
+    with pytest.raises(WrongFileStructureError):
+        CsvIngestor.parse(str(path))
@@ -0,0 +1,76 @@
+"""Check the streaming docx parser against python-docx."""
+
+import pathlib
+
+import pytest
+
+from QuoteEngine import DocxIngestor
+
+docx = pytest.importorskip("docx")  # python-docx, a dev requirement
+from docx.oxml import parse_xml  # noqa: E402
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+def python_docx_paragraphs(path):
+    """Get text of body paragraphs the way python-docx gives it."""
+    return [paragraph.text for paragraph in docx.Document(path).paragraphs]
+
+
+def make_document(path):
+    """Write a document with runs, breaks, a table and a hyperlink."""
+    document = docx.Document()
+    document.add_paragraph('"Bark like no one is listening" - Rex')
+
+    paragraph = document.add_paragraph('"Sit')
+    paragraph.add_run(" and").bold = True
+    run = paragraph.add_run(" stay")
+    run.add_tab()
+    run.add_break()
+    paragraph.add_run('" - Fido')
+
+    document.add_table(rows=1, cols=1).cell(0, 0).text = '"Table" - Skip'
+
+    paragraph = document.add_paragraph('"Fetch')
+    paragraph._p.append(parse_xml(
+        f'<w:hyperlink xmlns:w="{W}" xmlns:r="{R}" r:id="rId99">'
+        f'<w:r><w:t xml:space="preserve"> the ball</w:t></w:r>'
+        f'</w:hyperlink>'))
+    paragraph.add_run('" - Max')
+
+    paragraph = document.add_paragraph('"Good')
+    paragraph.add_run()._r.append(
+        parse_xml(f'<w:noBreakHyphen xmlns:w="{W}"/>'))
+    paragraph.add_run('boy" - Rex')
+
+    document.add_paragraph("")
+    document.save(path)
+
+
+@pytest.mark.parametrize("name", ["sample", "DogQuotesDOCX"])
+def test_paragraphs_match_python_docx(tmp_path, name):
+    """Give the same paragraph text as python-docx."""
+    if name == "sample":
+        path = tmp_path / "sample.docx"
+        make_document(path)
+    else:
+        path = ROOT / "_data" / "DogQuotes" / f"{name}.docx"
+
+    assert list(DocxIngestor.iter_paragraphs(str(path))) == \
+        python_docx_paragraphs(path)
+
+
+def test_quotes_match_python_docx(tmp_path):
+    """Parse the same quotes as the python-docx based parser did."""
+    path = tmp_path / "sample.docx"
+    make_document(path)
+
+    rows = [DocxIngestor.clean_data(text)
+            for text in python_docx_paragraphs(path)]
+    expected = [tuple(row) for row in rows if len(row) == 2]
+
+    assert [(quote.body, quote.author)
+            for quote in DocxIngestor.parse(str(path))] == expected
+    assert len(expected) == 3  # the hyphenated quote is skipped
@@ -0,0 +1,84 @@
+"""Check images encoded by the encoder profiles."""
+
+import io
+
+import pytest
+from PIL import Image
+
+from MemeGenerator import ImageEncoder
+
+
+def gradient(mode="RGB"):
+    """Image with some detail to compress."""
+    image = Image.linear_gradient("L").resize((64, 64))
+    return Image.merge("RGB", [image, image.rotate(90), image]).convert(mode)
+
+
+@pytest.mark.parametrize("profile", list(ImageEncoder.PROFILES))
+@pytest.mark.parametrize("mode", ["RGB", "RGBA", "P"])
+def test_profile_encodes_its_format(profile, mode):
+    """Write a file of the profile format, whatever the image mode."""
+    encoder = ImageEncoder.from_profile(profile)
+    buffer = io.BytesIO()
+
+    encoder.encode(gradient(mode), buffer)
+
+    buffer.seek(0)
+    with Image.open(buffer) as image:
+        assert image.format == encoder.format
+        assert image.size == (64, 64)
+    assert encoder.extension == ImageEncoder.EXTENSIONS[encoder.format]
+
+
+def test_lossless_profiles_keep_pixels():
+    """Keep every pixel with png and lossless webp."""
+    for profile in ("png", "png-fast", "webp-lossless"):
+        buffer = io.BytesIO()
+        ImageEncoder.from_profile(profile).encode(gradient(), buffer)
+
+        buffer.seek(0)
+        with Image.open(buffer) as image:
+            assert image.convert("RGB").tobytes() == gradient().tobytes()
+
+
+def test_options_override_profile():
+    """Override profile settings, ignore options that are not set."""
+    encoder = ImageEncoder.from_profile("jpeg", quality=40, method=None)
+
+    assert encoder.settings == {
+        "format": "JPEG", "quality": 40, "progressive": True}
+
+
+def test_lower_quality_is_smaller():
+    """Compress more with a lower jpeg quality."""
+    sizes = []
+    for quality in (95, 30):
+        buffer = io.BytesIO()
+        ImageEncoder.from_profile("jpeg", quality=quality).encode(
+            gradient(), buffer)
+        sizes.append(len(buffer.getvalue()))
+
+    assert sizes[0] > sizes[1]
+
+
+@pytest.mark.parametrize("profile", ["gif", "webp"])
+def test_animation_keeps_frames(profile):
+    """Write every frame of an animation."""
+    frames = [(gradient().rotate(angle), 100) for angle in (0, 90, 180)]
+    buffer = io.BytesIO()
+
+    ImageEncoder.from_profile(profile).encode_frames(iter(frames), buffer)
+
+    buffer.seek(0)
+    with Image.open(buffer) as image:
+        assert image.n_frames == 3
+
+
+def test_unknown_profile_and_format():
+    """Refuse profiles and formats which are not supported."""
+    with pytest.raises(ValueError):
+        ImageEncoder.from_profile("bmp")
+    with pytest.raises(ValueError):
+        ImageEncoder("BMP")
+    with pytest.raises(ValueError):
+        ImageEncoder.from_profile("png").encode_frames([], io.BytesIO())
@@ -0,0 +1,122 @@
+"""Check the fused enhancer chain against Pillow enhancers."""
+
+import itertools
+import pathlib
+from random import Random
+
+import numpy as np
+import pytest
+from PIL import Image, ImageEnhance
+
+from MemeGenerator.ImageEnhancer import (BrightnessImageEnhancer,
+                                         ColorImageEnhancer,
+                                         ContrastImageEnhancer,
+                                         EnhancerChain,
+                                         SharpnessImageEnhancer)
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+PHOTO = ROOT / "_data" / "photos" / "dog" / "xander_1.jpg"
+
+PILLOW = {
+    "brightness": ImageEnhance.Brightness,
+    "contrast": ImageEnhance.Contrast,
+    "sharpness": ImageEnhance.Sharpness,
+    "color": ImageEnhance.Color,
+}
+ENHANCERS = [
+    BrightnessImageEnhancer,
+    ContrastImageEnhancer,
+    SharpnessImageEnhancer,
+    ColorImageEnhancer,
+]
+
+
+@pytest.fixture(scope="module")
+def photo():
+    """Small copy of a dog photo."""
+    with Image.open(PHOTO) as image:
+        image.thumbnail((160, 160))
+        return image.convert("RGB")
+
+
+def one_by_one(image, enhancers, factors):
+    """Apply Pillow enhancers in the order the chain documents."""
+    steps = list(zip((e.KIND for e in enhancers), factors))
+    steps.sort(key=lambda step: (
+        step[0] in EnhancerChain.DETAIL_KINDS,
+        EnhancerChain.DETAIL_KINDS.index(step[0])
+        if step[0] in EnhancerChain.DETAIL_KINDS else 0))
+    for kind, factor in steps:
+        image = PILLOW[kind](image).enhance(factor)
+    return image
+
+
+def difference(first, second):
+    """Largest and mean absolute pixel difference."""
+    diff = np.abs(np.asarray(first, dtype=np.int16)
+                  - np.asarray(second, dtype=np.int16))
+    return diff.max(), diff.mean()
+
+
+@pytest.mark.parametrize("size", [1, 2, 4])
+def test_chain_matches_pillow_enhancers(photo, size):
+    """Give the image Pillow gives applying enhancers one by one.
+
+    Pillow rounds after each enhancer, the chain once, so the allowed
+    difference grows with the chain length.
+    """
+    rng = Random(size)
+    for enhancers in itertools.permutations(ENHANCERS, size):
+        chain = EnhancerChain(*enhancers)
+        factors = chain.draw_factor(rng)
+
+        result = chain.enhance(photo, factors)
+
+        assert result.mode == photo.mode
+        assert result.size == photo.size
+        largest, mean = difference(result,
+                                   one_by_one(photo, enhancers, factors))
+        assert largest <= 2 * size, (chain, factors)
+        assert mean < size, (chain, factors)
+
+
+def test_chain_keeps_alpha(photo):
+    """Enhance colour bands of RGBA image and keep its alpha band."""
+    image = photo.convert("RGBA")
+    image.putalpha(Image.linear_gradient("L").resize(photo.size))
+    chain = EnhancerChain(BrightnessImageEnhancer, ColorImageEnhancer)
+
+    result = chain.enhance(image, [0.5, 0.5])
+
+    assert result.mode == "RGBA"
+    assert list(result.getchannel("A").getdata()) \
+        == list(image.getchannel("A").getdata())
+
+
+def test_unit_factors_keep_image(photo):
+    """Return the same pixels when all factors are 1."""
+    chain = EnhancerChain(*ENHANCERS)
+
+    result = chain.enhance(photo, [1.0] * len(ENHANCERS))
+
+    assert difference(result, photo)[0] <= 1
+
+
+def test_seeded_chain_is_repeatable(photo):
+    """Draw the same factors and image from the same seed."""
+    chain = EnhancerChain(*ENHANCERS)
+
+    first = chain.enhance(photo, rng=Random(7))
+    second = chain.enhance(photo, rng=Random(7))
+
+    assert chain.draw_factor(Random(7)) == chain.draw_factor(Random(7))
+    assert first.tobytes() == second.tobytes()
+
+
+def test_unknown_kind_is_refused():
+    """Refuse to chain an enhancer the chain can't fuse."""
+    class BlurImageEnhancer(SharpnessImageEnhancer):
+        KIND = "blur"
+
+    with pytest.raises(ValueError):
+        EnhancerChain(BrightnessImageEnhancer, BlurImageEnhancer)
@@ -0,0 +1,32 @@
+"""Check that importing the cli stays cheap."""
+
+import os
+import pathlib
+import subprocess
+import sys
+import time
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ["pandas", "bs4", "docx", "flask"]
+MAX_SECONDS = 10  # generous, a cold import takes well under a second
+
+
+def test_import_meme_skips_heavy_modules():
+    """Import `meme` in a fresh interpreter and list heavy modules."""
+    code = (
+        "import sys\n"
+        "import meme\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env,
+        capture_output=True, text=True, timeout=60)
+    elapsed = time.perf_counter() - start
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "", \
+        f"heavy modules imported: {result.stdout.strip()}"
+    assert elapsed < MAX_SECONDS, f"import took {elapsed:.2f}s"
@@ -0,0 +1,46 @@
+"""Check rendering many memes in worker processes."""
+
+import multiprocessing
+import pathlib
+import pickle
+
+from MemeGenerator import ImageCache, MemeEngine
+from Models.QuoteModel import QuoteModel
+from PIL import Image
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+FONTS_DIR = ROOT / "_data" / "_fonts"
+IMAGE = ROOT / "_data" / "photos" / "dog" / "xander_1.jpg"
+
+
+def test_image_cache_pickles_empty():
+    """Send only the budget of the cache, never its lock or images."""
+    cache = ImageCache(1024 * 1024)
+    cache.put(str(IMAGE), 10, Image.new("RGB", (10, 10)))
+
+    copy = pickle.loads(pickle.dumps(cache))
+
+    assert copy.max_bytes == 1024 * 1024
+    assert len(copy) == 0
+    copy.put(str(IMAGE), 10, Image.new("RGB", (10, 10)))  # new lock works
+    assert copy.get(str(IMAGE), 10).size == (10, 10)
+
+
+def test_make_memes_with_spawn(tmp_path):
+    """Start workers the way Windows and macOS do."""
+    engine = MemeEngine(str(tmp_path), fonts_dir=str(FONTS_DIR),
+                        image_cache=ImageCache())
+    jobs = [
+        (IMAGE, QuoteModel("Good dog", "Xander"), {"seed": 1}),
+        (tmp_path / "missing.jpg", ("Lost", "Nobody"), None),
+    ]
+
+    results = sorted(
+        engine.make_memes(jobs, workers=1,
+                          mp_context=multiprocessing.get_context("spawn")),
+        key=lambda result: result.index)
+
+    assert [result.index for result in results] == [0, 1]
+    assert results[0].ok, results[0].error
+    assert pathlib.Path(results[0].path).is_file()
+    assert not results[1].ok  # reported, the batch goes on
@@ -0,0 +1,45 @@
+"""Check that a seed decides everything random in a meme."""
+
+import pathlib
+import random
+
+import pytest
+
+from MemeGenerator import MemeEngine
+from MemeGenerator.ImageEnhancer import (BrightnessImageEnhancer,
+                                         EnhancerChain,
+                                         SharpnessImageEnhancer)
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+FONTS_DIR = ROOT / "_data" / "_fonts"
+IMAGE = ROOT / "_data" / "photos" / "dog" / "xander_1.jpg"
+
+
+@pytest.fixture(params=[None, EnhancerChain(BrightnessImageEnhancer,
+                                            SharpnessImageEnhancer)],
+                ids=["plain", "enhanced"])
+def engine(request, tmp_path):
+    """Engine without a render cache, so every meme is rendered."""
+    engine = MemeEngine(str(tmp_path), fonts_dir=str(FONTS_DIR))
+    engine.enhancer = request.param
+    return engine
+
+
+def test_same_seed_same_meme(engine):
+    """Render the same bytes whatever the global random state is."""
+    random.seed(1)
+    first = engine.render_bytes(str(IMAGE), "Good dog", "Xander", seed=5)
+    random.seed(2)
+    second = engine.render_bytes(str(IMAGE), "Good dog", "Xander", seed=5)
+
+    assert first == second
+
+
+def test_other_seeds_other_memes(engine):
+    """Draw font, position and enhancement from the seed."""
+    memes = {
+        engine.render_bytes(str(IMAGE), "Good dog", "Xander", seed=seed)
+        for seed in range(5)
+    }
+
+    assert len(memes) > 1
@@ -0,0 +1,101 @@
+"""Check quotes served by the parsed quotes cache."""
+
+import os
+
+import pytest
+
+from Models.QuoteModel import QuoteModel
+from QuoteEngine import CsvIngestor, Ingestor, QuoteCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Cache in a temporary database."""
+    cache = QuoteCache(str(tmp_path / "quotes.sqlite3"))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def quote_file(tmp_path):
+    """Csv file with two quotes."""
+    path = tmp_path / "quotes.csv"
+    path.write_text("body,author\nGood dog,Rex\nSit,Fido\n", encoding="utf-8")
+    return path
+
+
+def pairs(quotes):
+    """Turn quotes into comparable pairs."""
+    return [(quote.body, quote.author) for quote in quotes]
+
+
+def counting_parser(calls):
+    """Parse with the ingestor and count the calls."""
+    def parse(path):
+        calls.append(path)
+        return Ingestor.parse(path)
+    return parse
+
+
+def test_unchanged_file_is_parsed_once(cache, quote_file):
+    """Serve the same quotes without parsing the file again."""
+    calls = []
+    first = cache.parse(str(quote_file), counting_parser(calls))
+    second = cache.parse(str(quote_file), counting_parser(calls))
+
+    assert pairs(first) == pairs(second) == [("Good dog", "Rex"),
+                                             ("Sit", "Fido")]
+    assert len(calls) == 1
+
+
+def test_cache_survives_reopening(tmp_path, quote_file):
+    """Keep quotes between processes."""
+    cache = QuoteCache(str(tmp_path / "quotes.sqlite3"))
+    cache.parse(str(quote_file))
+    cache.close()
+
+    cache = QuoteCache(str(tmp_path / "quotes.sqlite3"))
+    try:
+        assert pairs(cache.get(str(quote_file))) == [
+            ("Good dog", "Rex"), ("Sit", "Fido")]
+    finally:
+        cache.close()
+
+
+@pytest.mark.parametrize("content", [
+    "body,author\nGood dog,Rex\nStay,Max\n",  # same size, new content
+    "body,author\nGood dog,Rex\n",
+])
+def test_changed_file_is_parsed_again(cache, quote_file, content):
+    """Parse a file again when its size or modification time changes."""
+    cache.parse(str(quote_file))
+    stat = quote_file.stat()
+
+    quote_file.write_text(content, encoding="utf-8")
+    os.utime(quote_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    assert cache.get(str(quote_file)) is None
+    assert pairs(cache.parse(str(quote_file))) == \
+        pairs(Ingestor.parse(str(quote_file)))
+
+
+def test_new_parser_version_is_parsed_again(cache, quote_file, monkeypatch):
+    """Never serve quotes parsed by an older parser."""
+    cache.put(str(quote_file), [QuoteModel("Old", "Parser")])
+    monkeypatch.setattr(CsvIngestor, "PARSER_VERSION",
+                        CsvIngestor.PARSER_VERSION + 1)
+
+    assert cache.get(str(quote_file)) is None
+
+
+def test_prune_drops_other_files(cache, quote_file, tmp_path):
+    """Forget files which are not in use anymore."""
+    other = tmp_path / "other.csv"
+    other.write_text("body,author\nBark,Rex\n", encoding="utf-8")
+    cache.parse(str(quote_file))
+    cache.parse(str(other))
+
+    cache.prune([str(quote_file)])
+
+    assert cache.get(str(quote_file)) is not None
+    assert cache.get(str(other)) is None
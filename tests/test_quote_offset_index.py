@@ -0,0 +1,170 @@
+"""Check quotes drawn through offset sidecars."""
+
+import os
+import random
+
+import pytest
+
+from QuoteEngine import Ingestor, QuoteOffsetIndex
+
+
+def pairs(quotes):
+    """Turn quotes into comparable pairs."""
+    return [(quote.body, quote.author) for quote in quotes]
+
+
+def write(path, content):
+    """Write the file and make sure its modification time changes."""
+    old = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(old + 10 ** 9, old + 10 ** 9))
+    return str(path)
+
+
+@pytest.fixture
+def files(tmp_path):
+    """Txt, csv and multiline csv files with quotes."""
+    return [
+        write(tmp_path / "a.txt", "One - A\n\nnot a quote\nTwo - B\n"),
+        write(tmp_path / "b.csv", "author,body\nC,Three\nD,Four\n"),
+        write(tmp_path / "c.csv",
+              'body,author\n"Five,\nlines",E\nSix,F\n'),  # not indexed
+    ]
+
+
+def make_index(files, tmp_path, **kwargs):
+    """Index without deduplication, in a temporary dir."""
+    kwargs.setdefault("dedupe", False)
+    return QuoteOffsetIndex(files, index_dir=str(tmp_path / "idx"),
+                            cache_path=None, **kwargs)
+
+
+def test_quotes_match_ingestor(files, tmp_path):
+    """Give every file the quotes its ingestor parses."""
+    index = make_index(files, tmp_path)
+    assert list(index.counts().values()) == [2, 2, 2]
+
+    for path in files:
+        quotes = [index.get(path, position)
+                  for position in range(index.counts()[path])]
+        assert pairs(quotes) == pairs(Ingestor.parse(path))
+
+
+def test_get_before_counts(files, tmp_path):
+    """Count the quotes on the first access."""
+    assert pairs([make_index(files, tmp_path).get(files[0], 1)]) == [
+        ("Two", "B")]
+
+
+@pytest.mark.parametrize("position", [-1, 2])
+def test_get_out_of_range(files, tmp_path, position):
+    """Refuse positions the file does not have."""
+    with pytest.raises(IndexError):
+        make_index(files, tmp_path).get(files[0], position)
+
+
+def test_get_after_file_edit(files, tmp_path):
+    """Count a file edited after counting again."""
+    index = make_index(files, tmp_path)
+    index.counts()
+
+    write(tmp_path / "a.txt", "Seven - G\nEight - H\nNine - I\n")
+
+    assert pairs([index.get(files[0], 0)]) == [("Seven", "G")]
+    assert index.counts()[files[0]] == 3
+
+
+def test_get_after_file_shrinks(files, tmp_path):
+    """Refuse a position the edited file does not have anymore."""
+    index = make_index(files, tmp_path)
+    index.counts()
+
+    write(tmp_path / "a.txt", "Seven - G\n")
+
+    with pytest.raises(IndexError):
+        index.get(files[0], 1)
+
+
+def test_get_after_sidecar_removed(files, tmp_path):
+    """Build a removed sidecar again."""
+    index = make_index(files, tmp_path)
+    index.counts()
+
+    os.remove(index.sidecar_path(files[1]))
+
+    assert pairs([index.get(files[1], 1)]) == [("Four", "D")]
+
+
+def test_sample_draws_every_quote(files, tmp_path):
+    """Draw only real quotes, each of them sometimes."""
+    index = make_index(files, tmp_path)
+    expected = {pair for path in files for pair in pairs(Ingestor.parse(path))}
+
+    drawn = {pair for seed in range(200)
+             for pair in pairs([index.sample(random.Random(seed))])}
+
+    assert drawn == expected
+
+
+def test_sample_is_seeded(files, tmp_path):
+    """Draw the same quote for the same seed, in any order of files."""
+    first = make_index(files, tmp_path).sample(random.Random(7))
+    second = make_index(files[::-1], tmp_path).sample(random.Random(7))
+
+    assert pairs([first]) == pairs([second])
+
+
+def test_sample_without_quotes(tmp_path):
+    """Tell there is nothing to draw."""
+    path = write(tmp_path / "empty.txt", "\n")
+
+    with pytest.raises(IndexError):
+        make_index([path], tmp_path).sample()
+
+
+@pytest.fixture
+def repeated(tmp_path):
+    """Files repeating quotes in other forms."""
+    return [
+        write(tmp_path / "a.txt", '"One" - A\nTwo - B\nOne - A\n'),
+        write(tmp_path / "b.csv", "body,author\nONE,a\nThree,C\n"),
+        write(tmp_path / "c.txt", "two  -  b\nFour - D\n"),
+    ]
+
+
+def test_dedupe_counts_first_occurrence(repeated, tmp_path):
+    """Count a repeated quote only in the file it occurs first."""
+    index = make_index(repeated, tmp_path, dedupe=True)
+
+    assert list(index.counts().values()) == [2, 1, 1]
+    assert {pair for seed in range(200) for pair in pairs(
+        [index.sample(random.Random(seed))])} == {
+            ("One", "A"), ("Two", "B"), ("Three", "C"), ("Four", "D")}
+
+
+def test_manifest_skips_counting(repeated, tmp_path, monkeypatch):
+    """Draw from the manifest without reading records of the files."""
+    expected = [make_index(repeated, tmp_path, dedupe=True).sample(
+        random.Random(seed)) for seed in range(20)]
+
+    def fail(*args):
+        raise AssertionError("the files were counted again")
+
+    monkeypatch.setattr(QuoteOffsetIndex, "_read_keys", fail)
+    monkeypatch.setattr(QuoteOffsetIndex, "build", fail)
+    index = make_index(repeated, tmp_path, dedupe=True)
+
+    assert list(index.counts().values()) == [2, 1, 1]
+    assert pairs(index.sample(random.Random(seed))
+                 for seed in range(20)) == pairs(expected)
+
+
+def test_manifest_follows_edits(repeated, tmp_path):
+    """Count again when a file changed since the manifest was saved."""
+    make_index(repeated, tmp_path, dedupe=True).counts()
+
+    write(tmp_path / "a.txt", "Five - E\n")
+    index = make_index(repeated, tmp_path, dedupe=True)
+
+    assert list(index.counts().values()) == [1, 2, 2]
+    assert pairs([index.get(repeated[1], 0)]) == [("ONE", "a")]
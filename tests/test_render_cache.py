@@ -0,0 +1,109 @@
+"""Check memes served by the render cache."""
+
+import os
+import pathlib
+import shutil
+
+import pytest
+
+from MemeGenerator import MemeEngine, RenderCache
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+FONTS_DIR = ROOT / "_data" / "_fonts"
+IMAGE = ROOT / "_data" / "photos" / "dog" / "xander_1.jpg"
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """Engine saving memes and cache in temporary dirs."""
+    engine = MemeEngine(str(tmp_path / "memes"), fonts_dir=str(FONTS_DIR),
+                        render_cache=RenderCache(str(tmp_path / "cache")))
+    engine.renders = 0
+    render = engine.render
+
+    def counted(*args, **kwargs):
+        engine.renders += 1
+        return render(*args, **kwargs)
+
+    engine.render = counted
+    return engine
+
+
+def test_same_spec_hits_cache(engine):
+    """Render a seeded meme once, serve the same bytes again."""
+    first = engine.render_bytes(str(IMAGE), "Good dog", "Xander", seed=1)
+    second = engine.render_bytes(str(IMAGE), "Good dog", "Xander", seed=1)
+
+    assert first == second
+    assert engine.renders == 1
+
+
+@pytest.mark.parametrize("change", [
+    {"seed": 2}, {"text": "Bad dog"}, {"width": 320},
+])
+def test_other_spec_misses_cache(engine, change):
+    """Render again when anything the meme depends on changes."""
+    spec = {"text": "Good dog", "autor": "Xander", "seed": 1}
+    engine.render_bytes(str(IMAGE), **spec)
+    engine.render_bytes(str(IMAGE), **{**spec, **change})
+
+    assert engine.renders == 2
+
+
+def test_changed_image_misses_cache(engine, tmp_path):
+    """Key memes by image content, not by its path."""
+    image = tmp_path / "dog.jpg"
+    shutil.copy(IMAGE, image)
+    engine.render_bytes(str(image), "Good dog", "Xander", seed=1)
+
+    shutil.copy(ROOT / "_data" / "photos" / "dog" / "xander_2.jpg", image)
+    os.utime(image, ns=(0, 0))  # even with an older modification time
+    engine.render_bytes(str(image), "Good dog", "Xander", seed=1)
+
+    assert engine.renders == 2
+
+
+def test_unseeded_bypasses_cache(engine, tmp_path):
+    """Never freeze random memes in the cache."""
+    engine.render_bytes(str(IMAGE), "Good dog", "Xander")
+    engine.render_bytes(str(IMAGE), "Good dog", "Xander")
+
+    assert engine.renders == 2
+    assert not list((tmp_path / "cache").iterdir())
+
+
+def test_meme_set_sizes_stay_in_cache(engine, tmp_path):
+    """Keep seeded sizes in the cache only, render them once."""
+    first = engine.make_meme_set(
+        str(IMAGE), "Good dog", "Xander", thumbnail=None, seed=1)
+    second = engine.make_meme_set(
+        str(IMAGE), "Good dog", "Xander", thumbnail=None, seed=1)
+
+    assert first == second
+    assert sorted(first) == sorted(MemeEngine.RESPONSIVE_WIDTHS)
+    assert engine.renders == 1
+    assert all(pathlib.Path(path).parent == tmp_path / "cache"
+               for path in first.values())
+    assert not (tmp_path / "memes").exists()
+
+
+def test_meme_set_requires_widths(engine):
+    """Refuse to render no sizes at all."""
+    with pytest.raises(ValueError):
+        engine.make_meme_set(str(IMAGE), "Good dog", "Xander", widths=[])
+
+
+def test_least_recently_used_are_evicted(tmp_path):
+    """Drop the oldest memes when the cache is over its budget."""
+    cache = RenderCache(str(tmp_path), max_bytes=250)
+    cache.put_bytes("a", ".png", b"a" * 100)
+    cache.put_bytes("b", ".png", b"b" * 100)
+    os.utime(tmp_path / "a.png", ns=(1, 1))
+    os.utime(tmp_path / "b.png", ns=(2, 2))
+    cache.get_path("a", ".png")  # used again, b is the oldest now
+
+    cache.put_bytes("c", ".png", b"c" * 100)
+
+    assert cache.get_bytes("a", ".png") == b"a" * 100
+    assert cache.get_bytes("b", ".png") is None
+    assert cache.get_bytes("c", ".png") == b"c" * 100
@@ -0,0 +1,36 @@
+"""Check text measured by TextLayout against Pillow."""
+
+import pathlib
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from MemeGenerator.TextLayout import TextLayout
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+FONTS = sorted((ROOT / "_data" / "_fonts").glob("*.ttf"))
+TEXTS = [
+    ["Hello"],
+    ["jumpy gpq", "yggy"],
+    ["Life is like peanut butter: crunchy, and a dog knows it well"],
+    ["Zażółć gęślą jaźń"],
+]
+
+
+@pytest.mark.parametrize("font_path", FONTS, ids=lambda path: path.stem)
+@pytest.mark.parametrize("size", [12, 40])
+def test_block_covers_pillow_box(font_path, size):
+    """Fit what Pillow draws, descenders of the last line included."""
+    font = ImageFont.truetype(str(font_path), size)
+    layout = TextLayout(font, spacing=4)
+    draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+    for text in TEXTS:
+        block = layout.wrap(text, 10 * size)
+        box = draw.multiline_textbbox(
+            (0, 0), block.text, font=font, spacing=4)
+
+        assert box[3] <= block.height < box[3] + size  # not a line more
+        for line in block.lines:
+            assert layout.measure(line) == \
+                pytest.approx(draw.textlength(line, font=font))